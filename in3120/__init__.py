@@ -3,22 +3,35 @@ from .tokenizer import SimpleTokenizer
 from .shinglegenerator import ShingleGenerator
 from .sieve import Sieve
 from .document import Document, InMemoryDocument
-from .corpus import Corpus, InMemoryCorpus
-from .dictionary import Dictionary, InMemoryDictionary
-from .posting import Posting
-from .postinglist import PostingList, InMemoryPostingList, CompressedInMemoryPostingList
+from .corpus import Corpus, CorpusView, InMemoryCorpus
+from .filecorpus import FileCorpus
+from .memorymappedcorpus import MemoryMappedCorpus, MemoryMappedDocument
+from .columnarcorpus import ColumnarCorpus, ColumnarDocument
+from .lrucache import LruCache
+from .blockcompressedcorpus import BlockCompressedCorpus
+from .dictionary import Dictionary, InMemoryDictionary, FrontCodedDictionary, PerfectHashDictionary, TermStatistics, AutomatonDictionary
+from .variablebytecodec import VariableByteCodec
+from .integercodec import IntegerCodec, VariableByteIntegerCodec, PForDeltaCodec, Simple8bCodec, EliasFanoCodec
+from .roaringbitmap import RoaringBitmap
+from .posting import Posting, PositionalPosting
+from .postinglist import PostingList, PostingListIterator, PostingListCursor, IteratorPostingListCursor, CursorPostingListIterator, InMemoryPostingList, ArrayPostingList, CompressedInMemoryPostingList, BlockPostingList, PositionalPostingList, BitmapPostingList
 from .invertedindex import InvertedIndex, InMemoryInvertedIndex
+from .impactorderedinvertedindex import ImpactOrderedInvertedIndex
+from .diskinvertedindex import DiskInvertedIndex, DiskInvertedIndexWriter
+from .spimiindexbuilder import SpimiIndexBuilder
 from .stringfinder import Trie, StringFinder
 from .suffixarray import SuffixArray
 from .postingsmerger import PostingsMerger
 from .simplesearchengine import SimpleSearchEngine
+from .phrasesearchengine import PhraseSearchEngine
+from .scoreatatimesearchengine import ScoreAtATimeSearchEngine
 from .ranker import Ranker, SimpleRanker
 from .betterranker import BetterRanker
 from .naivebayesclassifier import NaiveBayesClassifier
-from .variablebytecodec import VariableByteCodec
 from .expressioncomposer import ExpressionComposer
 from .shallowcaseextractor import ShallowCaseExtractor
 from .documentpipeline import DocumentPipeline
+from .cachingprocessor import CachingProcessor
 from .soundex import Soundex
 from .porterstemmer import PorterStemmer
 from .similaritysearchengine import SimilaritySearchEngine
@@ -4,7 +4,9 @@
 from .ranker import Ranker
 from .corpus import Corpus
 from .posting import Posting
+from .postinglist import PostingListCursor
 from .invertedindex import InvertedIndex
+from typing import Union
 import math
 
 
@@ -35,7 +37,7 @@ class BetterRanker(Ranker):
         self._dynamic_score_weight = 1.0
         self._static_score_weight = 1.0
 
-    def update(self, term: str, multiplicity: int, posting: Posting) -> None:
+    def update(self, term: str, multiplicity: int, posting: Union[Posting, PostingListCursor]) -> None:
         assert self._document_id == posting.document_id
         tf = math.log(posting.term_frequency + 1, 10)
         df = self._inverted_index.get_document_frequency(term)
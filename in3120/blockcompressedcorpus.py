@@ -0,0 +1,97 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+from __future__ import annotations
+import pickle
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+from .corpus import Corpus
+from .document import Document, InMemoryDocument
+from .lrucache import LruCache
+
+
+class BlockCompressedCorpus(Corpus):
+    """
+    An in-memory implementation of a document store that trades CPU for memory, suitable for
+    archival document collections where documents are looked up infrequently.
+
+    Documents are grouped into blocks of a fixed number of consecutive documents, and each block
+    is serialized and compressed as a unit. Compressing many documents together gives much better
+    compression ratios than compressing documents one by one, since documents tend to share a lot
+    of vocabulary and structure. The price is that looking up a single document requires that we
+    decompress the whole block it resides in. To amortize this, we keep a bounded LRU cache of
+    decompressed blocks. Documents that are looked up together, e.g., the top-ranked documents for
+    a query, will often share blocks.
+
+    Documents are handed out as fresh InMemoryDocument copies, so changes made to the returned
+    documents are not persisted. The most recent block is kept uncompressed until it is full.
+
+    Compression is done using either "zlib" or "lzma" from the standard library.
+    """
+
+    def __init__(self, documents: Optional[Iterable[Document]] = None, block_size: int = 64,
+                 cache_size: int = 16, compression: str = "zlib"):
+        assert block_size > 0
+        if compression == "zlib":
+            import zlib
+            self.__compress, self.__decompress = zlib.compress, zlib.decompress
+        elif compression == "lzma":
+            import lzma
+            self.__compress, self.__decompress = lzma.compress, lzma.decompress
+        else:
+            raise ValueError("Unsupported compression")
+        self.__block_size = block_size
+        self.__blocks: List[bytes] = []  # The full blocks, compressed.
+        self.__pending: List[Dict[str, Any]] = []  # The last block, not yet full and hence not yet compressed.
+        self.__cache = LruCache(cache_size)  # Maps block numbers to decompressed blocks.
+        for document in documents or []:
+            self.add_document(document)
+
+    def __iter__(self) -> Iterator[Document]:
+        # Decompress each block once, without going through the cache. A full scan would otherwise
+        # flush out the blocks that we want to keep cached.
+        document_id = 0
+        for block in self.__blocks:
+            for named_fields in pickle.loads(self.__decompress(block)):
+                yield InMemoryDocument(document_id, named_fields)
+                document_id += 1
+        for named_fields in self.__pending:
+            yield InMemoryDocument(document_id, dict(named_fields))
+            document_id += 1
+
+    def size(self) -> int:
+        return len(self.__blocks) * self.__block_size + len(self.__pending)
+
+    def get_document(self, document_id: int) -> Document:
+        assert 0 <= document_id < self.size()
+        (block_number, position) = divmod(document_id, self.__block_size)
+        if block_number == len(self.__blocks):
+            return InMemoryDocument(document_id, dict(self.__pending[position]))
+        block = self.__cache.get(block_number, None)
+        if block is None:
+            block = pickle.loads(self.__decompress(self.__blocks[block_number]))
+            self.__cache.put(block_number, block)
+        return InMemoryDocument(document_id, dict(block[position]))
+
+    def add_document(self, document: Document) -> BlockCompressedCorpus:
+        """
+        Adds the given document to the corpus. Compresses the last block if it becomes full.
+        """
+        assert document is not None
+        assert document.document_id == self.size()
+        self.__pending.append({name: document.get_field(name, None) for name in document.get_field_names()})
+        if len(self.__pending) == self.__block_size:
+            self.__blocks.append(self.__compress(pickle.dumps(self.__pending, pickle.HIGHEST_PROTOCOL)))
+            self.__pending = []
+        return self
+
+    def get_compressed_size(self) -> int:
+        """
+        Returns the total size of all compressed blocks, in bytes.
+        """
+        return sum(len(block) for block in self.__blocks)
+
+    def get_cache_statistics(self) -> Dict[str, int]:
+        """
+        Returns the counters for the cache of decompressed blocks. See LruCache for details.
+        """
+        return self.__cache.get_statistics()
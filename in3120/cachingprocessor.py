@@ -0,0 +1,117 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+import hashlib
+import json
+import shelve
+from typing import Any, Callable, Dict, Iterable, List, Optional
+from .document import Document
+
+
+class CachingProcessor:
+    """
+    Wraps a document processor, for use in a DocumentPipeline, and persists its results on disk.
+    Useful for expensive processors that derive new fields from existing ones, e.g., entity
+    extraction, so that documents that haven't changed don't have to be reprocessed every time
+    a corpus gets reloaded.
+
+    The cache is keyed by a hash of the processor's identity and the values of the processor's
+    input fields. For each key we store the values of the processor's output fields, or the
+    fact that the processor dropped the document. The wrapped processor is hence assumed to
+    be deterministic, to only depend on the specified input fields, and to only modify the
+    specified output fields.
+
+    The identity defaults to the processor's qualified name. Supply an explicit identity, e.g.,
+    with a version number, if the processor's behavior changes and old results become invalid.
+
+    The cache is backed by a shelf, which does not support concurrent writers. Do not use it
+    with parallel loading.
+    """
+
+    def __init__(self, processor: Callable[[Document], Optional[Document]], inputs: Iterable[str],
+                 outputs: Iterable[str], filename: str, identity: Optional[str] = None):
+        assert processor is not None
+        self.__processor = processor
+        self.__inputs = list(inputs)
+        self.__outputs = list(outputs)
+        self.__identity = identity if identity is not None else __class__.__get_qualified_name(processor)
+        self.__shelf = shelve.open(filename, flag="c")
+        self.__hits = 0
+        self.__misses = 0
+        self.__name__ = "cached " + getattr(processor, "__name__", processor.__class__.__name__)
+
+    def __call__(self, document: Document) -> Optional[Document]:
+        key = self.__get_key(document)
+        if key in self.__shelf:
+            self.__hits += 1
+            return self.__restore(document, self.__shelf[key])
+        self.__misses += 1
+        return self.__store(key, self.__processor(document))
+
+    def process_batch(self, documents: List[Document]) -> List[Optional[Document]]:
+        """
+        Processes a batch of documents. Only the documents that are not already cached are passed
+        on to the wrapped processor, in one batch if the wrapped processor supports that. Returns a
+        list of the same length as the given one, with None in place of each dropped document.
+        """
+        keys = [self.__get_key(d) for d in documents]
+        results: List[Optional[Document]] = [None] * len(documents)
+        misses = []
+        for (i, (document, key)) in enumerate(zip(documents, keys)):
+            if key in self.__shelf:
+                results[i] = self.__restore(document, self.__shelf[key])
+            else:
+                misses.append(i)
+        self.__hits += len(documents) - len(misses)
+        self.__misses += len(misses)
+        if misses:
+            batch = getattr(self.__processor, "process_batch", None)
+            if callable(batch):
+                # Batch processors return a list of the same length as the batch, so match the results up by position.
+                processed = batch([documents[i] for i in misses])
+                if len(processed) != len(misses):
+                    raise ValueError(f"Wrapped processor returned {len(processed)} documents for a batch of {len(misses)}")
+            else:
+                processed = [self.__processor(documents[i]) for i in misses]
+            for (i, document) in zip(misses, processed):
+                results[i] = self.__store(keys[i], document)
+        return results
+
+    def get_statistics(self) -> Dict[str, int]:
+        """
+        Returns the number of cache hits and misses.
+        """
+        return {"hits": self.__hits, "misses": self.__misses}
+
+    def close(self) -> None:
+        """
+        Flushes the cache to disk and closes it.
+        """
+        self.__shelf.close()
+
+    def __get_key(self, document: Document) -> str:
+        inputs = [document.get_field(name, None) for name in self.__inputs]
+        buffer = json.dumps([self.__identity, inputs], sort_keys=True, default=repr)
+        return hashlib.sha256(buffer.encode("utf-8")).hexdigest()
+
+    def __restore(self, document: Document, outputs: Optional[Dict[str, Any]]) -> Optional[Document]:
+        if outputs is None:
+            return None
+        for (name, value) in outputs.items():
+            document.set_field(name, value)
+        return document
+
+    def __store(self, key: str, document: Optional[Document]) -> Optional[Document]:
+        if document is None:
+            outputs = None
+        else:
+            names = set(document.get_field_names())
+            outputs = {name: document.get_field(name, None) for name in self.__outputs if name in names}
+        self.__shelf[key] = outputs
+        return document
+
+    @staticmethod
+    def __get_qualified_name(processor: Callable[[Document], Optional[Document]]) -> str:
+        function = getattr(processor, "__func__", processor)  # Unwrap bound methods.
+        qualname = getattr(function, "__qualname__", processor.__class__.__qualname__)
+        return f"{getattr(function, '__module__', processor.__class__.__module__)}.{qualname}"
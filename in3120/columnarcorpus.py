@@ -0,0 +1,269 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+from __future__ import annotations
+from array import array
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+from .corpus import Corpus, CorpusView
+from .document import Document
+
+
+class Column:
+    """
+    A single field stored for all documents in a corpus, i.e., a column. Document identifiers
+    are used as direct indexes into the column.
+
+    The representation adapts to the values we see. If all values are integers or all values
+    are floats, they are stored in a typed array. Otherwise, values are dictionary-encoded so
+    that each distinct value is stored only once and each document stores a small integer code.
+    If it turns out that most values are distinct, e.g., for free-text fields, or if values are
+    not hashable, we fall back to storing a plain list of values.
+    """
+
+    # Placeholder for documents that don't have a value for the field. Code 0 in dictionary-encoded columns.
+    MISSING = object()
+
+    # Values are dictionary-encoded until the column has at least this many entries and the
+    # majority of them are distinct.
+    DICTIONARY_THRESHOLD = 64
+
+    def __init__(self):
+        self.__values = None  # The typed array, the dictionary or the plain list. See above.
+        self.__codes = None  # Codes into the dictionary, if dictionary-encoded.
+        self.__lookup = None  # Maps values to codes, if dictionary-encoded.
+
+    def __len__(self) -> int:
+        if self.__values is None:
+            return 0
+        return len(self.__values if self.__codes is None else self.__codes)
+
+    def get(self, document_id: int, default: Any) -> Any:
+        """
+        Returns the value for the given document, or the given default value if the document
+        has no value for this field.
+        """
+        if document_id >= len(self):
+            return default
+        if self.__codes is not None:
+            value = self.__values[self.__codes[document_id]]
+        else:
+            value = self.__values[document_id]
+        return default if value is __class__.MISSING else value
+
+    def set(self, document_id: int, value: Any) -> None:
+        """
+        Sets the value for the given document. Documents between the current end of the column
+        and the given document, if any, are treated as missing values.
+        """
+        if self.__values is None:
+            self.__initialize(document_id, value)
+        if isinstance(self.__values, array):
+            if type(value) is int and self.__values.typecode == "q" and -2 ** 63 <= value < 2 ** 63 or \
+               type(value) is float and self.__values.typecode == "d":
+                if document_id < len(self.__values):
+                    self.__values[document_id] = value
+                    return
+                if document_id == len(self.__values):
+                    self.__values.append(value)
+                    return
+            self.__to_dictionary()
+        if self.__codes is not None:
+            code = self.__encode(value)
+            if code is not None:
+                self.__pad(self.__codes, document_id, 0)
+                if document_id < len(self.__codes):
+                    self.__codes[document_id] = code
+                else:
+                    self.__codes.append(code)
+                self.__prune_dictionary()
+                return
+            self.__to_plain()
+        self.__pad(self.__values, document_id, __class__.MISSING)
+        if document_id < len(self.__values):
+            self.__values[document_id] = value
+        else:
+            self.__values.append(value)
+
+    def scan(self) -> Iterator[Tuple[Any, array]]:
+        """
+        Yields the distinct values in the column, together with the identifiers of the documents
+        that have that value. I.e., yields (value, document identifiers) pairs. Missing values are
+        not reported.
+        """
+        if self.__codes is not None:
+            groups: Dict[int, array] = {}
+            for (document_id, code) in enumerate(self.__codes):
+                if code:
+                    groups.setdefault(code, array("L")).append(document_id)
+            return ((self.__values[code], document_ids) for (code, document_ids) in groups.items())
+        return (((value, array("L", [document_id])) for (document_id, value) in enumerate(self.__values or [])
+                 if value is not __class__.MISSING))
+
+    def __initialize(self, document_id: int, value: Any) -> None:
+        if document_id == 0 and type(value) is int:
+            self.__values = array("q")
+        elif document_id == 0 and type(value) is float:
+            self.__values = array("d")
+        else:
+            self.__values = [__class__.MISSING]
+            self.__codes = array("I")
+            self.__lookup = {}
+
+    def __encode(self, value: Any) -> Optional[int]:
+        """
+        Returns the dictionary code for the given value, adding the value to the dictionary if needed.
+        Returns None if the value cannot be dictionary-encoded. For non-strings we key on the type as
+        well as the value, since, e.g., 1 == 1.0 == True.
+        """
+        try:
+            key = value if value.__class__ is str else (value.__class__, value)
+            code = self.__lookup.get(key, None)
+        except TypeError:
+            return None
+        if code is None:
+            code = len(self.__values)
+            self.__values.append(value)
+            self.__lookup[key] = code
+        return code
+
+    def __prune_dictionary(self) -> None:
+        """
+        Falls back to a plain list if dictionary encoding doesn't pay off.
+        """
+        if len(self.__codes) >= __class__.DICTIONARY_THRESHOLD and 2 * len(self.__values) > len(self.__codes):
+            self.__to_plain()
+
+    def __to_dictionary(self) -> None:
+        values = self.__values
+        self.__values = [__class__.MISSING]
+        self.__codes = array("I")
+        self.__lookup = {}
+        for value in values:
+            self.__codes.append(self.__encode(value))
+
+    def __to_plain(self) -> None:
+        self.__values = [self.__values[code] for code in self.__codes]
+        self.__codes = None
+        self.__lookup = None
+
+    @staticmethod
+    def __pad(values: Any, document_id: int, placeholder: Any) -> None:
+        if document_id > len(values):
+            values.extend([placeholder] * (document_id - len(values)))
+
+
+class ColumnarDocument(Document):
+    """
+    A lightweight view of a document that resides in a columnar corpus. Holds no field values
+    itself, so creating one is cheap. Changes made via set_field are written to the corpus.
+    """
+
+    __slots__ = ("__corpus", "__document_id")
+
+    def __init__(self, corpus: ColumnarCorpus, document_id: int):
+        self.__corpus = corpus
+        self.__document_id = document_id
+
+    def __repr__(self):
+        return str({"document_id": self.__document_id, "fields": {f: self.get_field(f, None) for f in self.get_field_names()}})
+
+    def get_document_id(self) -> int:
+        return self.__document_id
+
+    def get_field(self, field_name: str, default: Any) -> Any:
+        return self.__corpus._get_field(self.__document_id, field_name, default)
+
+    def set_field(self, field_name: str, field_value: Any) -> None:
+        assert field_name is not None
+        self.__corpus._set_field(self.__document_id, field_name, field_value)
+
+    def get_field_names(self) -> Iterable[str]:
+        return self.__corpus._get_field_names(self.__document_id)
+
+
+class ColumnarCorpus(Corpus):
+    """
+    An in-memory implementation of a document store that stores each named field as a column,
+    rather than storing each document as a separate dictionary of named fields. Field names are
+    stored once per corpus and not once per document, and values that are repeated across many
+    documents (e.g., genres, years or ratings) are stored once per distinct value. See Column for
+    details.
+
+    Documents are handed out as lightweight ColumnarDocument views. To avoid materializing all
+    documents up front when loading from file, combine with a streaming corpus. E.g.:
+
+        ColumnarCorpus(FileCorpus("imdb.csv"))
+
+    Document identifiers are assigned on a first-come first-serve basis.
+    """
+
+    def __init__(self, documents: Optional[Iterable[Document]] = None):
+        self.__columns: Dict[str, Column] = {}
+        self.__size = 0
+        for document in documents or []:
+            self.add_document(document)
+
+    def __iter__(self) -> Iterator[Document]:
+        return (ColumnarDocument(self, i) for i in range(self.__size))
+
+    def size(self) -> int:
+        return self.__size
+
+    def get_document(self, document_id: int) -> Document:
+        assert 0 <= document_id < self.__size
+        return ColumnarDocument(self, document_id)
+
+    def add_document(self, document: Document) -> ColumnarCorpus:
+        """
+        Adds the given document to the corpus by copying its fields into the columns.
+        """
+        assert document is not None
+        assert document.document_id == self.__size
+        for field_name in document.get_field_names():
+            self._set_field(self.__size, field_name, document.get_field(field_name, None))
+        self.__size += 1
+        return self
+
+    def split(self, field_name: str, splitter: Optional[Callable[[Any], List[Any]]] = None) -> Dict[Any, Corpus]:
+        """
+        Divides the corpus up into multiple corpora, according to the value(s) of the
+        named field. See Corpus for details.
+
+        This is done by scanning the named column, without materializing any documents. If the
+        column is dictionary-encoded, the splitter is only invoked once per distinct value.
+        """
+        splitter = splitter if splitter else lambda v: [v]
+        groups: Dict[Any, List[array]] = {}
+        missing = set(range(self.__size))
+        column = self.__columns.get(field_name, Column())
+        for (value, document_ids) in column.scan():
+            missing.difference_update(document_ids)
+            for key in splitter(value):
+                groups.setdefault(key, []).append(document_ids)
+        if missing:
+            for key in splitter(""):
+                groups.setdefault(key, []).append(array("L", sorted(missing)))
+        return {key: CorpusView(self, array("L", sorted(set().union(*lists))) if len(lists) > 1 else lists[0])
+                for (key, lists) in groups.items()}
+
+    def _get_field(self, document_id: int, field_name: str, default: Any) -> Any:
+        """
+        Returns the named field for the given document. Only meant to be used by ColumnarDocument.
+        """
+        column = self.__columns.get(field_name, None)
+        return default if column is None else column.get(document_id, default)
+
+    def _set_field(self, document_id: int, field_name: str, field_value: Any) -> None:
+        """
+        Sets the named field for the given document. Only meant to be used by ColumnarDocument.
+        """
+        if field_name not in self.__columns:
+            self.__columns[field_name] = Column()
+        self.__columns[field_name].set(document_id, field_value)
+
+    def _get_field_names(self, document_id: int) -> List[str]:
+        """
+        Returns the names of the fields that the given document has a value for. Only meant
+        to be used by ColumnarDocument.
+        """
+        return [f for (f, c) in self.__columns.items() if c.get(document_id, Column.MISSING) is not Column.MISSING]
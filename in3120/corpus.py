@@ -3,12 +3,179 @@
 
 from __future__ import annotations
 from abc import abstractmethod
-from typing import Any, List, Dict, Callable, Optional
+from array import array
+from typing import Any, List, Dict, Callable, Iterable, Iterator, Optional, Tuple
 import collections.abc
 from .document import Document, InMemoryDocument
 from .documentpipeline import DocumentPipeline
 
 
+def _parse_text_line(line: str) -> Optional[Dict[str, Any]]:
+    """
+    Parses a single line from a text file into a set of named fields. Tab-separated fields,
+    where the first field gets named "body" and the second field (optional) gets named "meta".
+    All other fields are currently ignored. Returns None for empty lines.
+    """
+    anonymous_fields = line.strip().split("\t")
+    if len(anonymous_fields) == 1 and not anonymous_fields[0]:
+        return None
+    named_fields = {"body": anonymous_fields[0]}
+    if len(anonymous_fields) >= 2:
+        named_fields["meta"] = anonymous_fields[1]
+    return named_fields
+
+
+def _parse_json_line(line: str) -> Optional[Dict[str, Any]]:
+    """
+    Parses a single line from a JSON file into a set of named fields. Returns None for
+    lines that do not start with "{".
+    """
+    from json import loads
+    line = line.strip()
+    if not line.startswith("{"):
+        return None
+    return loads(line)
+
+
+def _parse_xml_file(filename: str) -> Iterator[Dict[str, Any]]:
+    """
+    Incrementally parses the given XML file, and yields a set of named fields for each <doc> node
+    as soon as the node has been parsed. The text directly below the <doc> node gets named "body".
+
+    Elements are cleared as soon as they have been consumed, so that memory usage stays flat
+    regardless of the size of the file. This is in contrast to building up the full DOM.
+    """
+    from xml.etree.ElementTree import iterparse
+    root = None
+    depth = 0  # The number of currently open <doc> nodes. We can't clear the tree while inside one.
+    for (event, element) in iterparse(filename, events=("start", "end")):
+        if root is None:
+            root = element
+        if element.tag != "doc":
+            continue
+        if event == "start":
+            depth += 1
+            continue
+        depth -= 1
+        texts = [element.text] + [child.tail for child in element]
+        yield {"body": " ".join(text for text in texts if text)}
+        if depth == 0:
+            root.clear()
+
+
+_MISSING = object()  # Tells absent fields apart from fields that are None.
+
+
+def _project(document: Document, fields: Optional[List[str]], source_field: Optional[str], record: int) -> Document:
+    """
+    Keeps only the specified fields of the given document, if any are specified, and optionally
+    adds a field that points back to the record in the source file. A document that can't enumerate
+    its fields keeps all of them if no fields are specified, and then gets the added field in place.
+    """
+    if fields is None and source_field is None:
+        return document
+    if fields is None:
+        try:
+            fields = list(document.get_field_names())
+        except NotImplementedError:
+            document.set_field(source_field, record)
+            return document
+    named_fields = {}
+    for name in fields:
+        value = document.get_field(name, _MISSING)
+        if value is not _MISSING:
+            named_fields[name] = value
+    if source_field is not None:
+        named_fields[source_field] = record
+    return InMemoryDocument(document.document_id, named_fields)
+
+
+def _renumber(document: Document, document_id: int) -> Document:
+    """
+    Returns the given document with the given identifier. The fields are copied over to a new
+    document if the document can enumerate them, otherwise the document is wrapped.
+    """
+    if document.document_id == document_id:
+        return document
+    try:
+        return InMemoryDocument(document_id, {name: document.get_field(name, None) for name in document.get_field_names()})
+    except NotImplementedError:
+        return _RenumberedDocument(document, document_id)
+
+
+class _RenumberedDocument(Document):
+    """
+    Gives an existing document a new identifier, and otherwise defers to that document. Used for
+    documents that can't enumerate their fields, and that we hence can't copy.
+    """
+
+    __slots__ = ("__document", "__document_id")
+
+    def __init__(self, document: Document, document_id: int):
+        self.__document = document
+        self.__document_id = document_id
+
+    def __repr__(self):
+        return str({"document_id": self.__document_id, "document": self.__document})
+
+    def get_document_id(self) -> int:
+        return self.__document_id
+
+    def get_field(self, field_name: str, default: Any) -> Any:
+        return self.__document.get_field(field_name, default)
+
+    def set_field(self, field_name: str, field_value: Any) -> None:
+        self.__document.set_field(field_name, field_value)
+
+    def get_field_names(self) -> Iterable[str]:
+        return self.__document.get_field_names()
+
+
+_MISSING = object()  # Tells absent fields apart from fields that are None.
+
+_BATCH_SIZE = 256  # The number of documents that we pass through the pipeline at a time when loading.
+
+
+def _load_lines(task: Tuple[str, int, int, Callable[[str], Optional[Dict[str, Any]]], DocumentPipeline,
+                            Optional[List[str]], Optional[str]]) -> Tuple[List[Document], int, List[Dict[str, Any]]]:
+    """
+    Parses and processes all lines in a file that start within the given byte range [start, end).
+    Returns the documents that survived the pipeline, in file order, together
+    with the number of records that were parsed and the pipeline's statistics. Records are numbered
+    from zero within the range, and the record numbers double as provisional document identifiers.
+    Documents are passed through the pipeline in batches. Meant to be run in a worker process, hence
+    defined at module level.
+    """
+    (filename, start, end, parser, pipeline, fields, source_field) = task
+    pipeline.reset_statistics()  # We're working on a copy, so only report what happens here.
+    documents = []
+    batch = []
+    records = 0
+
+    def flush():
+        for document in filter(None, pipeline.process_batch(batch)):
+            documents.append(_project(document, fields, source_field, document.document_id))
+        batch.clear()
+
+    with open(filename, mode="rb") as f:
+        if start > 0:
+            f.seek(start - 1)
+            f.readline()  # Skip the tail of a line that starts in the previous range.
+        while f.tell() < end:
+            line = f.readline()
+            if not line:
+                break
+            named_fields = parser(line.decode("utf-8"))
+            if named_fields is None:
+                continue
+            batch.append(InMemoryDocument(records, named_fields))
+            records += 1
+            if len(batch) == _BATCH_SIZE:
+                flush()
+    flush()
+    return (documents, records, pipeline.get_statistics())
+
+
 class Corpus(collections.abc.Iterable):
     """
     Abstract base class representing a corpus we can index and search over,
@@ -41,6 +208,50 @@ class Corpus(collections.abc.Iterable):
         """
         pass
 
+    def split(self, field_name: str, splitter: Optional[Callable[[Any], List[Any]]] = None) -> Dict[Any, Corpus]:
+        """
+        Divides the corpus up into multiple corpora, according to the value(s) of the
+        named field. I.e., splits the corpus up into several smaller corpora.
+
+        The value(s) of the named fields are used as keys for the splits. A custom splitter
+        function can optionally be provided, in case the named field is multi-valued and/or the
+        value(s) should be filtered or transformed in some way.
+
+        The splits are lightweight views over this corpus, and no documents are copied.
+        """
+        splitter = splitter if splitter else lambda v: [v]
+        splits = {}
+        for (position, document) in enumerate(self):
+            values = splitter(document.get_field(field_name, ""))
+            for value in values:
+                if value not in splits:
+                    splits[value] = array("L")
+                splits[value].append(position)
+        return {value: CorpusView(self, positions) for (value, positions) in splits.items()}
+
+
+class CorpusView(Corpus):
+    """
+    A lightweight view of a subset of the documents in another corpus, backed by a compact
+    array of positions into the other corpus. The view is read-through, so no documents are
+    copied. Documents keep the identifiers they have in the other corpus, so that position i in
+    the view is not necessarily the same as document identifier i.
+    """
+
+    def __init__(self, corpus: Corpus, positions: array):
+        self.__corpus = corpus
+        self.__positions = positions
+
+    def __iter__(self):
+        return (self.__corpus.get_document(position) for position in self.__positions)
+
+    def size(self) -> int:
+        return len(self.__positions)
+
+    def get_document(self, document_id: int) -> Document:
+        assert 0 <= document_id < len(self.__positions)
+        return self.__corpus.get_document(self.__positions[document_id])
+
 
 class InMemoryCorpus(Corpus):
     """
@@ -48,20 +259,40 @@ class InMemoryCorpus(Corpus):
     document collections.
 
     Document identifiers are assigned on a first-come first-serve basis.
+
+    When loading from file, the set of fields to keep can optionally be specified. Other fields
+    are then dropped after the pipeline has processed the document, so that memory is only spent
+    on fields we actually use. Optionally, a field can be added that points back to the record in
+    the file that the document was loaded from, i.e., the zero-based index of the record in the file.
+
+    When loading from file, the pipeline is run in batches. The document identifiers that the
+    pipeline sees are then provisional, and the surviving documents are renumbered afterwards.
+
+    Text and JSON files can optionally be loaded in parallel using multiple processes.
+    In that case the pipeline is run in the worker processes and must hence be picklable,
+    e.g., no lambdas. The pipeline's statistics are collected from the workers, too.
     """
 
-    def __init__(self, filename: Optional[str] = None, pipeline: Optional[DocumentPipeline] = None):
+    def __init__(self, filename: Optional[str] = None, pipeline: Optional[DocumentPipeline] = None, processes: int = 1,
+                 fields: Optional[Iterable[str]] = None, source_field: Optional[str] = None):
         self._documents = []
         pipeline = DocumentPipeline([]) if pipeline is None else pipeline
+        fields = None if fields is None else list(fields)
         if filename:
             if filename.endswith(".txt"):
-                self.__load_text(filename, pipeline)
+                if processes > 1:
+                    self.__load_parallel(filename, pipeline, _parse_text_line, processes, fields, source_field)
+                else:
+                    self.__load(self.__read_text(filename), pipeline, fields, source_field)
             elif filename.endswith(".xml"):
-                self.__load_xml(filename, pipeline)
+                self.__load(self.__read_xml(filename), pipeline, fields, source_field)
             elif filename.endswith(".json"):
-                self.__load_json(filename, pipeline)
+                if processes > 1:
+                    self.__load_parallel(filename, pipeline, _parse_json_line, processes, fields, source_field)
+                else:
+                    self.__load(self.__read_json(filename), pipeline, fields, source_field)
             elif filename.endswith(".csv"):
-                self.__load_csv(filename, pipeline)
+                self.__load(self.__read_csv(filename), pipeline, fields, source_field)
             else:
                 raise IOError("Unsupported extension")
 
@@ -84,95 +315,94 @@ class InMemoryCorpus(Corpus):
         self._documents.append(document)
         return self
 
-    def split(self, field_name: str, splitter: Optional[Callable[[Any], List[Any]]] = None) -> Dict[Any, InMemoryCorpus]:
+    def __load(self, records: Iterator[Dict[str, Any]], pipeline: DocumentPipeline,
+               fields: Optional[List[str]], source_field: Optional[str]) -> None:
         """
-        Divides the corpus up into multiple corpora, according to the value(s) of the
-        named field. I.e., splits the corpus up into several smaller corpora.
-
-        The value(s) of the named fields are used as keys for the splits. A custom splitter
-        function can optionally be provided, in case the named field is multi-valued and/or the
-        value(s) should be filtered or transformed in some way.
+        Runs the given records through the pipeline in batches and adds the surviving documents to
+        the corpus, keeping only the specified fields. The record numbers double as provisional
+        document identifiers while in the pipeline, and the surviving documents are renumbered so
+        that document identifiers are contiguous.
         """
-        splitter = splitter if splitter else lambda v: [v]
-        splits = {}
-        for document in self:
-            values = splitter(document.get_field(field_name, ""))
-            for value in values:
-                if value not in splits:
-                    splits[value] = InMemoryCorpus()
-                splits[value].add_document(document, False)
-        return splits
+        batch = []
+
+        def flush():
+            for document in filter(None, pipeline.process_batch(batch)):
+                document = _project(document, fields, source_field, document.document_id)
+                self.add_document(_renumber(document, len(self._documents)))
+            batch.clear()
 
-    def __load_text(self, filename: str, pipeline: DocumentPipeline) -> None:
+        for (record, named_fields) in enumerate(records):
+            batch.append(InMemoryDocument(record, named_fields))
+            if len(batch) == _BATCH_SIZE:
+                flush()
+        flush()
+
+    @staticmethod
+    def __read_text(filename: str) -> Iterator[Dict[str, Any]]:
         """
-        Loads documents from the given UTF-8 encoded text file. One document per line,
+        Reads records from the given UTF-8 encoded text file. One document per line,
         tab-separated fields. Empty lines are ignored. The first field gets named "body",
         the second field (optional) gets named "meta". All other fields are currently ignored.
         """
-        document_id = 0
         with open(filename, mode="r", encoding="utf-8") as f:
             for line in f:
-                anonymous_fields = line.strip().split("\t")
-                if len(anonymous_fields) == 1 and not anonymous_fields[0]:
-                    continue
-                named_fields = {"body": anonymous_fields[0]}
-                if len(anonymous_fields) >= 2:
-                    named_fields["meta"] = anonymous_fields[1]
-                document = pipeline(InMemoryDocument(document_id, named_fields))
-                if document:
-                    self.add_document(document)
-                    document_id += 1
-
-    def __load_xml(self, filename: str, pipeline: DocumentPipeline) -> None:
-        """
-        Loads documents from the given XML file. The schema is assumed to be
+                named_fields = _parse_text_line(line)
+                if named_fields is not None:
+                    yield named_fields
+
+    @staticmethod
+    def __read_xml(filename: str) -> Iterator[Dict[str, Any]]:
+        """
+        Reads records from the given XML file. The schema is assumed to be
         simple <doc> nodes. Each <doc> node gets mapped to a single document field
         named "body".
         """
-        from xml.dom.minidom import parse
+        return _parse_xml_file(filename)
 
-        def __get_text(nodes):
-            data = []
-            for node in nodes:
-                if node.nodeType == node.TEXT_NODE:
-                    data.append(node.data)
-            return " ".join(data)
-
-        dom = parse(filename)
-        document_id = 0
-        for body in [__get_text(n.childNodes) for n in dom.getElementsByTagName("doc")]:
-            document = pipeline(InMemoryDocument(document_id, {"body": body}))
-            if document:
-                self.add_document(document)
-                document_id += 1
-
-    def __load_csv(self, filename: str, pipeline: DocumentPipeline) -> None:
+    @staticmethod
+    def __read_csv(filename: str) -> Iterator[Dict[str, Any]]:
         """
-        Loads documents from the given UTF-8 encoded CSV file. One document per line.
+        Reads records from the given UTF-8 encoded CSV file. One document per line.
         """
         import csv
-        document_id = 0
         with open(filename, mode="r", encoding="utf-8") as f:
             reader = csv.DictReader(f)
             for row in reader:
-                document = pipeline(InMemoryDocument(document_id, dict(row)))
-                if document:
-                    self.add_document(document)
-                    document_id += 1
+                yield dict(row)
 
-    def __load_json(self, filename: str, pipeline: DocumentPipeline) -> None:
+    @staticmethod
+    def __read_json(filename: str) -> Iterator[Dict[str, Any]]:
         """
-        Loads documents from the given UTF-8 encoded JSON file. One document per line.
+        Reads records from the given UTF-8 encoded JSON file. One document per line.
         Lines that do not start with "{" are ignored.
         """
-        from json import loads
-        document_id = 0
         with open(filename, mode="r", encoding="utf-8") as f:
             for line in f:
-                line = line.strip()
-                if line.startswith("{"):
-                    named_fields = loads(line)
-                    document = pipeline(InMemoryDocument(document_id, named_fields))
-                    if document:
-                        self.add_document(document)
-                        document_id += 1
+                named_fields = _parse_json_line(line)
+                if named_fields is not None:
+                    yield named_fields
+
+    def __load_parallel(self, filename: str, pipeline: DocumentPipeline,
+                        parser: Callable[[str], Optional[Dict[str, Any]]], processes: int,
+                        fields: Optional[List[str]], source_field: Optional[str]) -> None:
+        """
+        Loads documents from the given UTF-8 encoded file in parallel. One document per line.
+        The file is split up into byte ranges that are parsed and processed by a pool of worker
+        processes. The results are collected in file order, so that document identifiers are
+        contiguous and assigned in the same order as if the file had been loaded sequentially.
+        """
+        from concurrent.futures import ProcessPoolExecutor
+        import os
+        size = os.path.getsize(filename)
+        chunks = processes * 4  # Smaller chunks than workers, to even out the load.
+        boundaries = [size * i // chunks for i in range(chunks + 1)]
+        tasks = [(filename, boundaries[i], boundaries[i + 1], parser, pipeline, fields, source_field) for i in range(chunks)]
+        records = 0  # Records are numbered locally per chunk, so offset them when collecting the documents.
+        with ProcessPoolExecutor(max_workers=processes) as executor:
+            for (documents, count, statistics) in executor.map(_load_lines, tasks):
+                pipeline.merge_statistics(statistics)
+                for document in documents:
+                    if source_field is not None:
+                        document.set_field(source_field, document.get_field(source_field, 0) + records)
+                    self.add_document(_renumber(document, len(self._documents)))
+                records += count
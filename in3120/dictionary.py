@@ -2,8 +2,11 @@
 # -*- coding: utf-8 -*-
 
 from abc import abstractmethod
+import bisect
 import collections.abc
-from typing import Optional
+from array import array
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+from .variablebytecodec import VariableByteCodec
 
 
 class Dictionary(collections.abc.Iterable):
@@ -13,6 +16,9 @@ class Dictionary(collections.abc.Iterable):
     that we can use the integers as direct indexes into arrays and other lookup structures.
     With N strings in total we want to map these to the integer set {0, .., N - 1}, i.e.,
     a minimal perfect hash.
+
+    Iterating over a dictionary yields (term, term identifier) pairs. Dictionaries that don't
+    store their terms raise a TypeError when iterated over.
     """
 
     def __len__(self):
@@ -40,6 +46,7 @@ class Dictionary(collections.abc.Iterable):
         """
         Adds a new term to the dictionary. If the term already exists in the dictionary,
         the dictionary is left unchanged. The associated term identifier is returned.
+        Read-only dictionaries raise a TypeError if asked to add a new term.
         """
 
     @abstractmethod
@@ -79,3 +86,529 @@ class InMemoryDictionary(Dictionary):
 
     def get_term_id(self, term: str) -> Optional[int]:
         return self._terms.get(term, None)
+
+
+class FrontCodedDictionary(Dictionary):
+    """
+    A compact, read-only dictionary that is built from an existing dictionary, suitable for
+    large vocabularies. See Section 5.2.2 in https://nlp.stanford.edu/IR-book/pdf/05comp.pdf
+    for details on front coding.
+
+    The terms are sorted by their UTF-8 encoding and divided into blocks of a fixed number of
+    consecutive terms. The first term in a block, i.e., the block head, is stored in full. Each
+    remaining term is stored as the length of the prefix it shares with its predecessor, followed
+    by the rest of the term. All blocks are stored back-to-back in a single buffer, and lengths
+    are variable-byte encoded. Lookups do a binary search over the block heads, and then decode
+    and scan a single block.
+
+    Since the terms are reordered, we keep an array that maps each term's sorted rank back to its
+    identifier in the original dictionary. Term identifiers are hence preserved.
+    """
+
+    def __init__(self, dictionary: Iterable[Tuple[str, int]], block_size: int = 16):
+        assert block_size > 0
+        pairs = sorted((term.encode("utf-8"), term_id) for (term, term_id) in dictionary)
+        self.__block_size = block_size
+        self.__buffer = bytearray()
+        self.__offsets = array("Q")  # Where each block starts in the buffer.
+        self.__term_ids = array("I", (term_id for (_, term_id) in pairs))  # Maps sorted ranks to term identifiers.
+        previous = b""
+        for (rank, (term, _)) in enumerate(pairs):
+            if rank % block_size == 0:
+                self.__offsets.append(len(self.__buffer))
+                shared = 0
+            else:
+                shared = __class__.__get_shared_length(previous, term)
+                VariableByteCodec.encode(shared, self.__buffer)
+            VariableByteCodec.encode(len(term) - shared, self.__buffer)
+            self.__buffer.extend(memoryview(term)[shared:])
+            previous = term
+
+    def __iter__(self) -> Iterator[Tuple[str, int]]:
+        for block in range(len(self.__offsets)):
+            for (rank, term) in self.__decode_block(block):
+                yield (str(term, "utf-8"), self.__term_ids[rank])
+
+    def size(self) -> int:
+        return len(self.__term_ids)
+
+    def add_if_absent(self, term: str) -> int:
+        term_id = self.get_term_id(term)
+        if term_id is None:
+            raise TypeError("The dictionary is read-only")
+        return term_id
+
+    def get_term_id(self, term: str) -> Optional[int]:
+        key = term.encode("utf-8")
+        buffer = self.__buffer
+        lower, upper = 0, len(self.__offsets)  # Find the last block whose head is not greater than the key.
+        while upper - lower > 1:
+            middle = (lower + upper) // 2
+            where = self.__offsets[middle]
+            length = buffer[where] - 128  # Fast path for terms shorter than 128 bytes.
+            head = buffer[where + 1:where + 1 + length] if length >= 0 else self.__decode_head(middle)
+            if head <= key:
+                lower = middle
+            else:
+                upper = middle
+        for (rank, candidate) in self.__decode_block(lower):
+            if candidate == key:
+                return self.__term_ids[rank]
+            if candidate > key:
+                break
+        return None
+
+    def get_buffer_size(self) -> int:
+        """
+        Returns the size of the buffer that holds the front-coded terms, in bytes.
+        """
+        return len(self.__buffer)
+
+    def __decode_head(self, block: int) -> bytes:
+        (length, where) = __class__.__decode_number(self.__buffer, self.__offsets[block])
+        return bytes(self.__buffer[where:where + length])
+
+    def __decode_block(self, block: int) -> Iterator[Tuple[int, bytes]]:
+        """
+        Yields (rank, term) pairs for all terms in the given block, with the terms as UTF-8 encoded bytes.
+        """
+        buffer = self.__buffer
+        first = block * self.__block_size
+        where = self.__offsets[block] if block < len(self.__offsets) else len(buffer)
+        term = b""
+        for rank in range(first, min(first + self.__block_size, len(self.__term_ids))):
+            shared = 0
+            if rank > first:
+                shared = buffer[where] - 128  # Fast path for single-byte numbers.
+                if shared >= 0:
+                    where += 1
+                else:
+                    (shared, where) = __class__.__decode_number(buffer, where)
+            length = buffer[where] - 128
+            if length >= 0:
+                where += 1
+            else:
+                (length, where) = __class__.__decode_number(buffer, where)
+            term = term[:shared] + buffer[where:where + length]
+            where += length
+            yield (rank, term)
+
+    @staticmethod
+    def __decode_number(source: bytearray, where: int) -> Tuple[int, int]:
+        """
+        Decodes a number in the format that VariableByteCodec produces, and returns the number together
+        with the position right after it. Unlike VariableByteCodec.decode we cannot sanity check the
+        preceding byte, since the numbers are interleaved with term bytes.
+        """
+        number = 0
+        while True:
+            byte = source[where]
+            where += 1
+            if byte < 128:
+                number = 128 * number + byte
+            else:
+                return (128 * number + byte - 128, where)
+
+    @staticmethod
+    def __get_shared_length(term1: bytes, term2: bytes) -> int:
+        shared = 0
+        for (byte1, byte2) in zip(term1, term2):
+            if byte1 != byte2:
+                break
+            shared += 1
+        return shared
+
+
+class PerfectHashDictionary(Dictionary):
+    """
+    A compact, read-only dictionary that is built from an existing dictionary, and that is backed
+    by a minimal perfect hash function. Suitable for frozen vocabularies, e.g., for serving.
+
+    The hash function is constructed using the "hash, displace and compress" (CHD) approach, see
+    http://cmph.sourceforge.net/papers/esa09.pdf for details. The terms are first hashed into
+    buckets, holding two terms on average. The buckets are then processed from largest to smallest,
+    and for each bucket we search for a displacement value that, when mixed into a second hash
+    function, maps all terms in the bucket to distinct slots in the table that are still vacant.
+    Buckets with a single term are placed directly into the remaining vacant slots, and buckets
+    without terms need no displacement. A lookup then amounts to computing two hashes, i.e., O(1).
+
+    The terms themselves are not stored, so we can't iterate over them. Instead, each slot holds a
+    16-bit fingerprint of the term that was placed there. Out-of-vocabulary terms are rejected if
+    their fingerprint doesn't match. This is probabilistic: About 1 in 65536 out-of-vocabulary terms
+    will be reported as being present, with the identifier of some arbitrary other term.
+
+    Since the terms are placed in hash order, we keep an array that maps each slot back to the term's
+    identifier in the original dictionary. Term identifiers are hence preserved.
+
+    All hashes are derived from Python's built-in string hash, run through a mixing function. Note that
+    Python's string hashes are randomized per process, so the structure cannot be persisted or shipped
+    to other processes as is.
+    """
+
+    __MASK = (1 << 64) - 1
+
+    def __init__(self, dictionary: Iterable[Tuple[str, int]]):
+        pairs = list(dictionary)
+        size = len(pairs)
+        buckets: List[List[int]] = [[] for _ in range((size + 1) // 2)]
+        hashes = [hash(term) for (term, _) in pairs]
+        for (i, h) in enumerate(hashes):
+            buckets[h % len(buckets)].append(i)
+        self.__displacements = array("i", bytes(4 * len(buckets)))  # One per bucket. See above.
+        self.__fingerprints = array("H", bytes(2 * size))  # One per slot.
+        self.__term_ids = array("I", bytes(4 * size))  # One per slot.
+        vacant = bytearray(b"\x01" * size)
+        order = sorted(range(len(buckets)), key=lambda b: len(buckets[b]), reverse=True)
+        singletons = 0
+        for bucket in order:
+            if len(buckets[bucket]) < 2:
+                singletons += 1
+                continue
+            displacement = 1
+            while True:
+                slots = [__class__.__mix(hashes[i], displacement) % size for i in buckets[bucket]]
+                if len(set(slots)) == len(slots) and all(vacant[slot] for slot in slots):
+                    break
+                displacement += 1
+            self.__displacements[bucket] = displacement
+            for (i, slot) in zip(buckets[bucket], slots):
+                self.__place(pairs[i][1], hashes[i], slot, vacant)
+        slots = (slot for (slot, available) in enumerate(vacant) if available)
+        for bucket in order[len(order) - singletons:]:
+            if buckets[bucket]:
+                slot = next(slots)
+                self.__displacements[bucket] = -slot - 1
+                self.__place(pairs[buckets[bucket][0]][1], hashes[buckets[bucket][0]], slot, vacant)
+
+    def __iter__(self) -> Iterator[Tuple[str, int]]:
+        raise TypeError("PerfectHashDictionary does not store its terms, so it can't be iterated over")
+
+    def size(self) -> int:
+        return len(self.__term_ids)
+
+    def add_if_absent(self, term: str) -> int:
+        term_id = self.get_term_id(term)
+        if term_id is None:
+            raise TypeError("The dictionary is read-only")
+        return term_id
+
+    def get_term_id(self, term: str) -> Optional[int]:
+        if not self.__term_ids:
+            return None
+        h = hash(term)
+        displacement = self.__displacements[h % len(self.__displacements)]
+        slot = -displacement - 1 if displacement < 0 else __class__.__mix(h, displacement) % len(self.__term_ids)
+        if self.__fingerprints[slot] != (h >> 48) & 0xFFFF:
+            return None
+        return self.__term_ids[slot]
+
+    def __place(self, term_id: int, h: int, slot: int, vacant: bytearray) -> None:
+        vacant[slot] = 0
+        self.__fingerprints[slot] = (h >> 48) & 0xFFFF
+        self.__term_ids[slot] = term_id
+
+    @staticmethod
+    def __mix(h: int, seed: int) -> int:
+        """
+        Derives a well-mixed 64-bit hash from the given hash and seed, using the SplitMix64 finalizer.
+        We can't just hash (seed, term) tuples, since the low bits of tuple hashes are too correlated.
+        """
+        x = (h + seed * 0x9E3779B97F4A7C15) & __class__.__MASK
+        x = ((x ^ (x >> 30)) * 0xBF58476D1CE4E5B9) & __class__.__MASK
+        x = ((x ^ (x >> 27)) * 0x94D049BB133111EB) & __class__.__MASK
+        return x ^ (x >> 31)
+
+
+class TermStatistics:
+    """
+    Per-term metadata that complements a dictionary, stored in parallel arrays that are indexed by
+    term identifier. Keeping this next to the dictionary allows rankers and query planners to look
+    up statistics for a term without having to touch the term's posting list, which is essential
+    if the posting lists reside on disk.
+
+    For each term we store the document frequency (the number of postings), the collection
+    frequency (the sum of the term frequencies), and the maximum term frequency. Where the postings
+    reside is up to the posting lists, or to the on-disk format, e.g., as in DiskInvertedIndex.
+
+    Statistics are accumulated by adding postings in document order.
+    """
+
+    def __init__(self):
+        self.__document_frequencies = array("I")
+        self.__collection_frequencies = array("Q")
+        self.__maximum_term_frequencies = array("I")
+        self.__last_document_ids = array("Q")  # So that we can check the ordering. Only needed until finalized.
+
+    def __len__(self):
+        return len(self.__document_frequencies)
+
+    def add_posting(self, term_id: int, document_id: int, term_frequency: int) -> None:
+        """
+        Updates the statistics for the given term with a new posting. Term identifiers are
+        assumed assigned on a first-come first-serve basis.
+        """
+        if term_id == len(self.__document_frequencies):
+            for values in (self.__document_frequencies, self.__collection_frequencies, self.__maximum_term_frequencies,
+                           self.__last_document_ids):
+                values.append(0)
+        assert self.__document_frequencies[term_id] == 0 or document_id > self.__last_document_ids[term_id]
+        self.__last_document_ids[term_id] = document_id
+        self.__document_frequencies[term_id] += 1
+        self.__collection_frequencies[term_id] += term_frequency
+        self.__maximum_term_frequencies[term_id] = max(self.__maximum_term_frequencies[term_id], term_frequency)
+
+    def finalize(self) -> None:
+        """
+        Signals that there will be no more postings added, so that we can release what's only
+        needed while adding postings.
+        """
+        self.__last_document_ids = array("Q")
+
+    def get_document_frequency(self, term_id: int) -> int:
+        return self.__document_frequencies[term_id]
+
+    def get_collection_frequency(self, term_id: int) -> int:
+        return self.__collection_frequencies[term_id]
+
+    def get_maximum_term_frequency(self, term_id: int) -> int:
+        return self.__maximum_term_frequencies[term_id]
+
+    def get_record(self, term_id: int) -> Dict[str, int]:
+        """
+        Returns all statistics for the given term.
+        """
+        return {"document_frequency": self.__document_frequencies[term_id],
+                "collection_frequency": self.__collection_frequencies[term_id],
+                "maximum_term_frequency": self.__maximum_term_frequencies[term_id]}
+
+
+class AutomatonDictionary(Dictionary):
+    """
+    A compact, read-only dictionary that is built from an existing dictionary, and that is backed
+    by a minimal deterministic acyclic finite state automaton (DAWG) over the sorted vocabulary.
+    Terms that share prefixes share paths from the start state, and, since the automaton is
+    minimal, terms that share suffixes share paths into the final states. Besides plain lookups,
+    the automaton supports efficient enumeration of all terms that have a given prefix, or of all
+    terms that fall within a given range. This is useful for, e.g., wildcard queries and autocomplete.
+
+    The automaton is built incrementally from the sorted terms, using the algorithm described in
+    https://aclanthology.org/J00-1002.pdf, and is then frozen into flat arrays. For each state we store
+    where its transitions start and whether it's final, and for each transition we store its label,
+    its target state and an output. The outputs are chosen such that summing them along the path that
+    spells out a term gives the term's rank in sorted order, i.e., the automaton acts as a transducer
+    that maps terms to the integers {0, ..., N - 1}. See https://doi.org/10.1007/3-540-60044-2_44.
+
+    Terms are sorted by code point. Since the terms are reordered, we keep an array that maps each
+    term's sorted rank back to its identifier in the original dictionary. Term identifiers are hence
+    preserved.
+    """
+
+    class __State:
+        """
+        A state in the automaton under construction. Transitions are added in sorted order.
+        """
+        __slots__ = ("final", "transitions")
+
+        def __init__(self):
+            self.final = False
+            self.transitions: Dict[str, Any] = {}
+
+        def get_signature(self) -> Tuple:
+            return (self.final, tuple((label, id(target)) for (label, target) in self.transitions.items()))
+
+    def __init__(self, dictionary: Iterable[Tuple[str, int]]):
+        pairs = sorted(dictionary)
+        self.__term_ids = array("I", (term_id for (_, term_id) in pairs))  # Maps sorted ranks to term identifiers.
+        self.__freeze(self.__build(term for (term, _) in pairs))
+
+    def __iter__(self) -> Iterator[Tuple[str, int]]:
+        return self.__enumerate(0, "", 0, self.__firsts[0], True)
+
+    def size(self) -> int:
+        return len(self.__term_ids)
+
+    def add_if_absent(self, term: str) -> int:
+        term_id = self.get_term_id(term)
+        if term_id is None:
+            raise TypeError("The dictionary is read-only")
+        return term_id
+
+    def get_term_id(self, term: str) -> Optional[int]:
+        (state, rank) = self.__walk(term)
+        if state is None or not self.__finals[state]:
+            return None
+        return self.__term_ids[rank]
+
+    def iter_prefix(self, prefix: str) -> Iterator[Tuple[str, int]]:
+        """
+        Yields all (term, term identifier) pairs where the term starts with the given prefix,
+        in sorted order.
+        """
+        (state, rank) = self.__walk(prefix)
+        if state is not None:
+            yield from self.__enumerate(state, prefix, rank, self.__firsts[state], True)
+
+    def iter_range(self, lower: str, upper: Optional[str] = None) -> Iterator[Tuple[str, int]]:
+        """
+        Yields all (term, term identifier) pairs where the term is in the range [lower, upper),
+        in sorted order. If no upper bound is given, the range is open-ended.
+        """
+        for (term, term_id) in self.__enumerate_from(lower):
+            if upper is not None and term >= upper:
+                break
+            yield (term, term_id)
+
+    def get_state_count(self) -> int:
+        return len(self.__finals)
+
+    def get_transition_count(self) -> int:
+        return len(self.__labels)
+
+    def __walk(self, prefix: str) -> Tuple[Optional[int], int]:
+        """
+        Follows the path that spells out the given prefix from the start state. Returns the state where
+        we end up together with the sum of the outputs along the way, or (None, 0) if there is no such path.
+        """
+        (firsts, labels) = (self.__firsts, self.__labels)
+        (state, rank) = (0, 0)
+        for symbol in prefix:
+            (lower, upper) = (firsts[state], firsts[state + 1])
+            i = bisect.bisect_left(labels, ord(symbol), lower, upper)
+            if i == upper or labels[i] != ord(symbol):
+                return (None, 0)
+            rank += self.__outputs[i]
+            state = self.__targets[i]
+        return (state, rank)
+
+    def __enumerate(self, state: int, prefix: str, rank: int, start: int, inclusive: bool) -> Iterator[Tuple[str, int]]:
+        """
+        Yields all (term, term identifier) pairs reachable from the given state, in sorted order. Only
+        transitions from the given start index and onwards are followed out of the given state, and the
+        prefix itself is only included if so specified. Traverses the automaton depth-first, using an
+        explicit stack so that we don't run into recursion limits for long terms.
+        """
+        if inclusive and self.__finals[state]:
+            yield (prefix, self.__term_ids[rank])
+        stack = [(state, prefix, rank, start)]
+        while stack:
+            (state, prefix, rank, i) = stack.pop()
+            if i >= self.__firsts[state + 1]:
+                continue
+            stack.append((state, prefix, rank, i + 1))
+            (target, term, total) = (self.__targets[i], prefix + chr(self.__labels[i]), rank + self.__outputs[i])
+            if self.__finals[target]:
+                yield (term, self.__term_ids[total])
+            stack.append((target, term, total, self.__firsts[target]))
+
+    def __enumerate_from(self, lower: str) -> Iterator[Tuple[str, int]]:
+        """
+        Yields all (term, term identifier) pairs where the term is not less than the given lower bound,
+        in sorted order. We follow the path that spells out the lower bound as far as we can. Along the
+        way, we keep track of the transitions whose labels exceed the lower bound's symbol at that depth,
+        since everything below these transitions is greater than the lower bound.
+        """
+        (firsts, labels) = (self.__firsts, self.__labels)
+        (state, prefix, rank) = (0, "", 0)
+        pending = []
+        for symbol in lower:
+            (first, last) = (firsts[state], firsts[state + 1])
+            i = bisect.bisect_left(labels, ord(symbol), first, last)
+            exact = i < last and labels[i] == ord(symbol)
+            pending.append((state, prefix, rank, i + 1 if exact else i))
+            if not exact:
+                break
+            (state, prefix, rank) = (self.__targets[i], prefix + symbol, rank + self.__outputs[i])
+        else:
+            yield from self.__enumerate(state, prefix, rank, firsts[state], True)
+        for (state, prefix, rank, start) in reversed(pending):
+            yield from self.__enumerate(state, prefix, rank, start, False)
+
+    @staticmethod
+    def __build(terms: Iterable[str]) -> Any:
+        """
+        Builds a minimal automaton from the given terms, which must be sorted and distinct. Returns the
+        start state. States are minimized as soon as we know that no more transitions will be added to them,
+        by replacing them with equivalent states that we have already seen, if any.
+        """
+        root = __class__.__State()
+        register = {}  # Maps state signatures to the unique minimized state having that signature.
+        unchecked = []  # The (parent, label, child) triples along the path of the previous term, not yet minimized.
+
+        def __minimize(depth: int) -> None:
+            while len(unchecked) > depth:
+                (parent, label, child) = unchecked.pop()
+                signature = child.get_signature()
+                if signature in register:
+                    parent.transitions[label] = register[signature]
+                else:
+                    register[signature] = child
+
+        previous = ""
+        for term in terms:
+            common = 0
+            while common < min(len(term), len(previous)) and term[common] == previous[common]:
+                common += 1
+            __minimize(common)
+            state = unchecked[-1][2] if unchecked else root
+            for symbol in term[common:]:
+                child = __class__.__State()
+                state.transitions[symbol] = child
+                unchecked.append((state, symbol, child))
+                state = child
+            state.final = True
+            previous = term
+        __minimize(0)
+        return root
+
+    def __freeze(self, root: Any) -> None:
+        """
+        Converts the automaton into flat arrays, and computes the transition outputs. States are numbered
+        in depth-first order with the start state as state 0, and their transitions are laid out back-to-back
+        in that order.
+        """
+        numbers = {id(root): 0}
+        states = [root]
+        for state in states:  # Grows as we go.
+            for target in state.transitions.values():
+                if id(target) not in numbers:
+                    numbers[id(target)] = len(states)
+                    states.append(target)
+        counts = [0] * len(states)  # The number of terms reachable from each state.
+        for number in __class__.__get_postorder(root, numbers, len(states)):
+            state = states[number]
+            counts[number] = int(state.final) + sum(counts[numbers[id(t)]] for t in state.transitions.values())
+        self.__firsts = array("I")
+        self.__finals = bytearray(len(states))
+        self.__labels = array("I")
+        self.__targets = array("I")
+        self.__outputs = array("I")
+        for (number, state) in enumerate(states):
+            self.__firsts.append(len(self.__labels))
+            self.__finals[number] = state.final
+            output = int(state.final)
+            for (label, target) in state.transitions.items():
+                self.__labels.append(ord(label))
+                self.__targets.append(numbers[id(target)])
+                self.__outputs.append(output)
+                output += counts[numbers[id(target)]]
+        self.__firsts.append(len(self.__labels))
+
+    @staticmethod
+    def __get_postorder(root: Any, numbers: Dict[int, int], size: int) -> List[int]:
+        """
+        Returns the state numbers such that each state comes after all states it has transitions into.
+        """
+        order = []
+        visited = bytearray(size)
+        stack = [(root, iter(root.transitions.values()))]
+        visited[0] = 1
+        while stack:
+            (state, targets) = stack[-1]
+            target = next(targets, None)
+            if target is None:
+                stack.pop()
+                order.append(numbers[id(state)])
+            elif not visited[numbers[id(target)]]:
+                visited[numbers[id(target)]] = 1
+                stack.append((target, iter(target.transitions.values())))
+        return order
@@ -0,0 +1,323 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+from __future__ import annotations
+import mmap
+import os
+import struct
+import sys
+import tempfile
+import zlib
+from array import array
+from typing import Any, BinaryIO, Dict, Iterable, Iterator, Optional, Tuple, Union
+from .invertedindex import InvertedIndex, InMemoryInvertedIndex
+from .normalizer import Normalizer
+from .posting import Posting
+from .postinglist import CompressedInMemoryPostingList, CursorPostingListIterator, IteratorPostingListCursor, PostingListCursor
+from .tokenizer import Tokenizer
+from .variablebytecodec import VariableByteCodec
+
+
+class DiskInvertedIndex(InvertedIndex):
+    """
+    A read-only inverted index that resides in a file on disk. The file is memory-mapped, and
+    nothing is decoded up front: Terms are looked up by binary search directly in the mapped
+    dictionary, and posting lists are decoded directly from the mapped buffer as they're traversed.
+    Opening an index is thus cheap regardless of its size, and the operating system only pages
+    in the parts of the file that we actually touch.
+
+    The file layout is as follows, with all integers stored little-endian:
+
+        header:   magic (8 bytes), version (u32), skip interval (u32), document count (u64), term count (u64),
+                  records offset (u64), term offsets offset (u64), terms offset (u64), postings checksum (u32),
+                  dictionary checksum (u32), header checksum (u32)
+        postings: the posting lists, back-to-back, see below
+        records:  one record per term, in term order, see below
+        offsets:  one byte offset (u64) per term into the terms section, plus one for the end of it
+        terms:    the terms, UTF-8 encoded and sorted, back-to-back
+
+    A term record is comprised of the postings offset (u64), the postings length (u64), the number
+    of skip entries (u32), the document frequency (u32), the collection frequency (u64), and the
+    maximum term frequency (u32), padded to 40 bytes. Rankers can thus get at a term's statistics
+    without touching its postings. A posting
+    list is laid out like in CompressedInMemoryPostingList, i.e., as variable-byte encoded document
+    identifier gaps and term frequencies. If the posting list has skip entries, these follow at the
+    next 8-byte boundary: First the document identifiers (u64) and then the byte offsets (u64) where
+    each block of skip interval postings starts. The records and offsets sections are 8-byte aligned.
+
+    The checksums are CRC-32 values. The postings checksum covers the postings section, the dictionary
+    checksum covers the records, offsets and terms sections, and the header checksum covers the rest of
+    the header. Only the header checksum is verified when opening an index, since verifying the others
+    means reading the whole file. Use the verify method for that.
+
+    Use DiskInvertedIndexWriter or the write method to create such a file.
+    """
+
+    MAGIC = b"IN3120IX"
+    VERSION = 3
+
+    HEADER = struct.Struct("<8sIIQQQQQIII")
+    RECORD = struct.Struct("<QQIIQI4x")
+
+    def __init__(self, filename: str, normalizer: Normalizer, tokenizer: Tokenizer):
+        self.__normalizer = normalizer
+        self.__tokenizer = tokenizer
+        with open(filename, mode="rb") as f:
+            if os.fstat(f.fileno()).st_size < __class__.HEADER.size:
+                raise IOError("Unsupported inverted index format")
+            self.__mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        (magic, version, skip_interval, document_count, term_count, records_offset, offsets_offset, terms_offset,
+         postings_checksum, dictionary_checksum, header_checksum) = __class__.HEADER.unpack_from(self.__mmap, 0)
+        if magic != __class__.MAGIC or version != __class__.VERSION or skip_interval != CompressedInMemoryPostingList.SKIP_INTERVAL:
+            self.__mmap.close()
+            raise IOError("Unsupported inverted index format")
+        if zlib.crc32(self.__mmap[:__class__.HEADER.size - 4]) != header_checksum:
+            self.__mmap.close()
+            raise IOError("Corrupt inverted index header")
+        self.__document_count = document_count
+        self.__term_count = term_count
+        self.__records_offset = records_offset
+        self.__terms_offset = terms_offset
+        self.__checksums = (postings_checksum, dictionary_checksum)
+        self.__buffer = memoryview(self.__mmap)
+        self.__offsets: Union[memoryview, array] = self.__buffer[offsets_offset:offsets_offset + 8 * (term_count + 1)].cast("Q")
+        if sys.byteorder != "little":
+            self.__offsets = array("Q", self.__offsets)
+            self.__offsets.byteswap()
+
+    def get_terms(self, buffer: str) -> Iterator[str]:
+        tokens = self.__tokenizer.strings(self.__normalizer.canonicalize(buffer))
+        return (self.__normalizer.normalize(t) for t in tokens)
+
+    def get_postings_iterator(self, term: str) -> Iterator[Posting]:
+        return CursorPostingListIterator(self.get_postings_cursor(term))
+
+    def get_postings_cursor(self, term: str) -> PostingListCursor:
+        record = self.__get_record(term)
+        if record is None:
+            return IteratorPostingListCursor(iter([]))
+        (postings_offset, postings_length, skip_count, document_frequency, _, _) = record
+        (skip_document_ids, skip_offsets) = (None, None)
+        if skip_count > 0:
+            start = postings_offset + postings_length + (-postings_length % 8)
+            skips = self.__buffer[start:start + 16 * skip_count].cast("Q")
+            if sys.byteorder != "little":
+                skips = array("Q", skips)
+                skips.byteswap()
+            (skip_document_ids, skip_offsets) = (skips[:skip_count], skips[skip_count:])
+        return CompressedInMemoryPostingList.CompressedInMemoryPostingListCursor(
+            self.__buffer[postings_offset:postings_offset + postings_length], document_frequency, skip_document_ids, skip_offsets)
+
+    def get_document_frequency(self, term: str) -> int:
+        record = self.__get_record(term)
+        return 0 if record is None else record[3]
+
+    def get_term_statistics(self, term: str) -> Optional[Dict[str, Any]]:
+        record = self.__get_record(term)
+        if record is None:
+            return None
+        return {"document_frequency": record[3], "collection_frequency": record[4], "maximum_term_frequency": record[5]}
+
+    def get_document_count(self) -> int:
+        """
+        Returns the number of documents in the indexed corpus.
+        """
+        return self.__document_count
+
+    def get_vocabulary(self) -> Iterator[str]:
+        """
+        Returns all the indexed terms, in sorted order.
+        """
+        if self.__mmap is None:
+            raise ValueError("The inverted index is closed")
+        return (self.__get_term(i) for i in range(self.__term_count))
+
+    def verify(self) -> None:
+        """
+        Verifies the postings and dictionary checksums, and raises an IOError if there's a mismatch.
+        Reads the whole file.
+        """
+        postings_checksum = zlib.crc32(self.__buffer[__class__.HEADER.size:self.__records_offset])
+        dictionary_checksum = zlib.crc32(self.__buffer[self.__records_offset:])
+        if (postings_checksum, dictionary_checksum) != self.__checksums:
+            raise IOError("Corrupt inverted index")
+
+    def __enter__(self) -> DiskInvertedIndex:
+        return self
+
+    def __exit__(self, exception_type, exception_value, traceback) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """
+        Releases the underlying memory mapping. Cursors and iterators that are still in use remain
+        valid, and the mapping is then released once the last of them is gone. The index itself
+        can't be used after having been closed. Closing an index more than once has no effect.
+        """
+        if self.__mmap is None:
+            return
+        if isinstance(self.__offsets, memoryview):
+            self.__offsets.release()
+        self.__buffer.release()
+        try:
+            self.__mmap.close()
+        except BufferError:
+            pass  # Cursors still hold views into the mapping, and keep it alive until they're gone.
+        self.__mmap = None
+
+    def __get_term(self, i: int) -> str:
+        return str(self.__mmap[self.__terms_offset + self.__offsets[i]:self.__terms_offset + self.__offsets[i + 1]], "utf-8")
+
+    def __get_record(self, term: str) -> Optional[Tuple[int, int, int, int, int, int]]:
+        # UTF-8 preserves the ordering of code points, so we can binary search over the encoded terms.
+        if self.__mmap is None:
+            raise ValueError("The inverted index is closed")
+        encoded = term.encode("utf-8")
+        (low, high) = (0, self.__term_count)
+        while low < high:
+            middle = (low + high) // 2
+            candidate = self.__mmap[self.__terms_offset + self.__offsets[middle]:self.__terms_offset + self.__offsets[middle + 1]]
+            if candidate < encoded:
+                low = middle + 1
+            elif candidate == encoded:
+                return __class__.RECORD.unpack_from(self.__buffer, self.__records_offset + middle * __class__.RECORD.size)
+            else:
+                high = middle
+        return None
+
+    @staticmethod
+    def write(index: InMemoryInvertedIndex, filename: str) -> None:
+        """
+        Serializes the given in-memory inverted index, and writes it to the named file. The posting
+        lists are streamed, one at a time. Positions, if any, are not preserved. Raises a TypeError,
+        without creating the file, if the index can't enumerate its terms.
+        """
+        terms = sorted(index.get_vocabulary())
+        with DiskInvertedIndexWriter(filename, index.get_document_count()) as writer:
+            for term in terms:
+                writer.add_term(term, __class__.__pairs(index.get_postings_cursor(term)))
+
+    @staticmethod
+    def __pairs(cursor: PostingListCursor) -> Iterator[Tuple[int, int]]:
+        while cursor.next():
+            yield (cursor.document_id, cursor.term_frequency)
+
+
+class DiskInvertedIndexWriter:
+    """
+    Writes an inverted index to a file, in the format that DiskInvertedIndex reads. The terms have to
+    be added in sorted order, each together with its postings in document order. The postings are
+    encoded and written as we go, so only the dictionary is kept in memory.
+
+    The index is written to a temporary file next to the named one, and is moved into place when
+    closing. Readers thus never see a partially written index. If the writer is used as a context
+    manager and an exception escapes, the temporary file is removed instead.
+    """
+
+    def __init__(self, filename: str, document_count: int):
+        self.__filename = filename
+        (descriptor, self.__temporary) = tempfile.mkstemp(prefix=os.path.basename(filename) + ".",
+                                                          suffix=".tmp", dir=os.path.dirname(os.path.abspath(filename)))
+        self.__file: BinaryIO = open(descriptor, mode="wb")
+        self.__document_count = document_count
+        self.__records = bytearray()
+        self.__offsets = array("Q", [0])
+        self.__terms = bytearray()
+        self.__previous: Optional[str] = None
+        self.__checksum = 0  # The running checksum of the postings section.
+        self.__file.write(bytes(DiskInvertedIndex.HEADER.size))  # Filled in when closing.
+
+    def __enter__(self) -> DiskInvertedIndexWriter:
+        return self
+
+    def __exit__(self, exception_type, exception_value, traceback) -> None:
+        if exception_type is None:
+            self.close()
+        else:
+            self.discard()
+
+    def add_term(self, term: str, postings: Iterable[Tuple[int, int]]) -> int:
+        """
+        Encodes and writes the posting list for the given term. The postings are given as (document
+        identifier, term frequency) pairs, in document order. Returns the number of postings written.
+        Empty posting lists are skipped.
+        """
+        assert self.__previous is None or self.__previous < term, "terms must be added in sorted order"
+        skip_interval = CompressedInMemoryPostingList.SKIP_INTERVAL
+        start = self.__file.tell()
+        (skip_document_ids, skip_offsets) = (array("Q"), array("Q"))
+        (buffer, written, numbers) = (bytearray(), 0, [])
+        (document_frequency, collection_frequency, maximum_term_frequency, previous_document_id) = (0, 0, 0, 0)
+        for (document_id, term_frequency) in postings:
+            assert document_frequency == 0 or document_id > previous_document_id
+            if document_frequency > 0 and document_frequency % skip_interval == 0:
+                VariableByteCodec.encode_many(numbers, buffer)
+                numbers.clear()
+                skip_document_ids.append(previous_document_id)
+                skip_offsets.append(written + len(buffer))
+                if len(buffer) >= 1 << 16:
+                    self.__write(buffer)
+                    written += len(buffer)
+                    buffer.clear()
+            numbers.append(document_id - previous_document_id)
+            numbers.append(term_frequency)
+            document_frequency += 1
+            collection_frequency += term_frequency
+            maximum_term_frequency = max(maximum_term_frequency, term_frequency)
+            previous_document_id = document_id
+        if document_frequency == 0:
+            return 0
+        VariableByteCodec.encode_many(numbers, buffer)
+        written += len(buffer)
+        if skip_offsets:
+            buffer.extend(bytes(-written % 8))  # Align the skip entries.
+            if sys.byteorder != "little":
+                skip_document_ids.byteswap()
+                skip_offsets.byteswap()
+            buffer.extend(skip_document_ids.tobytes())
+            buffer.extend(skip_offsets.tobytes())
+        self.__write(buffer)
+        self.__records.extend(DiskInvertedIndex.RECORD.pack(start, written, len(skip_offsets), document_frequency,
+                                                             collection_frequency, maximum_term_frequency))
+        self.__terms.extend(term.encode("utf-8"))
+        self.__offsets.append(len(self.__terms))
+        self.__previous = term
+        return document_frequency
+
+    def close(self) -> None:
+        """
+        Writes the dictionary and the header, closes the file, and moves it into place.
+        """
+        if self.__file.closed:
+            return
+        self.__write(bytes(-self.__file.tell() % 8))  # Align the records.
+        records_offset = self.__file.tell()
+        if sys.byteorder != "little":
+            self.__offsets.byteswap()
+        dictionary = self.__records + self.__offsets.tobytes() + self.__terms
+        self.__file.write(dictionary)
+        offsets_offset = records_offset + len(self.__records)
+        terms_offset = offsets_offset + 8 * len(self.__offsets)
+        header = DiskInvertedIndex.HEADER.pack(DiskInvertedIndex.MAGIC, DiskInvertedIndex.VERSION,
+                                               CompressedInMemoryPostingList.SKIP_INTERVAL, self.__document_count,
+                                               len(self.__offsets) - 1, records_offset, offsets_offset, terms_offset,
+                                               self.__checksum, zlib.crc32(dictionary), 0)
+        self.__file.seek(0)
+        self.__file.write(header[:-4])
+        self.__file.write(struct.pack("<I", zlib.crc32(header[:-4])))
+        self.__file.close()
+        os.replace(self.__temporary, self.__filename)
+
+    def discard(self) -> None:
+        """
+        Abandons the index being written, and removes the temporary file. The named file, if it
+        already exists, is left as it was.
+        """
+        if self.__file.closed:
+            return
+        self.__file.close()
+        os.remove(self.__temporary)
+
+    def __write(self, data: Union[bytes, bytearray]) -> None:
+        self.__checksum = zlib.crc32(data, self.__checksum)
+        self.__file.write(data)
@@ -2,7 +2,7 @@
 # -*- coding: utf-8 -*-
 
 from abc import ABC, abstractmethod
-from typing import Dict, Any
+from typing import Dict, Any, Iterable
 
 
 class Document(ABC):
@@ -11,6 +11,8 @@ class Document(ABC):
     named, typed fields.
     """
 
+    __slots__ = ()  # Allows lightweight subclasses to avoid a per-instance dictionary.
+
     def __getitem__(self, field_name: str) -> Any:
         return self.get_field(field_name, None)
 
@@ -44,6 +46,14 @@ class Document(ABC):
         """
         pass
 
+    def get_field_names(self) -> Iterable[str]:
+        """
+        Returns the names of all the fields in the document. Not all document types can enumerate
+        their fields, so implementations that can should override this. When loading, InMemoryCorpus
+        falls back to keeping such documents as they are instead of copying them.
+        """
+        raise NotImplementedError(f"{type(self).__name__} does not enumerate its field names")
+
 
 class InMemoryDocument(Document):
     """
@@ -70,3 +80,6 @@ class InMemoryDocument(Document):
     def set_field(self, field_name: str, field_value: Any) -> None:
         assert field_name is not None
         self.__fields[field_name] = field_value
+
+    def get_field_names(self) -> Iterable[str]:
+        return self.__fields.keys()
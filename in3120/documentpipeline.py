@@ -1,7 +1,8 @@
 #!/usr/bin/python
 # -*- coding: utf-8 -*-
 
-from typing import List, Optional, Callable
+from timeit import default_timer as timer
+from typing import Any, Dict, List, Optional, Callable
 from .document import Document
 
 
@@ -14,12 +15,26 @@ class DocumentPipeline:
     Documents can be dropped, too, if a processing operation returns None instead of the
     transformed document. Processing operations can also be simple identity functions with
     side-effects.
+
+    Documents can also be processed in batches. Processing operations that can benefit from
+    seeing many documents at once, e.g., to amortize some fixed overhead, can opt into this by
+    exposing a process_batch method that takes a list of documents and returns a list of the
+    transformed documents. The returned list must have the same length as the given one, with
+    None in place of each dropped document, so that results can be matched up with inputs by
+    position. Other processing operations are simply invoked once per document. Since the
+    pipeline itself exposes a process_batch method, pipelines can be nested.
+
+    The pipeline keeps track of how many documents each processing operation has seen, how
+    many of these it dropped, and how much time it has spent, for monitoring purposes.
     """
 
     def __init__(self, processors: List[Callable[[Document], Optional[Document]]]):
         assert processors is not None
         assert all(processors)
         self.__processors = processors
+        self.__documents = [0] * len(processors)  # The number of documents that each processor has seen.
+        self.__dropped = [0] * len(processors)  # The number of documents that each processor has dropped.
+        self.__seconds = [0.0] * len(processors)  # The cumulative time spent in each processor.
 
     def __call__(self, document: Document) -> Optional[Document]:
         return self.process_document(document)
@@ -29,8 +44,72 @@ class DocumentPipeline:
         Applies all processors to the document, in the sequence they were provided.
         If a processor returns None, the document is dropped.
         """
-        for processor in self.__processors:
+        for (i, processor) in enumerate(self.__processors):
             if document is None:
                 return None
+            start = timer()
             document = processor(document)
+            self.__seconds[i] += timer() - start
+            self.__documents[i] += 1
+            if document is None:
+                self.__dropped[i] += 1
         return document
+
+    def process_batch(self, documents: List[Optional[Document]]) -> List[Optional[Document]]:
+        """
+        Applies all processors to the given list of documents, in the sequence they were provided.
+        Returns a list of the same length as the given one, where the documents that were dropped
+        are replaced by None. Processors that expose a process_batch method get all surviving
+        documents passed in one go, and have to honor the same contract.
+        """
+        results = list(documents)
+        alive = [i for (i, d) in enumerate(results) if d is not None]
+        for (i, processor) in enumerate(self.__processors):
+            if not alive:
+                break
+            start = timer()
+            batch = getattr(processor, "process_batch", None)
+            inputs = [results[j] for j in alive]
+            processed = batch(inputs) if callable(batch) else [processor(d) for d in inputs]
+            if len(processed) != len(inputs):
+                raise ValueError(f"Processor {__class__.__get_name(processor)} returned {len(processed)} documents for a batch of {len(inputs)}")
+            for (j, document) in zip(alive, processed):
+                results[j] = document
+            survivors = [j for j in alive if results[j] is not None]
+            self.__seconds[i] += timer() - start
+            self.__documents[i] += len(alive)
+            self.__dropped[i] += len(alive) - len(survivors)
+            alive = survivors
+        return results
+
+    def get_statistics(self) -> List[Dict[str, Any]]:
+        """
+        Returns the counters for each processor, in the sequence the processors were provided.
+        Each processor is described by its name, the number of documents it has seen, the number
+        of documents it has dropped, and the cumulative time in seconds spent in it.
+        """
+        return [{"processor": __class__.__get_name(p), "documents": d, "dropped": x, "seconds": s}
+                for (p, d, x, s) in zip(self.__processors, self.__documents, self.__dropped, self.__seconds)]
+
+    def reset_statistics(self) -> None:
+        """
+        Resets all counters to zero.
+        """
+        self.__documents = [0] * len(self.__processors)
+        self.__dropped = [0] * len(self.__processors)
+        self.__seconds = [0.0] * len(self.__processors)
+
+    def merge_statistics(self, statistics: List[Dict[str, Any]]) -> None:
+        """
+        Adds the given counters, as returned by get_statistics, to our own. Useful for, e.g., collecting
+        the counters of copies of this pipeline that ran in worker processes.
+        """
+        assert len(statistics) == len(self.__processors)
+        for (i, counters) in enumerate(statistics):
+            self.__documents[i] += counters["documents"]
+            self.__dropped[i] += counters["dropped"]
+            self.__seconds[i] += counters["seconds"]
+
+    @staticmethod
+    def __get_name(processor: Callable[[Document], Optional[Document]]) -> str:
+        return getattr(processor, "__name__", processor.__class__.__name__)
@@ -0,0 +1,121 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+from array import array
+from typing import Any, BinaryIO, Callable, Dict, Iterator, List, Optional, Tuple
+from .corpus import Corpus, _parse_text_line, _parse_json_line
+from .document import Document, InMemoryDocument
+from .documentpipeline import DocumentPipeline
+
+
+class FileCorpus(Corpus):
+    """
+    A file-backed implementation of a document store, suitable for document collections
+    that are too large to keep in memory.
+
+    Documents are parsed from the underlying file as we iterate over the corpus, and are
+    not retained. As a side effect of the first full pass over the file, we build up a compact
+    table of byte offsets, one entry per document. This allows us to later look up individual
+    documents by seeking directly to where they start in the file, and only parse that single
+    record. The steady-state memory footprint is thus a few bytes per document.
+
+    Document identifiers are assigned on a first-come first-serve basis, as for InMemoryCorpus.
+    Documents that are dropped by the pipeline are not assigned identifiers. Since documents are
+    reparsed on every access, the pipeline should be deterministic and any changes made to the
+    returned documents are not persisted.
+
+    Supports the same line-oriented file formats as InMemoryCorpus, i.e., text, JSON and CSV.
+    """
+
+    def __init__(self, filename: str, pipeline: Optional[DocumentPipeline] = None):
+        self.__filename = filename
+        self.__pipeline = DocumentPipeline([]) if pipeline is None else pipeline
+        self.__offsets = array("Q")  # Maps document identifiers to byte offsets. Built during the first pass.
+        self.__complete = False  # Have we completed a full pass, i.e., is the offset table complete?
+        self.__header: List[str] = []  # The column names, for CSV files.
+        if filename.endswith(".txt"):
+            self.__scan = lambda f, start: self.__scan_lines(f, start, _parse_text_line)
+        elif filename.endswith(".json"):
+            self.__scan = lambda f, start: self.__scan_lines(f, start, _parse_json_line)
+        elif filename.endswith(".csv"):
+            self.__scan = self.__scan_csv
+            self.__header = self.__read_csv_header()
+        else:
+            raise IOError("Unsupported extension")
+
+    def __iter__(self) -> Iterator[Document]:
+        with open(self.__filename, mode="rb") as f:
+            document_id = 0
+            for (offset, named_fields) in self.__scan(f, 0):
+                document = self.__pipeline(InMemoryDocument(document_id, named_fields))
+                if document:
+                    if document_id == len(self.__offsets):
+                        self.__offsets.append(offset)
+                    yield document
+                    document_id += 1
+        self.__complete = True
+
+    def size(self) -> int:
+        self.__complete_offsets()
+        return len(self.__offsets)
+
+    def get_document(self, document_id: int) -> Document:
+        if document_id >= len(self.__offsets):
+            self.__complete_offsets()
+        assert 0 <= document_id < len(self.__offsets)
+        with open(self.__filename, mode="rb") as f:
+            (_, named_fields) = next(self.__scan(f, self.__offsets[document_id]))
+        document = self.__pipeline(InMemoryDocument(document_id, named_fields))
+        assert document is not None, "The pipeline is assumed to be deterministic."
+        return document
+
+    def __complete_offsets(self) -> None:
+        """
+        Completes the offset table, if needed, by doing a full pass over the file.
+        """
+        if not self.__complete:
+            for _ in self:
+                pass
+
+    def __scan_lines(self, f: BinaryIO, start: int, parser: Callable[[str], Optional[Dict[str, Any]]]) -> Iterator[Tuple[int, Dict[str, Any]]]:
+        """
+        Starting at the given byte offset, yields (offset, named fields) pairs from a file with one
+        document per line. The parser maps a line to a set of named fields, or returns None if the
+        line should be ignored. See InMemoryCorpus for details on how lines are mapped to named fields.
+        """
+        f.seek(start)
+        while True:
+            offset = f.tell()
+            line = f.readline()
+            if not line:
+                break
+            named_fields = parser(line.decode("utf-8"))
+            if named_fields is not None:
+                yield (offset, named_fields)
+
+    def __scan_csv(self, f: BinaryIO, start: int) -> Iterator[Tuple[int, Dict[str, Any]]]:
+        """
+        Starting at the given byte offset, yields (offset, named fields) pairs from a CSV file.
+        A record might span multiple lines if it has quoted fields that contain line breaks.
+        The CSV reader consumes one line at a time, so the file position tells us where the
+        next record starts. Blank lines are skipped by the reader, and are benign.
+        """
+        import csv
+        f.seek(start)
+        if start == 0:
+            f.readline()
+        reader = csv.DictReader((line.decode("utf-8") for line in iter(f.readline, b"")), fieldnames=self.__header)
+        while True:
+            offset = f.tell()
+            row = next(reader, None)
+            if row is None:
+                break
+            yield (offset, dict(row))
+
+    def __read_csv_header(self) -> List[str]:
+        """
+        Reads the column names from the first line of a CSV file.
+        """
+        import csv
+        with open(self.__filename, mode="r", encoding="utf-8", newline="") as f:
+            return next(csv.reader(f), [])
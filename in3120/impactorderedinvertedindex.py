@@ -0,0 +1,109 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+import heapq
+import itertools
+import math
+from array import array
+from collections import Counter
+from typing import Dict, Iterable, Iterator, List, Tuple
+from .corpus import Corpus
+from .dictionary import Dictionary, InMemoryDictionary
+from .invertedindex import InvertedIndex
+from .normalizer import Normalizer
+from .posting import Posting
+from .tokenizer import Tokenizer
+
+
+class ImpactOrderedInvertedIndex(InvertedIndex):
+    """
+    An in-memory inverted index where each term's postings are grouped into impact segments, to
+    support score-at-a-time query evaluation. See, e.g., Anh and Moffat, "Pruned query evaluation
+    using pre-computed impacts", SIGIR 2006.
+
+    The impact of a posting is the posting's TF-IDF weight, computed the same way as BetterRanker
+    does it but without any static document score, and then quantized to an integer in the range
+    [0, 2^bits - 1]. The quantization scale is shared by all terms, so that impacts from different
+    terms can be added up. Postings having a nonzero weight get a nonzero impact, however small.
+
+    All postings of a term having the same impact form a segment. The segments are kept in order of
+    descending impact, and within a segment the document identifiers are kept sorted in an array.
+    The term frequencies are kept in a parallel array, so that we can still produce plain postings
+    in document order for clients that want those.
+    """
+
+    def __init__(self, corpus: Corpus, fields: Iterable[str], normalizer: Normalizer, tokenizer: Tokenizer, bits: int = 8):
+        assert 0 < bits <= 16
+        self.__corpus = corpus
+        self.__normalizer = normalizer
+        self.__tokenizer = tokenizer
+        self.__dictionary: Dictionary = InMemoryDictionary()
+        self.__segments: List[List[Tuple[int, array, array]]] = []  # Impact, document identifiers and term frequencies.
+        self.__document_frequencies = array("I")
+        self.__scale = 1.0  # Multiply an impact by this to get the TF-IDF weight back, approximately.
+        self.__build_index(fields, (1 << bits) - 1)
+
+    def __build_index(self, fields: Iterable[str], levels: int) -> None:
+
+        # First build up plain posting lists, as parallel arrays of document identifiers and term frequencies.
+        posting_lists: List[Tuple[array, array]] = []
+        for document in self.__corpus:
+            all_terms = itertools.chain.from_iterable(self.get_terms(document.get_field(f, "")) for f in fields)
+            for (term, term_frequency) in Counter(all_terms).items():
+                term_id = self.__dictionary.add_if_absent(term)
+                if term_id >= len(posting_lists):
+                    posting_lists.append((array("I"), array("I")))
+                posting_lists[term_id][0].append(document.document_id)
+                posting_lists[term_id][1].append(term_frequency)
+
+        # We need the maximum weight across all terms before we can quantize.
+        n = self.__corpus.size()
+        weights = []
+        for (document_ids, term_frequencies) in posting_lists:
+            idf = math.log(n / len(document_ids), 10)
+            weights.append([math.log(term_frequency + 1, 10) * idf for term_frequency in term_frequencies])
+        maximum = max((max(w) for w in weights), default=0.0)
+        self.__scale = maximum / levels if maximum > 0.0 else 1.0
+
+        # Split each posting list into segments. We visit the postings in document order, so the document
+        # identifiers within each segment come out sorted.
+        for ((document_ids, term_frequencies), term_weights) in zip(posting_lists, weights):
+            segments: Dict[int, Tuple[array, array]] = {}
+            for (document_id, term_frequency, weight) in zip(document_ids, term_frequencies, term_weights):
+                impact = min(levels, max(1, round(weight / self.__scale))) if weight > 0.0 else 0
+                segment = segments.setdefault(impact, (array("I"), array("I")))
+                segment[0].append(document_id)
+                segment[1].append(term_frequency)
+            self.__segments.append([(impact, *segments[impact]) for impact in sorted(segments, reverse=True)])
+            self.__document_frequencies.append(len(document_ids))
+
+    def get_terms(self, buffer: str) -> Iterator[str]:
+        tokens = self.__tokenizer.strings(self.__normalizer.canonicalize(buffer))
+        return (self.__normalizer.normalize(t) for t in tokens)
+
+    def get_postings_iterator(self, term: str) -> Iterator[Posting]:
+        # The postings are grouped by impact, so merge the segments to get them in document order.
+        term_id = self.__dictionary.get_term_id(term)
+        if term_id is None:
+            return iter([])
+        merged = heapq.merge(*(zip(document_ids, term_frequencies) for (_, document_ids, term_frequencies) in self.__segments[term_id]))
+        return (Posting(document_id, term_frequency) for (document_id, term_frequency) in merged)
+
+    def get_document_frequency(self, term: str) -> int:
+        term_id = self.__dictionary.get_term_id(term)
+        return 0 if term_id is None else self.__document_frequencies[term_id]
+
+    def get_impact_segments(self, term: str) -> List[Tuple[int, array]]:
+        """
+        Returns the term's impact segments as (impact, document identifiers) pairs, in order of
+        descending impact. The document identifiers within a segment are sorted. For out-of-vocabulary
+        terms we return an empty list.
+        """
+        term_id = self.__dictionary.get_term_id(term)
+        return [] if term_id is None else [(impact, document_ids) for (impact, document_ids, _) in self.__segments[term_id]]
+
+    def get_impact_scale(self) -> float:
+        """
+        Returns the factor that converts a quantized impact back to an approximate TF-IDF weight.
+        """
+        return self.__scale
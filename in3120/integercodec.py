@@ -0,0 +1,263 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+from abc import ABC, abstractmethod
+from typing import List, Tuple
+from .variablebytecodec import VariableByteCodec
+
+
+def _decode_vbyte(source: bytearray, where: int) -> Tuple[int, int]:
+    """
+    Decodes a number in the format that VariableByteCodec produces, and returns the number together
+    with the position right after it. Unlike VariableByteCodec.decode we cannot sanity check the
+    preceding byte, since the numbers we decode are typically preceded by other kinds of data.
+    """
+    number = 0
+    while True:
+        byte = source[where]
+        where += 1
+        if byte < 128:
+            number = 128 * number + byte
+        else:
+            return (128 * number + byte - 128, where)
+
+
+def _pack(numbers: List[int], bits: int, destination: bytearray) -> int:
+    """
+    Packs the given numbers into a sequence of fixed-width bit fields, using the given number of bits
+    per number and discarding any bits above those. Appends the resulting bytes to the destination
+    buffer and returns the number of bytes that were appended.
+    """
+    mask = (1 << bits) - 1
+    packed = 0
+    for number in reversed(numbers):
+        packed = (packed << bits) | (number & mask)
+    size = (len(numbers) * bits + 7) // 8
+    destination.extend(packed.to_bytes(size, "little"))
+    return size
+
+
+def _unpack(source: bytearray, start: int, count: int, bits: int) -> Tuple[List[int], int]:
+    """
+    The inverse of _pack. Returns the unpacked numbers together with the number of bytes read.
+    """
+    size = (count * bits + 7) // 8
+    if bits == 0:
+        return ([0] * count, size)
+    mask = (1 << bits) - 1
+    packed = int.from_bytes(source[start:start + size], "little")
+    return ([(packed >> shift) & mask for shift in range(0, count * bits, bits)], size)
+
+
+class IntegerCodec(ABC):
+    """
+    Abstract base class for codecs that encode and decode sequences of non-negative integers as a
+    unit, e.g., a block of document identifier gaps or term frequencies from a posting list. Coding
+    many numbers together allows for much tighter and faster schemes than coding them one by one.
+    See Section 5.3 in https://nlp.stanford.edu/IR-book/pdf/05comp.pdf for some background, and
+    https://arxiv.org/abs/1908.10598 for a survey.
+
+    The number of encoded numbers is not part of the encoding, and has to be supplied when decoding.
+    Some codecs are designed for non-decreasing sequences, e.g., document identifiers, rather than
+    for small numbers, e.g., gaps between document identifiers. These are flagged as monotone.
+    """
+
+    monotone = False
+
+    @abstractmethod
+    def encode(self, numbers: List[int], destination: bytearray) -> int:
+        """
+        Encodes the given numbers, and appends the resulting bytes to the given destination
+        buffer. Returns the number of bytes that were appended.
+        """
+        pass
+
+    @abstractmethod
+    def decode(self, source: bytearray, start: int, count: int) -> Tuple[List[int], int]:
+        """
+        Starting at the given position in the source buffer, decodes the given number of numbers.
+        Returns a pair comprised of the decoded numbers, and the number of bytes read from the
+        source buffer.
+        """
+        pass
+
+
+class VariableByteIntegerCodec(IntegerCodec):
+    """
+    Encodes each number separately using VariableByteCodec. Mainly useful as a baseline.
+    """
+
+    def encode(self, numbers: List[int], destination: bytearray) -> int:
+        assert destination is not None
+        return VariableByteCodec.encode_many(numbers, destination)
+
+    def decode(self, source: bytearray, start: int, count: int) -> Tuple[List[int], int]:
+        assert source is not None
+        numbers = [0] * count
+        where = start
+        for i in range(count):
+            (numbers[i], where) = _decode_vbyte(source, where)
+        return (numbers, where - start)
+
+
+class PForDeltaCodec(IntegerCodec):
+    """
+    A variant of PForDelta (patched frame of reference), see https://doi.org/10.1109/ICDE.2006.150.
+    All numbers are bit packed using a fixed width b, chosen so that most of the numbers fit. The few
+    numbers that don't fit, the exceptions, are patched afterwards: For each exception we store its
+    position and its bits above the lowest b ones using variable-byte encoding.
+
+    The layout is one byte holding b, the number of exceptions, the bit packed numbers, and then
+    the exceptions. Deltas, i.e., gaps, are expected to be computed by the caller.
+    """
+
+    def __init__(self, exception_rate: float = 0.1):
+        assert 0.0 <= exception_rate < 1.0
+        self.__exception_rate = exception_rate
+
+    def encode(self, numbers: List[int], destination: bytearray) -> int:
+        assert destination is not None
+        if not numbers:
+            return 0
+        widths = sorted(number.bit_length() for number in numbers)
+        bits = widths[min(len(widths) - 1, int(len(widths) * (1.0 - self.__exception_rate)))]
+        exceptions = [i for (i, number) in enumerate(numbers) if number >> bits]
+        size = len(destination)
+        destination.append(bits)
+        VariableByteCodec.encode(len(exceptions), destination)
+        _pack(numbers, bits, destination)
+        previous = 0
+        for i in exceptions:
+            VariableByteCodec.encode(i - previous, destination)
+            VariableByteCodec.encode(numbers[i] >> bits, destination)
+            previous = i
+        return len(destination) - size
+
+    def decode(self, source: bytearray, start: int, count: int) -> Tuple[List[int], int]:
+        assert source is not None
+        if count == 0:
+            return ([], 0)
+        bits = source[start]
+        (exceptions, where) = _decode_vbyte(source, start + 1)
+        (numbers, size) = _unpack(source, where, count, bits)
+        where += size
+        i = 0
+        for _ in range(exceptions):
+            (gap, where) = _decode_vbyte(source, where)
+            (high, where) = _decode_vbyte(source, where)
+            i += gap
+            numbers[i] |= high << bits
+        return (numbers, where - start)
+
+
+class Simple8bCodec(IntegerCodec):
+    """
+    Simple-8b, see https://doi.org/10.1002/spe.948. Packs as many numbers as possible into each
+    64-bit word, using the same number of bits for all numbers in the word. The top 4 bits of
+    each word is a selector that describes how the remaining 60 bits are used. Two of the
+    selectors are reserved for long runs of zeros. Numbers must be less than 2^60.
+
+    The last word may hold fewer numbers than its selector allows for. Since the number of
+    encoded numbers is supplied when decoding, we know when to stop.
+    """
+
+    # Maps selectors to (numbers per word, bits per number) pairs.
+    SELECTORS = [(240, 0), (120, 0), (60, 1), (30, 2), (20, 3), (15, 4), (12, 5), (10, 6),
+                 (8, 7), (7, 8), (6, 10), (5, 12), (4, 15), (3, 20), (2, 30), (1, 60)]
+
+    def encode(self, numbers: List[int], destination: bytearray) -> int:
+        assert destination is not None
+        size = len(destination)
+        i = 0
+        while i < len(numbers):
+            for (selector, (count, bits)) in enumerate(__class__.SELECTORS):
+                chunk = numbers[i:i + count]
+                if bits == 0 and len(chunk) < count:
+                    continue  # Only use the zero run selectors for complete runs.
+                if max(chunk) >> bits == 0:
+                    break
+            else:
+                assert False, "numbers must be less than 2^60"
+            mask = (1 << bits) - 1
+            word = selector
+            for number in chunk:
+                word = (word << bits) | (number & mask)
+            destination.extend((word << (60 - bits * len(chunk))).to_bytes(8, "little"))
+            i += len(chunk)
+        return len(destination) - size
+
+    def decode(self, source: bytearray, start: int, count: int) -> Tuple[List[int], int]:
+        assert source is not None
+        numbers = []
+        where = start
+        while len(numbers) < count:
+            word = int.from_bytes(source[where:where + 8], "little")
+            where += 8
+            (capacity, bits) = __class__.SELECTORS[word >> 60]
+            taken = min(capacity, count - len(numbers))
+            if bits == 0:
+                numbers.extend([0] * taken)
+            else:
+                # The numbers are packed right below the selector, the first one in the highest bits.
+                mask = (1 << bits) - 1
+                top = 60 - bits
+                numbers.extend([(word >> (top - j * bits)) & mask for j in range(taken)])
+        return (numbers, where - start)
+
+
+class EliasFanoCodec(IntegerCodec):
+    """
+    Elias-Fano coding of non-decreasing sequences, see https://doi.org/10.1145/2433396.2433409.
+    With n numbers up to u, each number is split into its l = floor(log2(u / n)) lowest bits, which
+    are bit packed, and its remaining high bits, which are stored as a unary coded bit vector with
+    n set bits and at most n + u / 2^l unset bits. That's less than 2 + log2(u / n) bits per number,
+    which is close to optimal.
+
+    The layout is u as a variable-byte encoded number, the low bits, and then the high bits.
+    Since the encoding is monotone, the caller can use it for, e.g., document identifiers directly,
+    or relative to some base.
+    """
+
+    monotone = True
+
+    def encode(self, numbers: List[int], destination: bytearray) -> int:
+        assert destination is not None
+        if not numbers:
+            return 0
+        assert all(a <= b for (a, b) in zip(numbers, numbers[1:])), "numbers must be non-decreasing"
+        assert numbers[0] >= 0
+        universe = numbers[-1]
+        bits = __class__.__get_low_bits(universe, len(numbers))
+        size = len(destination)
+        VariableByteCodec.encode(universe, destination)
+        _pack(numbers, bits, destination)
+        high = 0
+        for (i, number) in enumerate(numbers):
+            high |= 1 << ((number >> bits) + i)
+        destination.extend(high.to_bytes(__class__.__get_high_size(universe, len(numbers), bits), "little"))
+        return len(destination) - size
+
+    def decode(self, source: bytearray, start: int, count: int) -> Tuple[List[int], int]:
+        assert source is not None
+        if count == 0:
+            return ([], 0)
+        (universe, where) = _decode_vbyte(source, start)
+        bits = __class__.__get_low_bits(universe, count)
+        (numbers, size) = _unpack(source, where, count, bits)
+        where += size
+        size = __class__.__get_high_size(universe, count, bits)
+        high = int.from_bytes(source[where:where + size], "little")
+        where += size
+        for i in range(count):
+            lowest = high & -high
+            high ^= lowest
+            numbers[i] |= (lowest.bit_length() - 1 - i) << bits
+        return (numbers, where - start)
+
+    @staticmethod
+    def __get_low_bits(universe: int, count: int) -> int:
+        return (universe // count).bit_length() - 1 if universe >= count else 0
+
+    @staticmethod
+    def __get_high_size(universe: int, count: int, bits: int) -> int:
+        return (count + (universe >> bits) + 8) // 8
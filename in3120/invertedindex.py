@@ -3,14 +3,17 @@
 
 import itertools
 from abc import ABC, abstractmethod
-from collections import Counter
-from typing import Iterable, Iterator, List
-from .dictionary import InMemoryDictionary
+from collections import Counter, defaultdict
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional
+from .dictionary import Dictionary, InMemoryDictionary, TermStatistics
 from .normalizer import Normalizer
 from .tokenizer import Tokenizer
 from .corpus import Corpus
-from .posting import Posting
-from .postinglist import CompressedInMemoryPostingList, InMemoryPostingList, PostingList
+from .document import Document
+from .lrucache import LruCache
+from .posting import Posting, PositionalPosting
+from .postinglist import ArrayPostingList, BitmapPostingList, BlockPostingList, CompressedInMemoryPostingList, InMemoryPostingList, PositionalPostingList, PostingList
+from .postinglist import IteratorPostingListCursor, PostingListCursor
 
 
 class InvertedIndex(ABC):
@@ -41,6 +44,14 @@ class InvertedIndex(ABC):
         """
         pass
 
+    def get_postings_cursor(self, term: str) -> PostingListCursor:
+        """
+        Returns a cursor that can be used to traverse the term's associated posting list without
+        creating a Posting object per posting. For out-of-vocabulary terms we associate empty posting
+        lists. Implementations that can do better than adapting an iterator should override this.
+        """
+        return IteratorPostingListCursor(self.get_postings_iterator(term))
+
     @abstractmethod
     def get_document_frequency(self, term: str) -> int:
         """
@@ -48,6 +59,15 @@ class InvertedIndex(ABC):
         """
         pass
 
+    def get_term_statistics(self, term: str) -> Optional[Dict[str, Any]]:
+        """
+        Returns statistics for the given term, e.g., its document frequency and collection frequency,
+        without having to access the term's posting list. For out-of-vocabulary terms, None is returned.
+        Implementations that don't keep track of anything else only report the document frequency.
+        """
+        document_frequency = self.get_document_frequency(term)
+        return {"document_frequency": document_frequency} if document_frequency > 0 else None
+
 
 class InMemoryInvertedIndex(InvertedIndex):
     """
@@ -56,22 +76,66 @@ class InMemoryInvertedIndex(InvertedIndex):
     In a serious application we'd have configuration to allow for field-specific NLP,
     scale beyond current memory constraints, have a positional index, and so on.
 
-    If index compression is enabled, only the posting lists are compressed. Dictionary
-    compression is currently not supported.
+    If index compression is enabled, only the posting lists are compressed. Alternatively, a
+    factory can be supplied that creates posting lists of some other type, e.g., ArrayPostingList.
+
+    If the index is positional, we record the positions where each term occurs in each document,
+    i.e., the postings are PositionalPosting objects. Positions count tokens, across all indexed
+    fields, with a gap between fields so that phrases don't match across field boundaries. The
+    posting lists are then PositionalPostingList objects, unless a factory is supplied, and the
+    positions are always compressed.
+
+    Terms that occur in a large share of the documents can have their posting lists converted to
+    BitmapPostingList objects once the index has been built, by specifying the minimum fraction of
+    the documents that a term must occur in for this to happen. This doesn't mix with positions.
+
+    Decoding compressed posting lists takes time, and the posting lists of frequent query terms get
+    decoded over and over again. A cache of decoded posting lists can be enabled by specifying a memory
+    budget for it, in bytes. Cached posting lists are held as ArrayPostingList objects, and the least
+    recently used ones are evicted when the budget is exceeded. Only posting lists that need decoding,
+    i.e., CompressedInMemoryPostingList and BlockPostingList objects, are cached. Others, e.g., bitmaps,
+    are used as they are. The cache can be warmed up using a query log. This doesn't mix with positions.
+
+    The dictionary is built as an InMemoryDictionary. Once the index has been built and the
+    vocabulary is frozen, the dictionary can optionally be replaced by a more compact read-only
+    variant, by supplying a factory that creates the replacement from the original. E.g.:
+
+        InMemoryInvertedIndex(corpus, ["body"], normalizer, tokenizer, dictionary_factory=PerfectHashDictionary)
     """
 
-    def __init__(self, corpus: Corpus, fields: Iterable[str], normalizer: Normalizer, tokenizer: Tokenizer, compressed: bool = False):
+    def __init__(self, corpus: Corpus, fields: Iterable[str], normalizer: Normalizer, tokenizer: Tokenizer, compressed: bool = False,
+                 dictionary_factory: Optional[Callable[[Dictionary], Dictionary]] = None,
+                 posting_list_factory: Optional[Callable[[], PostingList]] = None, positional: bool = False,
+                 bitmap_threshold: Optional[float] = None, postings_cache_size: int = 0):
+        assert not (positional and bitmap_threshold is not None)
+        assert not (positional and postings_cache_size > 0)
         self.__corpus = corpus
         self.__normalizer = normalizer
         self.__tokenizer = tokenizer
         self.__posting_lists : List[PostingList] = []
-        self.__dictionary = InMemoryDictionary()
-        self.__build_index(fields, compressed)
+        self.__dictionary: Dictionary = InMemoryDictionary()
+        self.__statistics = TermStatistics()
+        self.__cache = LruCache(postings_cache_size, __class__.__get_weight) if postings_cache_size > 0 else None
+        if posting_list_factory is None:
+            if positional:
+                posting_list_factory = PositionalPostingList
+            else:
+                posting_list_factory = CompressedInMemoryPostingList if compressed else InMemoryPostingList
+        self.__build_index(fields, posting_list_factory, positional)
+        if bitmap_threshold is not None:
+            self.__convert_to_bitmaps(bitmap_threshold)
+        if dictionary_factory is not None:
+            self.__dictionary = dictionary_factory(self.__dictionary)
 
     def __repr__(self):
-        return str({term: self.__posting_lists[term_id] for (term, term_id) in self.__dictionary})
+        try:
+            pairs = iter(self.__dictionary)
+        except TypeError:
+            # The dictionary doesn't store its terms, so make do with the term identifiers.
+            return str(dict(enumerate(self.__posting_lists)))
+        return str({term: self.__posting_lists[term_id] for (term, term_id) in pairs})
 
-    def __build_index(self, fields: Iterable[str], compressed: bool) -> None:
+    def __build_index(self, fields: Iterable[str], posting_list_factory: Callable[[], PostingList], positional: bool) -> None:
         for document in self.__corpus:
 
             # Compute TF values for all unique terms in the document. Note that we
@@ -80,8 +144,12 @@ class InMemoryInvertedIndex(InvertedIndex):
             # contain 'foo' in the 'title' field") then we would have to keep
             # track of that, either as a synthetic term in the dictionary
             # (e.g., 'foo.title') or as extra data in the posting.
-            all_terms = itertools.chain.from_iterable(self.get_terms(document.get_field(f, "")) for f in fields)
-            term_frequencies = Counter(all_terms)
+            if positional:
+                term_positions = self.__get_term_positions(document, fields)
+                term_frequencies = {term: len(positions) for (term, positions) in term_positions.items()}
+            else:
+                all_terms = itertools.chain.from_iterable(self.get_terms(document.get_field(f, "")) for f in fields)
+                term_frequencies = Counter(all_terms)
 
             for (term, term_frequency) in term_frequencies.items():
 
@@ -91,17 +159,42 @@ class InMemoryInvertedIndex(InvertedIndex):
                 # Locate the posting list for this term. Create it, if needed.
                 if term_id >= len(self.__posting_lists):
                     assert term_id == len(self.__posting_lists)
-                    self.__posting_lists.append(CompressedInMemoryPostingList() if compressed else InMemoryPostingList())
+                    self.__posting_lists.append(posting_list_factory())
                 posting_list = self.__posting_lists[term_id]
 
                 # Append the posting to the posting list. The posting lists
                 # must be kept sorted so that we can efficiently traverse and
                 # merge them when querying the inverted index.
-                posting_list.append_posting(Posting(document.document_id, term_frequency))
+                if positional:
+                    posting_list.append_posting(PositionalPosting(document.document_id, term_frequency, term_positions[term]))
+                else:
+                    posting_list.append_posting(Posting(document.document_id, term_frequency))
+                self.__statistics.add_posting(term_id, document.document_id, term_frequency)
 
         # Implementations may or may not need to tie up any loose ends.
         for posting_list in self.__posting_lists:
             posting_list.finalize_postings()
+        self.__statistics.finalize()
+
+    def __convert_to_bitmaps(self, bitmap_threshold: float) -> None:
+        minimum = max(1.0, bitmap_threshold * self.__corpus.size())
+        for (term_id, posting_list) in enumerate(self.__posting_lists):
+            if posting_list.get_length() >= minimum:
+                bitmap = BitmapPostingList()
+                for posting in posting_list:
+                    bitmap.append_posting(posting)
+                bitmap.finalize_postings()
+                self.__posting_lists[term_id] = bitmap
+
+    def __get_term_positions(self, document: Document, fields: Iterable[str]) -> Dict[str, List[int]]:
+        term_positions = defaultdict(list)
+        position = 0
+        for field in fields:
+            for term in self.get_terms(document.get_field(field, "")):
+                term_positions[term].append(position)
+                position += 1
+            position += 1  # Leave a gap, so that phrases can't span fields.
+        return term_positions
 
     def get_terms(self, buffer: str) -> Iterator[str]:
         # In a serious large-scale application there could be field-specific tokenizers.
@@ -113,11 +206,86 @@ class InMemoryInvertedIndex(InvertedIndex):
         # Assume that everything fits in memory. This would not be the case in a serious
         # large-scale application, even with compression.
         term_id = self.__dictionary.get_term_id(term)
-        return iter([]) if term_id is None else iter(self.__posting_lists[term_id])
+        return iter([]) if term_id is None else iter(self.__get_posting_list(term_id))
+
+    def get_postings_cursor(self, term: str) -> PostingListCursor:
+        term_id = self.__dictionary.get_term_id(term)
+        return IteratorPostingListCursor(iter([])) if term_id is None else self.__get_posting_list(term_id).get_cursor()
+
+    def __get_posting_list(self, term_id: int) -> PostingList:
+        # Go through the cache of decoded posting lists, if we have one and the posting list needs decoding.
+        if self.__cache is None or not __class__.__needs_decoding(self.__posting_lists[term_id]):
+            return self.__posting_lists[term_id]
+        posting_list = self.__cache.get(term_id, None)
+        if posting_list is None:
+            posting_list = self.__decode(term_id)
+            self.__cache.put(term_id, posting_list)
+        return posting_list
+
+    def __decode(self, term_id: int) -> ArrayPostingList:
+        decoded = ArrayPostingList()
+        cursor = self.__posting_lists[term_id].get_cursor()
+        while cursor.next():
+            decoded.append_posting(cursor)  # Cursors look like postings, so this saves us some allocations.
+        decoded.finalize_postings()
+        return decoded
+
+    @staticmethod
+    def __needs_decoding(posting_list: PostingList) -> bool:
+        # Other posting lists, e.g., bitmaps, are cheap to traverse as they are, or have traversals of their own.
+        return isinstance(posting_list, (CompressedInMemoryPostingList, BlockPostingList))
+
+    @staticmethod
+    def __get_weight(posting_list: ArrayPostingList) -> int:
+        return posting_list.get_buffer_size() + 128  # Roughly accounts for the per-object overhead, too.
+
+    def warm_up_cache(self, filename: str, count: int) -> int:
+        """
+        Preloads the cache of decoded posting lists, using a query log. The query log is a UTF-8 encoded
+        text file having one query per line. The posting lists of the count most frequent query terms
+        in the log are decoded and cached, or as many of them as there's room for. Returns the number of
+        posting lists that were loaded.
+        """
+        if self.__cache is None:
+            return 0
+        with open(filename, "r", encoding="utf-8") as f:
+            term_frequencies = Counter(itertools.chain.from_iterable(self.get_terms(line) for line in f))
+        term_ids = [self.__dictionary.get_term_id(term) for (term, _) in term_frequencies.most_common()]
+        term_ids = [term_id for term_id in term_ids if term_id is not None and __class__.__needs_decoding(self.__posting_lists[term_id])][:count]
+
+        # Load the most frequent terms last, so that they're the last ones to be evicted.
+        for term_id in reversed(term_ids):
+            self.__cache.put(term_id, self.__decode(term_id))
+        return sum(1 for term_id in term_ids if term_id in self.__cache)
+
+    def get_cache_statistics(self) -> Dict[str, int]:
+        """
+        Returns the counters for the cache of decoded posting lists. See LruCache for details. If the
+        cache isn't enabled, all counters are zero.
+        """
+        return (self.__cache or LruCache(0)).get_statistics()
 
     def get_document_frequency(self, term: str) -> int:
-        # In a serious large-scale application we'd store this number explicitly, e.g., as part of the dictionary.
-        # That way, we can look up the document frequency without having to access the posting lists
-        # themselves. Imagine if the posting lists don't even reside in memory!
+        # We store this number explicitly next to the dictionary. That way, we can look up the document
+        # frequency without having to access the posting lists themselves. Imagine if the posting lists
+        # don't even reside in memory!
         term_id = self.__dictionary.get_term_id(term)
-        return 0 if term_id is None else self.__posting_lists[term_id].get_length()
+        return 0 if term_id is None else self.__statistics.get_document_frequency(term_id)
+
+    def get_term_statistics(self, term: str) -> Optional[Dict[str, Any]]:
+        term_id = self.__dictionary.get_term_id(term)
+        return None if term_id is None else self.__statistics.get_record(term_id)
+
+    def get_vocabulary(self) -> Iterator[str]:
+        """
+        Returns all the indexed terms, in no particular order. Raises a TypeError if the dictionary
+        doesn't store its terms, e.g., if it's a PerfectHashDictionary.
+        """
+        pairs = iter(self.__dictionary)  # Fail here rather than when the caller starts iterating.
+        return (term for (term, _) in pairs)
+
+    def get_document_count(self) -> int:
+        """
+        Returns the number of documents in the indexed corpus.
+        """
+        return self.__corpus.size()
@@ -0,0 +1,80 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional
+
+
+class LruCache:
+    """
+    A simple cache that evicts the least recently used entries when it runs out of capacity.
+
+    Each entry has a weight, as computed by a client-supplied weigher function, and the capacity
+    bounds the sum of the weights of all cached entries. By default each entry weighs 1, so that
+    the capacity is simply the maximum number of entries. A weigher that estimates the size of an
+    entry in bytes turns the capacity into a memory budget. Entries that weigh more than the
+    capacity are not cached at all.
+
+    The cache keeps counters of hits, misses and evictions, for monitoring purposes.
+    """
+
+    def __init__(self, capacity: int, weigher: Optional[Callable[[Any], int]] = None):
+        assert capacity >= 0
+        self.__capacity = capacity
+        self.__weigher = weigher if weigher else lambda v: 1
+        self.__entries: OrderedDict = OrderedDict()  # Maps keys to (value, weight) pairs, least recently used first.
+        self.__weight = 0
+        self.__hits = 0
+        self.__misses = 0
+        self.__evictions = 0
+
+    def __len__(self):
+        return len(self.__entries)
+
+    def __contains__(self, key: Any) -> bool:
+        return key in self.__entries
+
+    def get(self, key: Any, default: Any = None) -> Any:
+        """
+        Returns the cached value for the given key, or the given default value if the key is not
+        cached. A successful lookup marks the entry as the most recently used one.
+        """
+        entry = self.__entries.get(key, None)
+        if entry is None:
+            self.__misses += 1
+            return default
+        self.__hits += 1
+        self.__entries.move_to_end(key)
+        return entry[0]
+
+    def put(self, key: Any, value: Any) -> None:
+        """
+        Caches the given value under the given key, evicting the least recently used entries
+        if needed to make room for it.
+        """
+        weight = self.__weigher(value)
+        if key in self.__entries:
+            self.__weight -= self.__entries.pop(key)[1]
+        if weight > self.__capacity:
+            return
+        while self.__weight + weight > self.__capacity:
+            (_, (_, evicted)) = self.__entries.popitem(last=False)
+            self.__weight -= evicted
+            self.__evictions += 1
+        self.__entries[key] = (value, weight)
+        self.__weight += weight
+
+    def clear(self) -> None:
+        """
+        Empties the cache. The counters are left untouched.
+        """
+        self.__entries.clear()
+        self.__weight = 0
+
+    def get_statistics(self) -> Dict[str, int]:
+        """
+        Returns the cache's counters, together with its current number of entries and its
+        current total weight.
+        """
+        return {"hits": self.__hits, "misses": self.__misses, "evictions": self.__evictions,
+                "entries": len(self.__entries), "weight": self.__weight, "capacity": self.__capacity}
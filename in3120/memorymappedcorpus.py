@@ -0,0 +1,223 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+from __future__ import annotations
+import json
+import mmap
+import struct
+import sys
+from array import array
+from typing import Any, Dict, Iterable, Iterator, List, Tuple
+from .corpus import Corpus
+from .document import Document
+
+
+class MemoryMappedDocument(Document):
+    """
+    A lightweight view of a document that resides in a memory-mapped document store.
+    Fields are decoded lazily from the mapped buffer only when accessed. Changes made
+    via set_field are kept in memory and are not written back to the store.
+    """
+
+    def __init__(self, corpus: MemoryMappedCorpus, document_id: int):
+        self.__corpus = corpus
+        self.__document_id = document_id
+        self.__changes: Dict[str, Any] = {}  # Local modifications, if any. Shadow the stored fields.
+
+    def __repr__(self):
+        return str({"document_id": self.__document_id, "fields": {f: self.get_field(f, None) for f in self.get_field_names()}})
+
+    def get_document_id(self) -> int:
+        return self.__document_id
+
+    def get_field(self, field_name: str, default: Any) -> Any:
+        if field_name in self.__changes:
+            return self.__changes[field_name]
+        return self.__corpus._decode_field(self.__document_id, field_name, default)
+
+    def set_field(self, field_name: str, field_value: Any) -> None:
+        assert field_name is not None
+        self.__changes[field_name] = field_value
+
+    def get_field_names(self) -> Iterable[str]:
+        field_names = list(self.__corpus._decode_field_names(self.__document_id))
+        return field_names + [f for f in self.__changes if f not in field_names]
+
+
+class MemoryMappedCorpus(Corpus):
+    """
+    A read-only, write-once document store that resides on disk and that is accessed via
+    memory mapping. Opening a store is cheap since nothing gets parsed up front, and the
+    operating system pages in only the parts of the file that we actually touch.
+
+    The file layout is as follows, with all integers stored little-endian:
+
+        header:   magic (8 bytes), version (u32), document count (u32),
+                  field name table offset (u64), record offset array offset (u64)
+        records:  one record per document, see below
+        names:    the number of field names (u32), followed by length-prefixed (u16) UTF-8 names
+        offsets:  one byte offset (u64) per document, pointing into the records section
+
+    Each record is comprised of a field count (u16) followed by that many length-prefixed fields.
+    A field is encoded as a field name index (u16), a type tag (u8), a payload length (u32) and
+    the payload itself. Strings, integers, floats, booleans and None are encoded natively, and
+    other values are encoded as JSON.
+
+    Use the write method to convert an existing corpus into a store.
+    """
+
+    MAGIC = b"IN3120DS"
+    VERSION = 1
+
+    __HEADER = struct.Struct("<8sIIQQ")
+    __FIELD = struct.Struct("<HBI")
+    __COUNT = struct.Struct("<H")
+    __INTEGER = struct.Struct("<q")
+    __FLOAT = struct.Struct("<d")
+
+    __NONE, __STRING, __INTEGER_TAG, __FLOAT_TAG, __BOOLEAN, __JSON = range(6)
+
+    def __init__(self, filename: str):
+        with open(filename, mode="rb") as f:
+            header = f.read(__class__.__HEADER.size)  # Validate before mapping, so that there's nothing to clean up.
+            if len(header) < __class__.__HEADER.size:
+                raise IOError("Unsupported document store format")
+            (magic, version, size, names_offset, offsets_offset) = __class__.__HEADER.unpack(header)
+            if magic != __class__.MAGIC or version != __class__.VERSION:
+                raise IOError("Unsupported document store format")
+            self.__mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self.__size = size
+        self.__field_names = self.__decode_field_name_table(names_offset)
+        self.__field_indexes = {name: i for i, name in enumerate(self.__field_names)}
+        self.__offsets = memoryview(self.__mmap)[offsets_offset:offsets_offset + 8 * size].cast("Q")
+        if sys.byteorder != "little":
+            self.__offsets = array("Q", self.__offsets)
+            self.__offsets.byteswap()
+
+    def __iter__(self) -> Iterator[Document]:
+        return (self.get_document(i) for i in range(self.__size))
+
+    def size(self) -> int:
+        return self.__size
+
+    def get_document(self, document_id: int) -> Document:
+        assert 0 <= document_id < self.__size
+        return MemoryMappedDocument(self, document_id)
+
+    def close(self) -> None:
+        """
+        Releases the underlying memory mapping. Documents that are still in use become invalid.
+        """
+        if isinstance(self.__offsets, memoryview):
+            self.__offsets.release()
+        self.__mmap.close()
+
+    def _decode_field(self, document_id: int, field_name: str, default: Any) -> Any:
+        """
+        Decodes the named field for the given document, without decoding any other fields.
+        Only meant to be used by MemoryMappedDocument.
+        """
+        field_index = self.__field_indexes.get(field_name, None)
+        if field_index is not None:
+            for (index, tag, start, end) in self.__fields(document_id):
+                if index == field_index:
+                    return self.__decode_value(tag, start, end)
+        return default
+
+    def _decode_field_names(self, document_id: int) -> Iterator[str]:
+        """
+        Decodes the names of all fields for the given document. Only meant to be used by
+        MemoryMappedDocument.
+        """
+        return (self.__field_names[index] for (index, _, _, _) in self.__fields(document_id))
+
+    def __fields(self, document_id: int) -> Iterator[Tuple[int, int, int, int]]:
+        """
+        Walks the field headers in the given document's record, and yields (field name index, type tag,
+        payload start, payload end) tuples. Does not decode any payloads.
+        """
+        where = self.__offsets[document_id]
+        (count,) = __class__.__COUNT.unpack_from(self.__mmap, where)
+        where += __class__.__COUNT.size
+        for _ in range(count):
+            (index, tag, length) = __class__.__FIELD.unpack_from(self.__mmap, where)
+            where += __class__.__FIELD.size
+            yield (index, tag, where, where + length)
+            where += length
+
+    def __decode_value(self, tag: int, start: int, end: int) -> Any:
+        if tag == __class__.__STRING:
+            return str(self.__mmap[start:end], "utf-8")
+        if tag == __class__.__INTEGER_TAG:
+            return __class__.__INTEGER.unpack_from(self.__mmap, start)[0]
+        if tag == __class__.__FLOAT_TAG:
+            return __class__.__FLOAT.unpack_from(self.__mmap, start)[0]
+        if tag == __class__.__BOOLEAN:
+            return self.__mmap[start] != 0
+        if tag == __class__.__JSON:
+            return json.loads(str(self.__mmap[start:end], "utf-8"))
+        return None
+
+    def __decode_field_name_table(self, where: int) -> List[str]:
+        (count,) = struct.unpack_from("<I", self.__mmap, where)
+        where += 4
+        field_names = []
+        for _ in range(count):
+            (length,) = __class__.__COUNT.unpack_from(self.__mmap, where)
+            where += __class__.__COUNT.size
+            field_names.append(str(self.__mmap[where:where + length], "utf-8"))
+            where += length
+        return field_names
+
+    @staticmethod
+    def write(corpus: Corpus, filename: str) -> None:
+        """
+        Converts the given corpus into a memory-mappable document store, and writes it to the named
+        file. The documents are streamed, so the corpus does not have to fit in memory. Document
+        identifiers are assumed to be the integers {0, 1, ..., N - 1}, in iteration order.
+        """
+        offsets = array("Q")
+        field_indexes: Dict[str, int] = {}
+        with open(filename, mode="wb") as f:
+            f.write(__class__.__HEADER.pack(__class__.MAGIC, __class__.VERSION, 0, 0, 0))
+            for document in corpus:
+                assert document.document_id == len(offsets)
+                offsets.append(f.tell())
+                fields = [(field_indexes.setdefault(name, len(field_indexes)), document.get_field(name, None))
+                          for name in document.get_field_names()]
+                assert len(fields) <= 0xFFFF and len(field_indexes) <= 0xFFFF
+                f.write(__class__.__COUNT.pack(len(fields)))
+                for (index, value) in fields:
+                    (tag, payload) = __class__.__encode_value(value)
+                    f.write(__class__.__FIELD.pack(index, tag, len(payload)))
+                    f.write(payload)
+            names_offset = f.tell()
+            f.write(struct.pack("<I", len(field_indexes)))
+            for name in field_indexes:
+                encoded = name.encode("utf-8")
+                f.write(__class__.__COUNT.pack(len(encoded)))
+                f.write(encoded)
+            f.write(bytes(-f.tell() % 8))  # Align the offset array.
+            offsets_offset = f.tell()
+            if sys.byteorder != "little":
+                offsets.byteswap()
+            offsets.tofile(f)
+            f.seek(0)
+            f.write(__class__.__HEADER.pack(__class__.MAGIC, __class__.VERSION, len(offsets), names_offset, offsets_offset))
+
+    @staticmethod
+    def __encode_value(value: Any) -> Tuple[int, bytes]:
+        """
+        Encodes the given field value as a (type tag, payload) pair.
+        """
+        if value is None:
+            return (__class__.__NONE, b"")
+        if isinstance(value, str):
+            return (__class__.__STRING, value.encode("utf-8"))
+        if isinstance(value, bool):
+            return (__class__.__BOOLEAN, b"\x01" if value else b"\x00")
+        if isinstance(value, int) and -2 ** 63 <= value < 2 ** 63:
+            return (__class__.__INTEGER_TAG, __class__.__INTEGER.pack(value))
+        if isinstance(value, float):
+            return (__class__.__FLOAT_TAG, __class__.__FLOAT.pack(value))
+        return (__class__.__JSON, json.dumps(value).encode("utf-8"))
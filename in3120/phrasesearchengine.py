@@ -0,0 +1,90 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+from typing import Any, Dict, Iterator, List, Optional, Set
+from .corpus import Corpus
+from .invertedindex import InvertedIndex
+from .posting import PositionalPosting
+from .postingsmerger import PostingsMerger
+from .sieve import Sieve
+
+
+class PhraseSearchEngine:
+    """
+    Realizes a simple query evaluator that does phrase search over a positional inverted index. A
+    document matches a phrase query if it contains all the query terms, in the same order as in the
+    query, at consecutive positions.
+
+    Unlike the SuffixArray, this doesn't require that we keep the full normalized text of all
+    documents in memory, and we can use the posting lists to quickly narrow down the set of candidate
+    documents. Only for documents that contain all the query terms do we need to decode positions.
+    """
+
+    def __init__(self, corpus: Corpus, inverted_index: InvertedIndex):
+        self.__corpus = corpus
+        self.__inverted_index = inverted_index
+
+    def evaluate(self, query: str, options: dict) -> Iterator[Dict[str, Any]]:
+        """
+        Evaluates the given query, doing a phrase search. The matching documents are ranked according to
+        how many times the query phrase occurs in the document, and only the "best" matches are yielded
+        back to the client. Ties are resolved arbitrarily.
+
+        The client can supply a dictionary of options that controls this query evaluation process: The maximum
+        number of documents to return to the client is controlled via the "hit_count" (int) option.
+
+        The results yielded back to the client are dictionaries having the keys "score" (int) and
+        "document" (Document).
+        """
+        # Produce the query terms, processed the same way as when the index was built. Define that the
+        # empty query matches nothing, not everything. A term might occur several times in the phrase
+        # (e.g., as in "to be or not to be"), so keep track of all its offsets within the phrase.
+        query_terms = list(self.__inverted_index.get_terms(query))
+        if not query_terms:
+            return
+        offsets: Dict[str, List[int]] = {}
+        for (offset, term) in enumerate(query_terms):
+            offsets.setdefault(term, []).append(offset)
+        unique_query_terms = list(offsets.keys())
+
+        # Do a document-at-a-time intersection of the posting lists, where we use the cursor with
+        # the largest document identifier to skip the other cursors ahead. Count the phrase
+        # occurrences in each document that contains all the query terms.
+        posting_lists = [self.__inverted_index[term] for term in unique_query_terms]
+        all_cursors = [next(p, None) for p in posting_lists]
+        sieve = Sieve(max(1, min(100, options.get("hit_count", 10))))
+        while all(all_cursors):
+            document_id = max(cursor.document_id for cursor in all_cursors)
+            if all(cursor.document_id == document_id for cursor in all_cursors):
+                count = len(self.__get_phrase_starts(unique_query_terms, offsets, all_cursors))
+                if count > 0:
+                    sieve.sift(count, document_id)
+                all_cursors = [next(p, None) for p in posting_lists]
+            else:
+                for (i, cursor) in enumerate(all_cursors):
+                    if cursor.document_id < document_id:
+                        all_cursors[i] = PostingsMerger.advance_to(posting_lists[i], document_id)
+
+        # Emit documents sorted according to their occurrence counts.
+        for (score, document_id) in sieve.winners():
+            yield {"score": score, "document": self.__corpus[document_id]}
+
+    @staticmethod
+    def __get_phrase_starts(unique_query_terms: List[str], offsets: Dict[str, List[int]],
+                            postings: List[PositionalPosting]) -> Set[int]:
+        """
+        Returns the positions where the phrase starts in the document, given the postings for the unique
+        query terms in that document. A term at a given offset in the phrase occurring at position p implies
+        that the phrase might start at position p - offset. Process the rarest terms first, so that we can
+        stop early without decoding the positions for the common terms.
+        """
+        starts: Optional[Set[int]] = None
+        for i in sorted(range(len(postings)), key=lambda j: postings[j].term_frequency):
+            assert isinstance(postings[i], PositionalPosting), "the inverted index is not positional"
+            positions = postings[i].get_positions()
+            for offset in offsets[unique_query_terms[i]]:
+                candidates = {position - offset for position in positions}
+                starts = candidates if starts is None else starts & candidates
+                if not starts:
+                    return set()
+        return starts
@@ -1,15 +1,57 @@
 #!/usr/bin/python
 # -*- coding: utf-8 -*-
 
+import itertools
+from typing import List, Optional
+from .variablebytecodec import VariableByteCodec
+
 
 class Posting:
     """
     A very simple posting entry in a non-positional inverted index.
     """
 
+    __slots__ = ("document_id", "term_frequency")  # We create lots of these, so avoid a per-instance dictionary.
+
     def __init__(self, document_id: int, term_frequency: int):
         self.document_id = document_id
         self.term_frequency = term_frequency
 
     def __repr__(self):
         return str({"document_id": self.document_id, "term_frequency": self.term_frequency})
+
+
+class PositionalPosting(Posting):
+    """
+    A posting entry in a positional inverted index. Besides the document identifier and the term
+    frequency, we have the positions where the term occurs in the document, in increasing order.
+    The number of positions equals the term frequency.
+
+    The positions can be supplied either directly, or as a reference into a buffer holding them in
+    compressed form, i.e., gap encoded and then variable-byte encoded. In the latter case we only
+    decode the positions if they are asked for. Most queries never need them.
+    """
+
+    __slots__ = ("__positions", "__source", "__start")
+
+    def __init__(self, document_id: int, term_frequency: int, positions: Optional[List[int]] = None,
+                 source: Optional[bytearray] = None, start: int = 0):
+        super().__init__(document_id, term_frequency)
+        assert (positions is None) != (source is None)
+        assert positions is None or len(positions) == term_frequency
+        self.__positions = positions
+        self.__source = source
+        self.__start = start
+
+    def __repr__(self):
+        return str({"document_id": self.document_id, "term_frequency": self.term_frequency, "positions": self.get_positions()})
+
+    def get_positions(self) -> List[int]:
+        """
+        Returns the positions where the term occurs in the document. Decodes them first, if needed.
+        """
+        if self.__positions is None:
+            (gaps, _) = VariableByteCodec.decode_many(self.__source, self.__start, self.term_frequency)
+            self.__positions = list(itertools.accumulate(gaps))
+            self.__source = None
+        return self.__positions
@@ -1,9 +1,14 @@
 #!/usr/bin/python
 # -*- coding: utf-8 -*-
 
+import bisect
+import itertools
 from abc import ABC, abstractmethod
-from typing import Iterator, List
-from .posting import Posting
+from array import array
+from typing import Callable, Iterator, List, Optional, Tuple
+from .integercodec import IntegerCodec, PForDeltaCodec
+from .posting import Posting, PositionalPosting
+from .roaringbitmap import RoaringBitmap
 from .variablebytecodec import VariableByteCodec
 
 
@@ -12,6 +17,8 @@ class PostingList(ABC):
     Abstract base class for a simple posting list.
     """
 
+    __slots__ = ()  # Allows lightweight subclasses to avoid a per-instance dictionary.
+
     def __iter__(self):
         return self.get_iterator()
 
@@ -48,12 +55,205 @@ class PostingList(ABC):
         """
         pass
 
+    def get_cursor(self) -> "PostingListCursor":
+        """
+        Returns a cursor that can be used to traverse the posting list without creating a Posting
+        object per posting. Implementations that can do better than adapting an iterator should
+        override this.
+        """
+        return IteratorPostingListCursor(self.get_iterator())
+
+
+class PostingListIterator(Iterator[Posting]):
+    """
+    Base class for iterators over posting lists that, besides stepping through the postings one
+    by one, can skip ahead to a given document identifier. Skipping ahead makes it possible to,
+    e.g., intersect a short posting list with a long one in time roughly proportional to the length
+    of the short one. See Section 2.3 in https://nlp.stanford.edu/IR-book/pdf/02voc.pdf.
+
+    Subclasses that can skip efficiently should override advance_to.
+    """
+
+    def advance_to(self, document_id: int) -> Optional[Posting]:
+        """
+        Skips past all remaining postings whose document identifiers are less than the given one,
+        and returns the next posting as if next() had been called. Returns None if we reach the end
+        of the posting list.
+        """
+        posting = next(self, None)
+        while posting is not None and posting.document_id < document_id:
+            posting = next(self, None)
+        return posting
+
+
+class PostingListCursor(ABC):
+    """
+    Abstract base class for cursors over posting lists. A cursor is like an iterator, except that
+    it doesn't produce a new Posting object for every posting. Instead, the cursor has the same
+    document_id and term_frequency attributes as a Posting, and these are updated in place as the
+    cursor moves along. When traversing long posting lists this saves us from spending most of our
+    time allocating and deallocating objects that we only read a couple of integers from.
+
+    A cursor starts out positioned before the first posting, so next() has to be called before the
+    attributes can be read. Once the cursor has moved past the last posting it is exhausted, and the
+    attributes are no longer meaningful. Since a cursor looks like a Posting, it can be passed on to
+    code that only reads from postings, e.g., a Ranker. Such code mustn't hold on to it, though.
+    """
+
+    __slots__ = ("document_id", "term_frequency", "exhausted")
+
+    def __init__(self):
+        self.document_id = -1
+        self.term_frequency = 0
+        self.exhausted = False
+
+    def __repr__(self):
+        return str({"document_id": self.document_id, "term_frequency": self.term_frequency})
+
+    @abstractmethod
+    def next(self) -> bool:
+        """
+        Moves the cursor to the next posting. Returns False if we reach the end of the posting list,
+        in which case the cursor is exhausted.
+        """
+        pass
+
+    def advance_to(self, document_id: int) -> bool:
+        """
+        Moves the cursor past all remaining postings whose document identifiers are less than the
+        given one, i.e., as if next() had been called until we reach one that isn't. Like for next(),
+        the cursor always moves at least one posting ahead. Returns False if the cursor is exhausted.
+
+        Subclasses that can skip efficiently should override this.
+        """
+        while self.next():
+            if self.document_id >= document_id:
+                return True
+        return False
+
+
+class IteratorPostingListCursor(PostingListCursor):
+    """
+    A cursor that adapts an iterator over a posting list. The iterator still produces Posting objects,
+    so this doesn't save us any allocations, but it allows code that traverses posting lists using
+    cursors to work with any posting list. Skips ahead if the iterator supports that.
+    """
+
+    def __init__(self, iterator: Iterator[Posting]):
+        super().__init__()
+        self.__iterator = iterator
+
+    def next(self) -> bool:
+        return self.__move(next(self.__iterator, None))
+
+    def advance_to(self, document_id: int) -> bool:
+        if isinstance(self.__iterator, PostingListIterator):
+            return self.__move(self.__iterator.advance_to(document_id))
+        return super().advance_to(document_id)
+
+    def __move(self, posting: Optional[Posting]) -> bool:
+        if posting is None:
+            self.exhausted = True
+            return False
+        self.document_id = posting.document_id
+        self.term_frequency = posting.term_frequency
+        return True
+
+
+class CursorPostingListIterator(PostingListIterator):
+    """
+    An iterator that adapts a cursor over a posting list, i.e., that creates Posting objects on the
+    fly as the cursor moves along. Allows posting lists to implement their traversal logic once, as
+    a cursor, and still hand out iterators to clients that want those.
+    """
+
+    def __init__(self, cursor: PostingListCursor):
+        self._cursor = cursor
+
+    def __next__(self) -> Posting:
+        cursor = self._cursor
+        if cursor.next():
+            return Posting(cursor.document_id, cursor.term_frequency)
+        raise StopIteration
+
+    def advance_to(self, document_id: int) -> Optional[Posting]:
+        cursor = self._cursor
+        return Posting(cursor.document_id, cursor.term_frequency) if cursor.advance_to(document_id) else None
+
+
+def _gallop(document_id_at: Callable[[int], int], start: int, end: int, document_id: int) -> int:
+    """
+    Returns the first position in the range [start, end) where the document identifier is at least the
+    given one, or end if there is no such position. Document identifiers are assumed sorted. Does an
+    exponential search followed by a binary search, so the cost is logarithmic in the distance skipped.
+    """
+    (lower, upper, step) = (start, start, 1)
+    while upper < end and document_id_at(upper) < document_id:
+        lower = upper + 1
+        upper += step
+        step *= 2
+    upper = min(upper, end)
+    while lower < upper:
+        middle = (lower + upper) // 2
+        if document_id_at(middle) < document_id:
+            lower = middle + 1
+        else:
+            upper = middle
+    return lower
+
 
 class InMemoryPostingList(PostingList):
     """
     A simple in-memory implementation of a posting list.
     """
 
+    class InMemoryPostingListIterator(PostingListIterator):
+        """
+        A custom iterator that can skip ahead using galloping search.
+        """
+
+        def __init__(self, postings: List[Posting]):
+            self.__postings = postings
+            self.__position = 0  # The position of the posting that next() will return.
+
+        def __next__(self) -> Posting:
+            if self.__position < len(self.__postings):
+                self.__position += 1
+                return self.__postings[self.__position - 1]
+            raise StopIteration
+
+        def advance_to(self, document_id: int) -> Optional[Posting]:
+            postings = self.__postings
+            self.__position = _gallop(lambda i: postings[i].document_id, self.__position, len(postings), document_id)
+            return next(self, None)
+
+    class InMemoryPostingListCursor(PostingListCursor):
+        """
+        A custom cursor that can skip ahead using galloping search.
+        """
+
+        def __init__(self, postings: List[Posting]):
+            super().__init__()
+            self.__postings = postings
+            self.__position = -1  # The position of the posting that the cursor is positioned on.
+
+        def next(self) -> bool:
+            return self.__move(self.__position + 1)
+
+        def advance_to(self, document_id: int) -> bool:
+            postings = self.__postings
+            return self.__move(_gallop(lambda i: postings[i].document_id, self.__position + 1, len(postings), document_id))
+
+        def __move(self, position: int) -> bool:
+            self.__position = position
+            if position < len(self.__postings):
+                posting = self.__postings[position]
+                self.document_id = posting.document_id
+                self.term_frequency = posting.term_frequency
+                return True
+            self.exhausted = True
+            return False
+
     def __init__(self):
         self.__postings : List[Posting] = []
 
@@ -61,7 +261,10 @@ class InMemoryPostingList(PostingList):
         return len(self.__postings)
 
     def get_iterator(self) -> Iterator[Posting]:
-        return iter(self.__postings)
+        return __class__.InMemoryPostingListIterator(self.__postings)
+
+    def get_cursor(self) -> PostingListCursor:
+        return __class__.InMemoryPostingListCursor(self.__postings)
 
     def append_posting(self, posting: Posting) -> None:
         assert len(self.__postings) == 0 or self.__postings[-1].document_id < posting.document_id
@@ -71,53 +274,525 @@ class InMemoryPostingList(PostingList):
         pass
 
 
+class ArrayPostingList(PostingList):
+    """
+    An in-memory implementation of a posting list that stores the postings in a flat array of
+    unsigned 32-bit integers, i.e., as alternating document identifiers and term frequencies.
+    That's 8 bytes per posting instead of a full Python object per posting. Posting objects are
+    created on the fly as we iterate over the posting list, while cursors read straight out of the
+    array.
+    """
+
+    class ArrayPostingListCursor(PostingListCursor):
+        """
+        A custom cursor that reads straight out of the array, and that can skip ahead using
+        galloping search.
+        """
+
+        def __init__(self, data: array):
+            super().__init__()
+            self.__data = data
+            self.__position = -1  # The position of the posting that the cursor is positioned on.
+
+        def next(self) -> bool:
+            return self.__move(self.__position + 1)
+
+        def advance_to(self, document_id: int) -> bool:
+            data = self.__data
+            return self.__move(_gallop(lambda i: data[2 * i], self.__position + 1, len(data) // 2, document_id))
+
+        def __move(self, position: int) -> bool:
+            self.__position = position
+            where = 2 * position
+            if where < len(self.__data):
+                self.document_id = self.__data[where]
+                self.term_frequency = self.__data[where + 1]
+                return True
+            self.exhausted = True
+            return False
+
+    __slots__ = ("__data",)  # We create lots of these, so avoid a per-instance dictionary.
+
+    def __init__(self):
+        self.__data = array("I")
+
+    def get_length(self) -> int:
+        return len(self.__data) // 2
+
+    def get_iterator(self) -> Iterator[Posting]:
+        return CursorPostingListIterator(self.get_cursor())
+
+    def get_cursor(self) -> PostingListCursor:
+        return __class__.ArrayPostingListCursor(self.__data)
+
+    def append_posting(self, posting: Posting) -> None:
+        assert len(self.__data) == 0 or self.__data[-2] < posting.document_id
+        self.__data.append(posting.document_id)
+        self.__data.append(posting.term_frequency)
+
+    def finalize_postings(self) -> None:
+        # Arrays over-allocate as they grow, so trim off the slack now that we know the final size.
+        self.__data = array("I", self.__data)
+
+    def get_buffer_size(self) -> int:
+        """
+        Returns the number of bytes used for the postings, not counting any overhead.
+        """
+        return len(self.__data) * self.__data.itemsize
+
+
 class CompressedInMemoryPostingList(PostingList):
     """
     A simple in-memory implementation of a compressed posting list. Combines simple gap encoding
     with variable-byte encoding. 
+
+    To allow iterators to skip ahead without decoding everything in between, we keep a skip entry
+    for every block of SKIP_INTERVAL postings. A skip entry holds the byte offset where the block
+    starts, and the document identifier of the last posting before the block, i.e., the value that
+    the first gap in the block is relative to.
     """
 
-    class CompressedInMemoryPostingListIterator(Iterator[Posting]):
+    SKIP_INTERVAL = 128
+
+    class CompressedInMemoryPostingListCursor(PostingListCursor):
         """
-        A custom iterator that decodes the compressed integers as we traverse the underlying byte
+        A custom cursor that decodes the compressed integers as we traverse the underlying byte
         array. The decoding logic needs to mirror the encoding logic that happens when postings are
-        appended to the byte array.
+        appended to the byte array. Uses the skip entries, if any, to skip ahead.
+
+        To keep the per-posting overhead down, we decode DECODE_SIZE postings at a time using the
+        bulk decoding support in VariableByteCodec, and move the cursor along the decoded chunk.
+        """
+
+        DECODE_SIZE = 512
+
+        def __init__(self, data: bytearray, length: int, skip_document_ids: Optional[array] = None, skip_offsets: Optional[array] = None):
+            super().__init__()
+            self.__data = data  # The buffer holding all the compressed posting data.
+            self.__length = length  # The number of postings encoded in the buffer.
+            self.__where = 0  # The position in the buffer right after the decoded chunk.
+            self.__document_id = 0  # The last document identifier in the decoded chunk. We encoded the gaps, so we need this to continue.
+            self.__skip_document_ids = skip_document_ids if skip_document_ids is not None else array("Q")
+            self.__skip_offsets = skip_offsets if skip_offsets is not None else array("Q")
+            self.__decoded = 0  # The number of postings decoded so far, including the current chunk.
+            self.__document_ids: List[int] = []  # The decoded chunk.
+            self.__term_frequencies: List[int] = []  # The decoded chunk.
+            self.__position = -1  # The position in the decoded chunk of the posting that the cursor is positioned on.
+
+        def next(self) -> bool:
+            position = self.__position + 1
+            if position >= len(self.__document_ids):
+                if self.__decoded >= self.__length:
+                    return self.__exhaust()
+                self.__decode_chunk()
+                position = 0
+            self.__position = position
+            self.document_id = self.__document_ids[position]
+            self.term_frequency = self.__term_frequencies[position]
+            return True
+
+        def advance_to(self, document_id: int) -> bool:
+            # Jump to the last block that starts after a document identifier less than the target, unless
+            # we've already decoded it. Then decode our way forward from there.
+            position = self.__position + 1
+            block = bisect.bisect_left(self.__skip_document_ids, document_id) - 1
+            if block >= 0 and self.__skip_offsets[block] >= self.__where:
+                self.__where = self.__skip_offsets[block]
+                self.__document_id = self.__skip_document_ids[block]
+                self.__decoded = (block + 1) * CompressedInMemoryPostingList.SKIP_INTERVAL
+                self.__decode_chunk()
+                position = 0
+            position = bisect.bisect_left(self.__document_ids, document_id, position)
+            while position >= len(self.__document_ids):
+                if self.__decoded >= self.__length:
+                    return self.__exhaust()
+                self.__decode_chunk()
+                position = bisect.bisect_left(self.__document_ids, document_id)
+            self.__position = position
+            self.document_id = self.__document_ids[position]
+            self.term_frequency = self.__term_frequencies[position]
+            return True
+
+        def __exhaust(self) -> bool:
+            (self.__document_ids, self.__term_frequencies, self.__position) = ([], [], -1)
+            self.exhausted = True
+            return False
+
+        def __decode_chunk(self) -> None:
+            count = min(__class__.DECODE_SIZE, self.__length - self.__decoded)
+            (numbers, size) = VariableByteCodec.decode_many(self.__data, self.__where, 2 * count)
+            self.__document_ids = list(itertools.accumulate(numbers[0::2], initial=self.__document_id))[1:]
+            self.__term_frequencies = numbers[1::2]
+            self.__document_id = self.__document_ids[-1]
+            self.__where += size
+            self.__decoded += count
+
+    def __init__(self):
+        self.__logical_length = 0  # The number of posting entries encoded in the byte array.
+        self.__previous_document_id = 0  # So that we can gap encode.
+        self.__data = bytearray()  # All posting entries, compressed.
+        self.__skips = None  # Parallel arrays of skip entries, i.e., document identifiers and offsets. Created on demand.
+
+    def get_length(self) -> int:
+        return self.__logical_length
+
+    def get_iterator(self) -> Iterator[Posting]:
+        return CursorPostingListIterator(self.get_cursor())
+
+    def get_cursor(self) -> PostingListCursor:
+        return __class__.CompressedInMemoryPostingListCursor(self.__data, self.__logical_length, *(self.__skips or ()))
+
+    def append_posting(self, posting: Posting) -> None:
+        assert self.__logical_length == 0 or posting.document_id > self.__previous_document_id
+        if self.__logical_length > 0 and self.__logical_length % __class__.SKIP_INTERVAL == 0:
+            if self.__skips is None:
+                self.__skips = (array("Q"), array("Q"))
+            self.__skips[0].append(self.__previous_document_id)
+            self.__skips[1].append(len(self.__data))
+        gap = posting.document_id - self.__previous_document_id
+        VariableByteCodec.encode_many((gap, posting.term_frequency), self.__data)
+        self.__logical_length += 1
+        self.__previous_document_id = posting.document_id
+
+    def finalize_postings(self) -> None:
+        pass
+
+
+class BlockPostingList(PostingList):
+    """
+    An in-memory implementation of a compressed posting list that encodes the postings in blocks
+    of a fixed number of postings, using a pluggable IntegerCodec. Within each block we first encode
+    the document identifiers and then the term frequencies. Document identifiers are encoded as gaps,
+    or, if the codec is monotone, relative to the last document identifier in the previous block.
+    Since gaps and term frequencies are always positive we encode them minus one, so that codecs
+    that are good at runs of zeros get to shine.
+
+    Iterators decode a whole block at a time. For each block we keep the last document identifier
+    and where the block ends, so that iterators can skip ahead without decoding blocks in between.
+
+    The last block is kept unencoded until it is full or until the posting list is finalized.
+    No postings can be appended after the posting list has been finalized.
+    """
+
+    class BlockPostingListCursor(PostingListCursor):
+        """
+        A custom cursor that decodes one block at a time, and that uses the per-block skip entries
+        to skip ahead.
+        """
+
+        def __init__(self, decode_block: Callable[[int], Tuple[List[int], List[int]]], skips: array, blocks: int):
+            super().__init__()
+            self.__decode_block = decode_block  # Maps a block number to its document identifiers and term frequencies.
+            self.__skips = skips  # Alternating last document identifiers and end offsets, per encoded block.
+            self.__blocks = blocks  # The number of blocks, including the unencoded one, if any.
+            self.__block = -1  # The number of the currently decoded block.
+            self.__document_ids: List[int] = []
+            self.__term_frequencies: List[int] = []
+            self.__position = -1  # The position in the current block of the posting that the cursor is positioned on.
+
+        def next(self) -> bool:
+            position = self.__position + 1
+            while position >= len(self.__document_ids):
+                if self.__block + 1 >= self.__blocks:
+                    return self.__exhaust()
+                self.__load(self.__block + 1)
+                position = 0
+            self.__position = position
+            self.document_id = self.__document_ids[position]
+            self.term_frequency = self.__term_frequencies[position]
+            return True
+
+        def advance_to(self, document_id: int) -> bool:
+            skips = self.__skips
+            block = _gallop(lambda i: skips[2 * i], max(self.__block, 0), len(skips) // 2, document_id)
+            if block >= self.__blocks:
+                return self.__exhaust()
+            position = self.__position + 1
+            if block != self.__block:
+                self.__load(block)
+                position = 0
+            self.__position = bisect.bisect_left(self.__document_ids, document_id, position) - 1
+            return self.next()
+
+        def __exhaust(self) -> bool:
+            (self.__block, self.__document_ids, self.__term_frequencies, self.__position) = (self.__blocks, [], [], -1)
+            self.exhausted = True
+            return False
+
+        def __load(self, block: int) -> None:
+            (self.__document_ids, self.__term_frequencies) = self.__decode_block(block)
+            self.__block = block
+
+    __slots__ = ("__document_codec", "__term_frequency_codec", "__block_size", "__length",
+                 "__data", "__skips", "__pending")  # We create lots of these, so avoid a per-instance dictionary.
+
+    __DEFAULT_CODEC = PForDeltaCodec()  # Codecs are stateless, so one instance can be shared.
+
+    def __init__(self, document_codec: Optional[IntegerCodec] = None,
+                 term_frequency_codec: Optional[IntegerCodec] = None, block_size: int = 128):
+        assert block_size > 0
+        self.__document_codec = document_codec or __class__.__DEFAULT_CODEC
+        self.__term_frequency_codec = term_frequency_codec or __class__.__DEFAULT_CODEC
+        assert not self.__term_frequency_codec.monotone
+        self.__block_size = block_size
+        self.__length = 0  # The number of postings, including the unencoded ones.
+        self.__data = bytearray()  # All encoded blocks.
+        self.__skips = array("Q")  # Alternating last document identifiers and end offsets, per encoded block.
+        self.__pending = ([], [])  # The document identifiers and term frequencies not yet encoded. None if finalized.
+
+    def get_length(self) -> int:
+        return self.__length
+
+    def get_iterator(self) -> Iterator[Posting]:
+        return CursorPostingListIterator(self.get_cursor())
+
+    def get_cursor(self) -> PostingListCursor:
+        blocks = len(self.__skips) // 2 + (1 if self.__pending and self.__pending[0] else 0)
+        return __class__.BlockPostingListCursor(self.__decode_block, self.__skips, blocks)
+
+    def append_posting(self, posting: Posting) -> None:
+        assert self.__pending is not None, "posting list is finalized"
+        (document_ids, term_frequencies) = self.__pending
+        last = document_ids[-1] if document_ids else (self.__skips[-2] if self.__skips else -1)
+        assert posting.document_id > last
+        assert posting.term_frequency > 0
+        document_ids.append(posting.document_id)
+        term_frequencies.append(posting.term_frequency)
+        self.__length += 1
+        if len(document_ids) == self.__block_size:
+            self.__encode_block()
+
+    def finalize_postings(self) -> None:
+        if self.__pending is not None:
+            if self.__pending[0]:
+                self.__encode_block()
+            self.__pending = None
+            self.__data = bytes(self.__data)  # Trims off any slack, and prevents accidental changes.
+
+    def get_buffer_size(self) -> int:
         """
+        Returns the number of bytes used for the encoded blocks, not counting any overhead.
+        """
+        return len(self.__data)
+
+    def __encode_block(self) -> None:
+        (document_ids, term_frequencies) = self.__pending
+        base = self.__skips[-2] if self.__skips else -1
+        if self.__document_codec.monotone:
+            self.__document_codec.encode([document_id - base - 1 for document_id in document_ids], self.__data)
+        else:
+            self.__document_codec.encode([b - a - 1 for (a, b) in zip([base] + document_ids, document_ids)], self.__data)
+        self.__term_frequency_codec.encode([term_frequency - 1 for term_frequency in term_frequencies], self.__data)
+        self.__skips.append(document_ids[-1])
+        self.__skips.append(len(self.__data))
+        self.__pending = ([], [])
 
-        def __init__(self, data: bytearray):
+    def __decode_block(self, block: int) -> Tuple[List[int], List[int]]:
+        blocks = len(self.__skips) // 2
+        if block == blocks:
+            return self.__pending
+        (base, start) = (self.__skips[2 * block - 2], self.__skips[2 * block - 1]) if block > 0 else (-1, 0)
+        count = min(self.__block_size, self.__length - block * self.__block_size)
+        (values, size) = self.__document_codec.decode(self.__data, start, count)
+        if self.__document_codec.monotone:
+            document_ids = [base + 1 + value for value in values]
+        else:
+            document_ids = [base + document_id for document_id in itertools.accumulate(value + 1 for value in values)]
+        (values, _) = self.__term_frequency_codec.decode(self.__data, start + size, count)
+        return (document_ids, [value + 1 for value in values])
+
+
+class PositionalPostingList(PostingList):
+    """
+    An in-memory implementation of a compressed posting list for a positional inverted index. For
+    each posting we encode the document identifier gap, the term frequency, the size of the encoded
+    positions, and then the positions themselves as gaps. All numbers are variable-byte encoded.
+
+    Iterators produce PositionalPosting objects that refer back into our buffer, so that positions
+    only get decoded if someone asks for them. Knowing the size of the encoded positions allows us
+    to step past them without decoding them. Like for CompressedInMemoryPostingList, we keep a skip
+    entry for every block of SKIP_INTERVAL postings.
+    """
+
+    SKIP_INTERVAL = 128
+
+    class PositionalPostingListIterator(PostingListIterator):
+        """
+        A custom iterator that decodes the compressed integers as we traverse the underlying byte
+        array, but that leaves the positions alone. Uses the skip entries, if any, to skip ahead.
+        """
+
+        def __init__(self, data: bytearray, skip_document_ids: Optional[array] = None, skip_offsets: Optional[array] = None):
             self.__data = data  # The buffer holding all the compressed posting data.
             self.__where = 0  # Our current position in the buffer.
             self.__document_id = 0  # We encoded the gaps, so accumulate them when decoding.
+            self.__skip_document_ids = skip_document_ids if skip_document_ids is not None else array("Q")
+            self.__skip_offsets = skip_offsets if skip_offsets is not None else array("Q")
 
         def __next__(self) -> Posting:
             if self.__where < len(self.__data):
                 (gap, increment) = VariableByteCodec.decode(self.__data, self.__where)
                 self.__where += increment
-                self.__document_id += gap
                 (term_frequency, increment) = VariableByteCodec.decode(self.__data, self.__where)
                 self.__where += increment
-                return Posting(self.__document_id, term_frequency)
-            else:
-                raise StopIteration
+                (size, increment) = VariableByteCodec.decode(self.__data, self.__where)
+                self.__where += increment
+                self.__document_id += gap
+                posting = PositionalPosting(self.__document_id, term_frequency, source=self.__data, start=self.__where)
+                self.__where += size
+                return posting
+            raise StopIteration
+
+        def advance_to(self, document_id: int) -> Optional[Posting]:
+            # Jump to the last block that starts after a document identifier less than the target, unless
+            # we're already past it. Then step our way forward from there.
+            block = bisect.bisect_left(self.__skip_document_ids, document_id) - 1
+            if block >= 0 and self.__skip_offsets[block] > self.__where:
+                self.__where = self.__skip_offsets[block]
+                self.__document_id = self.__skip_document_ids[block]
+            return super().advance_to(document_id)
 
     def __init__(self):
         self.__logical_length = 0  # The number of posting entries encoded in the byte array.
         self.__previous_document_id = 0  # So that we can gap encode.
         self.__data = bytearray()  # All posting entries, compressed.
+        self.__skips = None  # Parallel arrays of skip entries, i.e., document identifiers and offsets. Created on demand.
 
     def get_length(self) -> int:
         return self.__logical_length
 
     def get_iterator(self) -> Iterator[Posting]:
-        return __class__.CompressedInMemoryPostingListIterator(self.__data)
+        return __class__.PositionalPostingListIterator(self.__data, *(self.__skips or ()))
 
     def append_posting(self, posting: Posting) -> None:
+        assert isinstance(posting, PositionalPosting)
         assert self.__logical_length == 0 or posting.document_id > self.__previous_document_id
-        gap = posting.document_id - self.__previous_document_id
-        VariableByteCodec.encode(gap, self.__data)
-        VariableByteCodec.encode(posting.term_frequency, self.__data)
+        positions = posting.get_positions()
+        assert all(a < b for (a, b) in zip(positions, positions[1:]))
+        if self.__logical_length > 0 and self.__logical_length % __class__.SKIP_INTERVAL == 0:
+            if self.__skips is None:
+                self.__skips = (array("Q"), array("Q"))
+            self.__skips[0].append(self.__previous_document_id)
+            self.__skips[1].append(len(self.__data))
+        encoded = bytearray()
+        VariableByteCodec.encode_many((b - a for (a, b) in zip([0] + positions, positions)), encoded)
+        VariableByteCodec.encode_many((posting.document_id - self.__previous_document_id, posting.term_frequency, len(encoded)), self.__data)
+        self.__data.extend(encoded)
         self.__logical_length += 1
         self.__previous_document_id = posting.document_id
 
     def finalize_postings(self) -> None:
         pass
+
+
+class BitmapPostingList(PostingList):
+    """
+    An in-memory implementation of a posting list that keeps the document identifiers in a compressed
+    bitmap, and the term frequencies in a parallel array in document identifier order. Suitable for terms
+    that occur in a large share of the documents. For these, a bitmap is smaller than a list of gaps, and
+    PostingsMerger can intersect and unite two bitmaps using bitwise operations instead of stepping
+    through the postings one by one.
+    """
+
+    class BitmapPostingListCursor(PostingListCursor):
+        """
+        A custom cursor that decodes one bitmap container at a time. The term frequency of a
+        posting is looked up by its rank, i.e., its position in the posting list.
+        """
+
+        def __init__(self, bitmap: RoaringBitmap, term_frequencies: array):
+            super().__init__()
+            self.__bitmap = bitmap
+            self.__term_frequencies = term_frequencies
+            self.__containers = list(bitmap.get_containers())  # The (key, cardinality, container) triples.
+            self.__keys = [key for (key, _, _) in self.__containers]
+            self.__ranks = list(itertools.accumulate([0] + [cardinality for (_, cardinality, _) in self.__containers]))
+            self.__container = -1  # The index of the currently decoded container.
+            self.__base = 0  # The high bits of the document identifiers in the current container.
+            self.__lows: List[int] = []  # The low bits of the document identifiers in the current container.
+            self.__position = -1  # The position in the current container of the posting that the cursor is positioned on.
+
+        def next(self) -> bool:
+            position = self.__position + 1
+            while position >= len(self.__lows):
+                if self.__container + 1 >= len(self.__containers):
+                    return self.__exhaust()
+                self.__load(self.__container + 1)
+                position = 0
+            self.__position = position
+            self.document_id = self.__base | self.__lows[position]
+            self.term_frequency = self.__term_frequencies[self.__ranks[self.__container] + position]
+            return True
+
+        def advance_to(self, document_id: int) -> bool:
+            (key, low) = divmod(document_id, 1 << 16)
+            container = bisect.bisect_left(self.__keys, key, max(self.__container, 0))
+            if container >= len(self.__containers):
+                return self.__exhaust()
+            position = self.__position + 1
+            if container != self.__container:
+                self.__load(container)
+                position = 0
+            if self.__keys[container] == key:
+                position = bisect.bisect_left(self.__lows, low, position)
+            self.__position = position - 1
+            return self.next()
+
+        def get_bitmap(self) -> Optional[RoaringBitmap]:
+            """
+            Returns the bitmap holding the document identifiers, but only if the cursor hasn't been
+            moved yet. Otherwise the bitmap would include postings that we've already moved past.
+            """
+            return self.__bitmap if self.__container < 0 else None
+
+        def __exhaust(self) -> bool:
+            (self.__container, self.__lows, self.__position) = (len(self.__containers), [], -1)
+            self.exhausted = True
+            return False
+
+        def __load(self, container: int) -> None:
+            (key, _, lows) = self.__containers[container]
+            self.__base = key << 16
+            self.__lows = RoaringBitmap.decode_container(lows)
+            self.__container = container
+
+    class BitmapPostingListIterator(CursorPostingListIterator):
+        """
+        A custom iterator that, besides producing postings, gives PostingsMerger access to the
+        bitmap as long as we haven't started iterating.
+        """
+
+        def get_bitmap(self) -> Optional[RoaringBitmap]:
+            """
+            Returns the bitmap holding the document identifiers, but only if the iterator hasn't been
+            advanced yet. Otherwise the bitmap would include postings that we've already moved past.
+            """
+            return self._cursor.get_bitmap()
+
+    __slots__ = ("__bitmap", "__term_frequencies", "__last_document_id")  # Avoid a per-instance dictionary.
+
+    def __init__(self):
+        self.__bitmap = RoaringBitmap()
+        self.__term_frequencies = array("B")  # Widened if we encounter a large term frequency.
+        self.__last_document_id = -1
+
+    def get_length(self) -> int:
+        return len(self.__term_frequencies)
+
+    def get_iterator(self) -> Iterator[Posting]:
+        return __class__.BitmapPostingListIterator(self.get_cursor())
+
+    def get_cursor(self) -> PostingListCursor:
+        return __class__.BitmapPostingListCursor(self.__bitmap, self.__term_frequencies)
+
+    def append_posting(self, posting: Posting) -> None:
+        assert posting.document_id > self.__last_document_id
+        if posting.term_frequency > 255 and self.__term_frequencies.typecode == "B":
+            self.__term_frequencies = array("I", self.__term_frequencies)
+        self.__bitmap.add(posting.document_id)
+        self.__term_frequencies.append(posting.term_frequency)
+        self.__last_document_id = posting.document_id
+
+    def finalize_postings(self) -> None:
+        self.__bitmap.optimize()
+        self.__term_frequencies = array(self.__term_frequencies.typecode, self.__term_frequencies)
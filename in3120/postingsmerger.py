@@ -1,8 +1,10 @@
 #!/usr/bin/python
 # -*- coding: utf-8 -*-
 
-from typing import Iterator
+from typing import Iterator, Optional
 from .posting import Posting
+from .postinglist import BitmapPostingList, PostingListCursor, PostingListIterator
+from .roaringbitmap import RoaringBitmap
 
 
 class PostingsMerger:
@@ -14,8 +16,100 @@ class PostingsMerger:
     approaches are possible, e.g., an arbitrary one of the two postings could
     be returned, or the posting having the smallest/largest term frequency, or
     a new one that produces an averaged value, or something else.
+
+    If both posting lists are backed by bitmaps, we intersect the bitmaps directly using bitwise
+    operations, and only then look up the postings that make it into the result. There's no such
+    shortcut for unions: Every posting ends up in the result anyway, so uniting the bitmaps first
+    would only add to the work.
+
+    Besides merging iterators into generators, we can merge cursors into cursors. Merged cursors
+    don't create any Posting objects along the way, and can themselves be merged further.
     """
 
+    class IntersectionCursor(PostingListCursor):
+        """
+        A cursor that moves along a simple AND of two posting lists, given cursors over these. The
+        term frequencies are taken from the first posting list.
+        """
+
+        def __init__(self, cursor1: PostingListCursor, cursor2: PostingListCursor):
+            super().__init__()
+            self.__cursor1 = cursor1
+            self.__cursor2 = cursor2
+
+        def next(self) -> bool:
+            return self.__align(self.__cursor1.next())
+
+        def advance_to(self, document_id: int) -> bool:
+            return self.__align(self.__cursor1.advance_to(document_id))
+
+        def __align(self, moved: bool) -> bool:
+            # The first cursor has just moved. Leapfrog the cursors until they agree, skipping ahead.
+            (cursor1, cursor2) = (self.__cursor1, self.__cursor2)
+            while moved:
+                if cursor2.document_id < cursor1.document_id:
+                    moved = cursor2.advance_to(cursor1.document_id)
+                elif cursor2.document_id > cursor1.document_id:
+                    moved = cursor1.advance_to(cursor2.document_id)
+                else:
+                    self.document_id = cursor1.document_id
+                    self.term_frequency = cursor1.term_frequency
+                    return True
+            self.exhausted = True
+            return False
+
+    class UnionCursor(PostingListCursor):
+        """
+        A cursor that moves along a simple OR of two posting lists, given cursors over these. The
+        term frequencies are taken from the first posting list, if it contains the document.
+        """
+
+        def __init__(self, cursor1: PostingListCursor, cursor2: PostingListCursor):
+            super().__init__()
+            self.__cursor1 = cursor1
+            self.__cursor2 = cursor2
+
+        def next(self) -> bool:
+            # Move the cursors that are where we are. Initially, that's both of them.
+            for cursor in (self.__cursor1, self.__cursor2):
+                if not cursor.exhausted and cursor.document_id == self.document_id:
+                    cursor.next()
+            return self.__pick()
+
+        def advance_to(self, document_id: int) -> bool:
+            target = max(document_id, self.document_id + 1)
+            for cursor in (self.__cursor1, self.__cursor2):
+                if not cursor.exhausted and cursor.document_id < target:
+                    cursor.advance_to(target)
+            return self.__pick()
+
+        def __pick(self) -> bool:
+            (cursor1, cursor2) = (self.__cursor1, self.__cursor2)
+            if cursor1.exhausted and cursor2.exhausted:
+                self.exhausted = True
+                return False
+            if cursor2.exhausted or (not cursor1.exhausted and cursor1.document_id <= cursor2.document_id):
+                self.document_id = cursor1.document_id
+                self.term_frequency = cursor1.term_frequency
+            else:
+                self.document_id = cursor2.document_id
+                self.term_frequency = cursor2.term_frequency
+            return True
+
+    @staticmethod
+    def advance_to(iterator: Iterator[Posting], document_id: int) -> Optional[Posting]:
+        """
+        Skips past all remaining postings whose document identifiers are less than the given one,
+        and returns the next posting, or None if the iterator is exhausted. Skips efficiently if the
+        iterator supports that, and falls back to stepping through the postings one by one if not.
+        """
+        if isinstance(iterator, PostingListIterator):
+            return iterator.advance_to(document_id)
+        posting = next(iterator, None)
+        while posting is not None and posting.document_id < document_id:
+            posting = next(iterator, None)
+        return posting
+
     @staticmethod
     def intersection(p1: Iterator[Posting], p2: Iterator[Posting]) -> Iterator[Posting]:
         """
@@ -26,6 +120,13 @@ class PostingsMerger:
         to the document identifiers.
         """
 
+        # Take a shortcut if we have two bitmaps. Return postings from the first list, like below.
+        (b1, b2) = (__class__.__get_bitmap(p1), __class__.__get_bitmap(p2))
+        if b1 is not None and b2 is not None:
+            for document_id in b1 & b2:
+                yield PostingsMerger.advance_to(p1, document_id)
+            return
+
         # Start at the head.
         current1 = next(p1, None)
         current2 = next(p2, None)
@@ -34,15 +135,16 @@ class PostingsMerger:
         # the posting lists.
         while current1 and current2:
 
-            # Increment the smallest one. Yield if we have a match.
+            # Advance the smallest one up to the other one, skipping ahead if possible.
+            # Yield if we have a match.
             if current1.document_id == current2.document_id:
                 yield current1
                 current1 = next(p1, None)
                 current2 = next(p2, None)
             elif current1.document_id < current2.document_id:
-                current1 = next(p1, None)
+                current1 = PostingsMerger.advance_to(p1, current2.document_id)
             else:
-                current2 = next(p2, None)
+                current2 = PostingsMerger.advance_to(p2, current1.document_id)
 
     @staticmethod
     def union(p1: Iterator[Posting], p2: Iterator[Posting]) -> Iterator[Posting]:
@@ -81,3 +183,9 @@ class PostingsMerger:
         if current2:
             yield current2
             yield from p2
+
+    @staticmethod
+    def __get_bitmap(iterator: Iterator[Posting]) -> Optional[RoaringBitmap]:
+        if isinstance(iterator, BitmapPostingList.BitmapPostingListIterator):
+            return iterator.get_bitmap()
+        return None
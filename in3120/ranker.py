@@ -2,7 +2,9 @@
 # -*- coding: utf-8 -*-
 
 from abc import ABC, abstractmethod
+from typing import Union
 from .posting import Posting
+from .postinglist import PostingListCursor
 
 
 class Ranker(ABC):
@@ -18,13 +20,16 @@ class Ranker(ABC):
         pass
 
     @abstractmethod
-    def update(self, term: str, multiplicity: int, posting: Posting) -> None:
+    def update(self, term: str, multiplicity: int, posting: Union[Posting, PostingListCursor]) -> None:
         """
         Tells the ranker to update its internals based on information from one
         query term and the associated posting. This method might be invoked multiple
         times if the query contains multiple unique terms. Since a query term might
         occur multiple times in a query, the query term's multiplicity or occurrence
         count in the query is also provided.
+
+        Instead of a posting, the posting list cursor positioned on it might be supplied.
+        Rankers should read what they need from it, and not hold on to it.
         """
         pass
 
@@ -50,7 +55,7 @@ class SimpleRanker(Ranker):
         self.__document_id = document_id
         self.__score = 0.0
 
-    def update(self, term: str, multiplicity: int, posting: Posting) -> None:
+    def update(self, term: str, multiplicity: int, posting: Union[Posting, PostingListCursor]) -> None:
         assert self.__document_id == posting.document_id
         self.__score += multiplicity * posting.term_frequency
 
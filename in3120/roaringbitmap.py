@@ -0,0 +1,207 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+from __future__ import annotations
+import bisect
+from array import array
+from typing import Iterable, Iterator, List, Union
+
+Container = Union[array, int]
+
+# Maps a byte to the positions of its set bits.
+_BYTE_BITS = [[i for i in range(8) if (byte >> i) & 1] for byte in range(256)]
+
+
+def _get_bits(word: int) -> List[int]:
+    """
+    Returns the positions of the set bits in the given non-negative integer, in increasing order.
+    """
+    bits = []
+    for (i, byte) in enumerate(word.to_bytes((word.bit_length() + 7) // 8, "little")):
+        if byte:
+            offset = 8 * i
+            bits.extend([offset + j for j in _BYTE_BITS[byte]])
+    return bits
+
+
+def _get_cardinality(container: Container) -> int:
+    return bin(container).count("1") if isinstance(container, int) else len(container)
+
+
+class RoaringBitmap:
+    """
+    A compressed bitmap for sets of unsigned 32-bit integers, e.g., document identifiers, inspired
+    by Roaring bitmaps. See https://arxiv.org/abs/1402.6407 for details.
+
+    The integers are partitioned into chunks according to their 16 most significant bits. For each
+    non-empty chunk we have a container holding the 16 least significant bits of the integers in that
+    chunk. Sparse chunks use an array container, i.e., a sorted array of 16-bit integers. Dense chunks
+    use a bitset container, i.e., a plain Python integer where bit i is set if i is in the chunk. Since
+    Python integers grow as needed, a bitset container only costs as many bytes as it takes to cover its
+    highest bit. We hence pick whichever container type is smaller, rather than using a fixed cutoff.
+
+    Intersections and unions of bitset containers are done as bitwise operations on Python integers, i.e.,
+    a machine word at a time.
+    """
+
+    def __init__(self, values: Iterable[int] = ()):
+        self.__keys = array("H")  # The high 16 bits of each chunk, sorted.
+        self.__containers: List[Container] = []  # The containers, in the same order as the keys.
+        self.__cardinalities = array("I")  # The number of integers in each container.
+        for value in values:
+            self.add(value)
+        self.optimize()
+
+    def __len__(self) -> int:
+        return sum(self.__cardinalities)
+
+    def __iter__(self) -> Iterator[int]:
+        for (key, container) in zip(self.__keys, self.__containers):
+            base = key << 16
+            for low in __class__.decode_container(container):
+                yield base | low
+
+    def __contains__(self, value: int) -> bool:
+        (key, low) = divmod(value, 1 << 16)
+        i = bisect.bisect_left(self.__keys, key)
+        if i == len(self.__keys) or self.__keys[i] != key:
+            return False
+        container = self.__containers[i]
+        if isinstance(container, int):
+            return (container >> low) & 1 == 1
+        j = bisect.bisect_left(container, low)
+        return j < len(container) and container[j] == low
+
+    def __eq__(self, other: object) -> bool:
+        return isinstance(other, RoaringBitmap) and list(self) == list(other)
+
+    def __and__(self, other: RoaringBitmap) -> RoaringBitmap:
+        result = RoaringBitmap()
+        (i, j) = (0, 0)
+        while i < len(self.__keys) and j < len(other.__keys):
+            if self.__keys[i] < other.__keys[j]:
+                i += 1
+            elif self.__keys[i] > other.__keys[j]:
+                j += 1
+            else:
+                result.__append(self.__keys[i], __class__.__intersect(self.__containers[i], other.__containers[j]))
+                i += 1
+                j += 1
+        return result
+
+    def __or__(self, other: RoaringBitmap) -> RoaringBitmap:
+        result = RoaringBitmap()
+        (i, j) = (0, 0)
+        while i < len(self.__keys) or j < len(other.__keys):
+            if j == len(other.__keys) or (i < len(self.__keys) and self.__keys[i] < other.__keys[j]):
+                result.__append(self.__keys[i], self.__containers[i])
+                i += 1
+            elif i == len(self.__keys) or self.__keys[i] > other.__keys[j]:
+                result.__append(other.__keys[j], other.__containers[j])
+                j += 1
+            else:
+                result.__append(self.__keys[i], __class__.__unite(self.__containers[i], other.__containers[j]))
+                i += 1
+                j += 1
+        return result
+
+    def add(self, value: int) -> None:
+        """
+        Adds the given integer to the set. Adding integers in increasing order is the fastest. New
+        chunks start out with array containers, so call optimize when done adding integers.
+        """
+        assert 0 <= value < (1 << 32)
+        (key, low) = divmod(value, 1 << 16)
+        if self.__keys and self.__keys[-1] == key:
+            i = len(self.__keys) - 1
+        else:
+            i = bisect.bisect_left(self.__keys, key)
+            if i == len(self.__keys) or self.__keys[i] != key:
+                self.__keys.insert(i, key)
+                self.__containers.insert(i, array("H"))
+                self.__cardinalities.insert(i, 0)
+        container = self.__containers[i]
+        if isinstance(container, int):
+            if not (container >> low) & 1:
+                self.__containers[i] = container | (1 << low)
+                self.__cardinalities[i] += 1
+            return
+        j = len(container) if not container or container[-1] < low else bisect.bisect_left(container, low)
+        if j < len(container) and container[j] == low:
+            return
+        container.insert(j, low)
+        self.__cardinalities[i] += 1
+
+    def optimize(self) -> None:
+        """
+        Converts each container to whichever container type is the smallest, and trims off any
+        slack. Typically done after having added all integers.
+        """
+        self.__containers = [__class__.__optimize(container) for container in self.__containers]
+
+    def get_containers(self) -> Iterator[tuple]:
+        """
+        Returns (key, cardinality, container) triples for all containers, in order. Useful for clients
+        that need to, e.g., compute ranks.
+        """
+        return zip(self.__keys, self.__cardinalities, self.__containers)
+
+    @staticmethod
+    def decode_container(container: Container) -> List[int]:
+        """
+        Returns the low 16 bits of the integers held by the given container, in increasing order.
+        """
+        return _get_bits(container) if isinstance(container, int) else list(container)
+
+    def get_size_in_bytes(self) -> int:
+        """
+        Returns the approximate number of bytes used for the containers' payloads.
+        """
+        return sum((c.bit_length() + 7) // 8 if isinstance(c, int) else 2 * len(c) for c in self.__containers)
+
+    def __append(self, key: int, container: Container) -> None:
+        cardinality = _get_cardinality(container)
+        if cardinality > 0:
+            self.__keys.append(key)
+            self.__containers.append(__class__.__optimize(container))
+            self.__cardinalities.append(cardinality)
+
+    @staticmethod
+    def __intersect(container1: Container, container2: Container) -> Container:
+        if isinstance(container1, int) and isinstance(container2, int):
+            return container1 & container2
+        if isinstance(container1, int):
+            (container1, container2) = (container2, container1)
+        if isinstance(container2, int):
+            bitset = container2.to_bytes(8192, "little")
+            return array("H", (low for low in container1 if (bitset[low >> 3] >> (low & 7)) & 1))
+        return array("H", sorted(set(container1).intersection(container2)))
+
+    @staticmethod
+    def __unite(container1: Container, container2: Container) -> Container:
+        if isinstance(container1, int) or isinstance(container2, int):
+            if not isinstance(container1, int):
+                container1 = __class__.__to_bitset(container1)
+            if not isinstance(container2, int):
+                container2 = __class__.__to_bitset(container2)
+            return container1 | container2
+        return array("H", sorted(set(container1).union(container2)))
+
+    @staticmethod
+    def __prefers_bitset(container: array) -> bool:
+        # A bitset container needs enough bytes to cover the highest bit, an array container needs 2 bytes per entry.
+        return len(container) > 0 and 2 * len(container) > container[-1] // 8 + 1
+
+    @staticmethod
+    def __to_bitset(container: array) -> int:
+        buffer = bytearray(container[-1] // 8 + 1 if container else 0)
+        for low in container:
+            buffer[low >> 3] |= 1 << (low & 7)
+        return int.from_bytes(buffer, "little")
+
+    @staticmethod
+    def __optimize(container: Container) -> Container:
+        if isinstance(container, int):
+            bits = _get_bits(container)
+            return container if __class__.__prefers_bitset(bits) else array("H", bits)
+        return __class__.__to_bitset(container) if __class__.__prefers_bitset(container) else array("H", container)
@@ -0,0 +1,108 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+import bisect
+import heapq
+from array import array
+from collections import Counter
+from operator import itemgetter
+from typing import Any, Dict, Iterator, List, Tuple
+from .corpus import Corpus
+from .impactorderedinvertedindex import ImpactOrderedInvertedIndex
+from .sieve import Sieve
+
+
+class ScoreAtATimeSearchEngine:
+    """
+    Realizes a query evaluator that does score-at-a-time traversal over an impact-ordered inverted
+    index. Instead of scoring one document at a time, we process the impact segments of all query
+    terms in order of descending impact, and add up the impacts per document in a set of accumulators.
+    A document's score is thus the sum of the impacts of the query terms it contains, each weighted
+    by the term's multiplicity in the query. Any document containing at least one query term matches.
+
+    Since the segments come in order of descending impact, we know after each segment how much any
+    document can still gain, at most. Once that's too little to change which documents make up the
+    top K, we stop. The few remaining contributions to those K documents are then looked up directly
+    in the unprocessed segments, so that the final scores and the ordering are exact.
+    """
+
+    def __init__(self, corpus: Corpus, inverted_index: ImpactOrderedInvertedIndex):
+        self.__corpus = corpus
+        self.__inverted_index = inverted_index
+
+    def evaluate(self, query: str, options: dict) -> Iterator[Dict[str, Any]]:
+        """
+        Evaluates the given query, doing score-at-a-time ranked retrieval. Only the "best" matches are
+        yielded back to the client as dictionaries having the keys "score" (float) and "document" (Document).
+        The scores are approximate TF-IDF scores, as reconstructed from the quantized impacts. Ties are
+        resolved arbitrarily.
+
+        The client can supply a dictionary of options that controls the query evaluation process: The maximum
+        number of documents to return to the client is controlled via the "hit_count" (int) option. Setting
+        the "early_termination" (bool) option to False makes us process all segments.
+        """
+        # Produce the query terms. Some terms might be duplicated (e.g., as in the query "to be or not to be").
+        unique_query_terms = list(Counter(self.__inverted_index.get_terms(query)).items())
+        hit_count = max(1, min(100, options.get("hit_count", 10)))
+        early_termination = options.get("early_termination", True)
+
+        # Order all the segments of all the query terms by their impact, weighted by the query term's
+        # multiplicity. The sort is stable, so each term's segments remain in their original order.
+        # Segments having no impact can't contribute to any score, so skip those.
+        term_segments = [[(impact * multiplicity, document_ids) for (impact, document_ids) in self.__inverted_index.get_impact_segments(term) if impact > 0]
+                         for (term, multiplicity) in unique_query_terms]
+        ordering = sorted(((segments[j][0], i, j) for (i, segments) in enumerate(term_segments) for j in range(len(segments))),
+                          key=itemgetter(0), reverse=True)
+
+        # For each query term, keep track of how many of its segments that we've processed, and the
+        # impact of the next one. The latter bounds how much a document can still gain from that term.
+        processed = [0] * len(term_segments)
+        bounds = [segments[0][0] if segments else 0 for segments in term_segments]
+
+        # Process the segments in order, one score at a time. Checking whether the top K has settled takes
+        # time linear in the number of accumulators, so only do that after we've done at least as much
+        # work adding to accumulators since the previous check.
+        accumulators: Dict[int, int] = {}
+        work = 0
+        for (impact, i, j) in ordering:
+            for document_id in term_segments[i][j][1]:
+                accumulators[document_id] = accumulators.get(document_id, 0) + impact
+            work += len(term_segments[i][j][1])
+            processed[i] = j + 1
+            bounds[i] = term_segments[i][j + 1][0] if j + 1 < len(term_segments[i]) else 0
+            if early_termination and work >= len(accumulators):
+                work = 0
+                if self.__is_settled(accumulators, hit_count, sum(bounds)):
+                    break
+
+        # The top K is now settled, but the scores might be incomplete. Complete them, and emit the
+        # documents sorted according to their relevancy scores.
+        sieve = Sieve(hit_count)
+        scale = self.__inverted_index.get_impact_scale()
+        for (document_id, score) in heapq.nlargest(hit_count, accumulators.items(), key=itemgetter(1)):
+            for (i, segments) in enumerate(term_segments):
+                score += self.__find_impact(segments[processed[i]:], document_id)
+            sieve.sift(score * scale, document_id)
+        for (score, document_id) in sieve.winners():
+            yield {"score": score, "document": self.__corpus[document_id]}
+
+    @staticmethod
+    def __is_settled(accumulators: Dict[int, int], hit_count: int, remaining: int) -> bool:
+        # We're settled if neither a document that we haven't seen yet nor the best document that's
+        # currently outside the top K can overtake the worst document that's currently inside it.
+        if remaining == 0:
+            return True
+        if len(accumulators) < hit_count:
+            return False
+        scores = heapq.nlargest(hit_count + 1, accumulators.values())
+        runner_up = scores[hit_count] if len(scores) > hit_count else 0
+        return scores[hit_count - 1] >= runner_up + remaining
+
+    @staticmethod
+    def __find_impact(segments: List[Tuple[int, array]], document_id: int) -> int:
+        # A document occurs in at most one of a term's segments.
+        for (impact, document_ids) in segments:
+            position = bisect.bisect_left(document_ids, document_id)
+            if position < len(document_ids) and document_ids[position] == document_id:
+                return impact
+        return 0
@@ -53,8 +53,9 @@ class SimpleSearchEngine:
         query_terms = self.__inverted_index.get_terms(query)
         unique_query_terms = list(Counter(query_terms).items())
 
-        # Get the posting lists for the unique query terms.
-        posting_lists = [self.__inverted_index[term] for (term, _) in unique_query_terms]
+        # Get cursors over the posting lists for the unique query terms. Cursors are updated in place as
+        # they move along, so we don't create a new object for every posting that we visit.
+        all_cursors = [self.__inverted_index.get_postings_cursor(term) for (term, _) in unique_query_terms]
 
         # We require that at least N of the M query terms are present in the document,
         # for the document to be considered part of the result set. What should the minimum
@@ -64,19 +65,33 @@ class SimpleSearchEngine:
         required_minimum = max(1, min(len(unique_query_terms), int(match_threshold * len(unique_query_terms))))
 
         # When traversing the posting lists using document-at-a-time traversal, we need to keep track
-        # of where we are in each of the posting lists. Initially, all the cursors "point to" the first entry
+        # of where we are in each of the posting lists. Initially, all the cursors point to the first entry
         # in each posting list. Keep track of which posting lists that remain to be fully traversed.
-        all_cursors = [next(p, None) for p in posting_lists]
-        remaining_cursor_ids = [i for i in range(len(all_cursors)) if all_cursors[i]]
+        remaining_cursor_ids = [i for i in range(len(all_cursors)) if all_cursors[i].next()]
 
         # We're doing ranked retrieval. Assess relevance scores per document as we go along, as we're doing
         # document-at-a-time traversal. Keep track of the K highest-scoring documents.
         sieve = Sieve(max(1, min(100, options.get("hit_count", 10))))
 
+        # If N > 1, we can skip past documents that can't possibly be part of the result set. Documents that
+        # precede the N-th smallest document identifier that the cursors point to can be present in at most
+        # N - 1 of the posting lists.
+        skipping = required_minimum > 1
+
         # We're doing at least N-of-M matching. As we reach the end of the posting lists, we can abort when
         # the number of non-exhausted lists drops below the required minimum N.
         while len(remaining_cursor_ids) >= required_minimum:
 
+            # Move the cursors that lag behind up to the pivot.
+            if skipping:
+                pivot = sorted(all_cursors[i].document_id for i in remaining_cursor_ids)[required_minimum - 1]
+                for i in remaining_cursor_ids:
+                    if all_cursors[i].document_id < pivot:
+                        all_cursors[i].advance_to(pivot)
+                remaining_cursor_ids = [i for i in remaining_cursor_ids if not all_cursors[i].exhausted]
+                if len(remaining_cursor_ids) < required_minimum:
+                    break
+
             # The posting lists are sorted by the document identifiers in ascending order. Define the
             # "frontier" as the subset of non-exhausted posting lists that mention the lowest document
             # identifier. In a sense, if we imagine scanning the posting lists from left to right, the
@@ -86,7 +101,8 @@ class SimpleSearchEngine:
             frontier_cursor_ids = [i for i in remaining_cursor_ids if all_cursors[i].document_id == document_id]
 
             # The number of elements on the "frontier" needs to be at least N. Otherwise, these documents
-            # don't contain enough of the query terms, and aren't part of the result set.
+            # don't contain enough of the query terms, and aren't part of the result set. The cursors look
+            # like postings, so we can hand them directly to the ranker.
             if len(frontier_cursor_ids) >= required_minimum:
                 ranker.reset(document_id)
                 for i in frontier_cursor_ids:
@@ -103,8 +119,8 @@ class SimpleSearchEngine:
             # are. We may or may not reach the end of some posting lists when we advance, so the set of
             # remaining non-exhausted lists might shrink.
             for i in frontier_cursor_ids:
-                all_cursors[i] = next(posting_lists[i], None)
-            remaining_cursor_ids = [i for i in range(len(all_cursors)) if all_cursors[i]]
+                all_cursors[i].next()
+            remaining_cursor_ids = [i for i in remaining_cursor_ids if not all_cursors[i].exhausted]
 
         # Alert the client about the best-matching documents, using the supplied callback function.
         # Emit documents sorted according to their relevancy scores.
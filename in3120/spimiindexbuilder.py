@@ -0,0 +1,171 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+import heapq
+import itertools
+import os
+import struct
+import tempfile
+from array import array
+from collections import Counter
+from operator import itemgetter
+from typing import Any, BinaryIO, Dict, Iterable, Iterator, List, Optional, Tuple
+from .diskinvertedindex import DiskInvertedIndexWriter
+from .document import Document
+from .normalizer import Normalizer
+from .tokenizer import Tokenizer
+from .variablebytecodec import VariableByteCodec
+
+
+class SpimiIndexBuilder:
+    """
+    Builds an inverted index on disk using single-pass in-memory indexing (SPIMI), so that we can
+    index corpora whose posting lists don't fit in memory. See, e.g., https://nlp.stanford.edu/IR-book/pdf/04const.pdf.
+
+    We accumulate postings in memory until the estimated memory usage reaches the given budget. The
+    accumulated postings are then sorted by term and spilled to a temporary file as a run, and we
+    start over with an empty dictionary. When the corpus is exhausted, the runs are merged term by
+    term into the final index, which DiskInvertedIndex can open. The last batch of postings is merged
+    straight from memory, so small corpora never touch the temporary files.
+
+    If there are more runs than we can fit read buffers for within the budget, we do several merge
+    passes. Peak memory is thus set by the budget, plus the final index's dictionary and one decoded
+    entry per run being merged. The estimate is coarse, so treat the budget as approximate.
+    """
+
+    # The estimated number of bytes that a term costs us in memory, beyond the term's characters: The
+    # dictionary entry, the string object, and the two arrays that hold its postings.
+    TERM_OVERHEAD = 256
+
+    # The estimated number of bytes that a posting costs us in memory: A document identifier and a term
+    # frequency, kept in arrays of unsigned 32-bit integers.
+    POSTING_OVERHEAD = 8
+
+    # Each run entry starts with the length of the UTF-8 encoded term, the number of postings, and the
+    # length of the variable-byte encoded postings.
+    ENTRY = struct.Struct("<III")
+
+    # The size of the read buffer for each run that we merge. Together with the memory budget, this
+    # determines how many runs we can merge at once.
+    READ_BUFFER_SIZE = 1 << 13
+
+    def __init__(self, fields: Iterable[str], normalizer: Normalizer, tokenizer: Tokenizer,
+                 memory_budget: int = 64 << 20, directory: Optional[str] = None):
+        assert memory_budget > 0
+        self.__fields = list(fields)
+        self.__normalizer = normalizer
+        self.__tokenizer = tokenizer
+        self.__memory_budget = memory_budget
+        self.__directory = directory  # Where to put the temporary run files. None means the system default.
+        self.__statistics: Dict[str, Any] = {}
+
+    def build(self, corpus: Iterable[Document], filename: str) -> None:
+        """
+        Indexes the given documents, and writes the resulting inverted index to the given file. The
+        documents are expected to arrive in order of increasing document identifiers, as they do
+        when iterating over a corpus.
+        """
+        self.__statistics = {"documents": 0, "terms": 0, "postings": 0, "runs": 0, "spilled_bytes": 0, "merge_passes": 0}
+        with tempfile.TemporaryDirectory(dir=self.__directory) as directory:
+            postings: Dict[str, Tuple[array, array]] = {}
+            (run_files, used) = ([], 0)
+            for document in corpus:
+                self.__statistics["documents"] += 1
+                all_terms = itertools.chain.from_iterable(self.__get_terms(document.get_field(f, "")) for f in self.__fields)
+                for (term, term_frequency) in Counter(all_terms).items():
+                    posting_list = postings.get(term, None)
+                    if posting_list is None:
+                        posting_list = postings[term] = (array("I"), array("I"))
+                        used += len(term) + __class__.TERM_OVERHEAD
+                    posting_list[0].append(document.document_id)
+                    posting_list[1].append(term_frequency)
+                    used += __class__.POSTING_OVERHEAD
+                if used >= self.__memory_budget:
+                    run_files.append(self.__spill(postings, directory))
+                    (postings, used) = ({}, 0)
+
+            # If we've spilled anything, spill the rest too, so that we only need memory for the read
+            # buffers while merging. If we have more runs than we can afford read buffers for, merge
+            # consecutive groups of runs into longer runs until we don't.
+            if run_files and postings:
+                run_files.append(self.__spill(postings, directory))
+                postings = {}
+            fan_in = max(2, self.__memory_budget // __class__.READ_BUFFER_SIZE)
+            while len(run_files) > fan_in:
+                run_files = [self.__merge_runs(run_files[i:i + fan_in], directory) for i in range(0, len(run_files), fan_in)]
+                self.__statistics["merge_passes"] += 1
+
+            # Merge the remaining runs straight into the final index. Each source yields its terms in sorted
+            # order. The merge is stable, so for a given term the sources are visited in the order they were
+            # created, i.e., in document order.
+            runs = [open(run_file, mode="rb", buffering=__class__.READ_BUFFER_SIZE) for run_file in run_files]
+            try:
+                sources = [self.__read_run(run) for run in runs]
+                sources.append((term, *postings[term]) for term in sorted(postings))
+                with DiskInvertedIndexWriter(filename, self.__statistics["documents"]) as writer:
+                    for (term, entries) in itertools.groupby(heapq.merge(*sources, key=itemgetter(0)), key=itemgetter(0)):
+                        self.__statistics["postings"] += writer.add_term(term, itertools.chain.from_iterable(zip(d, f) for (_, d, f) in entries))
+                        self.__statistics["terms"] += 1
+                self.__statistics["merge_passes"] += 1
+            finally:
+                for run in runs:
+                    run.close()
+
+    def get_statistics(self) -> Dict[str, Any]:
+        """
+        Returns some counters from the most recent build, for monitoring purposes: The number of
+        documents indexed, the number of distinct terms and postings in the resulting index, the
+        number of runs written to disk and their total size, and the number of merge passes. Runs
+        written by intermediate merge passes are included.
+        """
+        return dict(self.__statistics)
+
+    def __get_terms(self, buffer: str) -> Iterator[str]:
+        tokens = self.__tokenizer.strings(self.__normalizer.canonicalize(buffer))
+        return (self.__normalizer.normalize(t) for t in tokens)
+
+    def __spill(self, postings: Dict[str, Tuple[array, array]], directory: str) -> str:
+        return self.__write_run(((term, *postings[term]) for term in sorted(postings)), directory)
+
+    def __merge_runs(self, run_files: List[str], directory: str) -> str:
+        # Like the final merge, except that we write another run. The merged entries are materialized,
+        # so here we need memory for the longest posting list in the group, too.
+        runs = [open(run_file, mode="rb", buffering=__class__.READ_BUFFER_SIZE) for run_file in run_files]
+        try:
+            merged = heapq.merge(*(self.__read_run(run) for run in runs), key=itemgetter(0))
+            filename = self.__write_run(((term, array("I", itertools.chain.from_iterable(d for (_, d, _) in entries)),
+                                          array("I", itertools.chain.from_iterable(f for (_, _, f) in entries)))
+                                         for (term, entries) in ((t, list(e)) for (t, e) in itertools.groupby(merged, key=itemgetter(0)))), directory)
+        finally:
+            for run in runs:
+                run.close()
+        for run_file in run_files:
+            os.remove(run_file)
+        return filename
+
+    def __write_run(self, entries: Iterable[Tuple[str, array, array]], directory: str) -> str:
+        # Within an entry, the document identifiers are gap encoded.
+        (descriptor, filename) = tempfile.mkstemp(prefix="run", dir=directory)
+        with open(descriptor, mode="wb") as run:
+            for (term, document_ids, term_frequencies) in entries:
+                payload = bytearray()
+                VariableByteCodec.encode_many(itertools.chain.from_iterable(zip(
+                    (b - a for (a, b) in zip(itertools.chain((0,), document_ids), document_ids)), term_frequencies)), payload)
+                encoded = term.encode("utf-8")
+                run.write(__class__.ENTRY.pack(len(encoded), len(document_ids), len(payload)))
+                run.write(encoded)
+                run.write(payload)
+            self.__statistics["runs"] += 1
+            self.__statistics["spilled_bytes"] += run.tell()
+        return filename
+
+    @staticmethod
+    def __read_run(run: BinaryIO) -> Iterator[Tuple[str, List[int], List[int]]]:
+        while True:
+            header = run.read(__class__.ENTRY.size)
+            if not header:
+                break
+            (term_length, count, payload_length) = __class__.ENTRY.unpack(header)
+            term = str(run.read(term_length), "utf-8")
+            (numbers, _) = VariableByteCodec.decode_many(run.read(payload_length), 0, 2 * count)
+            yield (term, list(itertools.accumulate(numbers[0::2])), numbers[1::2])
@@ -2,15 +2,28 @@
 # -*- coding: utf-8 -*-
 
 from struct import pack
-from typing import Tuple
+from typing import Iterable, List, Optional, Tuple
+
+# NumPy is not part of the Python standard library. For self-containment reasons, make it
+# optional and have the bulk operations fall back to pure Python if it's not installed.
+try:
+    import numpy as np
+except ImportError:
+    np = None
 
 
 class VariableByteCodec:
     """
     A simple encoder/decoder for variable-byte encoding. See Figure 5.8 in
     https://nlp.stanford.edu/IR-book/pdf/05comp.pdf for details.
+
+    Besides coding one number at a time, we can code many numbers in one go. The bulk operations
+    are vectorized using NumPy if available, and work byte by byte in a tight loop otherwise.
     """
 
+    # Below this many numbers the fixed overhead of calling into NumPy outweighs the gains.
+    VECTORIZATION_THRESHOLD = 512
+
     @staticmethod
     def encode(number: int, destination: bytearray) -> int:
         """
@@ -50,3 +63,109 @@ class VariableByteCodec:
             else:
                 number = 128 * number + (byte - 128)
                 return (number, where - start)
+
+    @staticmethod
+    def encode_many(numbers: Iterable[int], destination: bytearray) -> int:
+        """
+        Encodes the given numbers, one after the other, and appends the resulting bytes to the
+        given destination buffer. Returns the number of bytes that were appended.
+        """
+        assert destination is not None
+        numbers = numbers if isinstance(numbers, list) else list(numbers)
+        if np is not None and len(numbers) >= __class__.VECTORIZATION_THRESHOLD:
+            encoded = __class__.__encode_vectorized(numbers)
+            if encoded is not None:
+                destination.extend(encoded)
+                return len(encoded)
+        size = len(destination)
+        for number in numbers:
+            assert number >= 0
+            if number < 128:
+                destination.append(number + 128)
+            else:
+                values = []
+                while number >= 128:
+                    values.append(number & 127)
+                    number >>= 7
+                values.append(number)
+                values.reverse()
+                values[-1] += 128
+                destination.extend(values)
+        return len(destination) - size
+
+    @staticmethod
+    def decode_many(source: bytearray, start: int, count: int) -> Tuple[List[int], int]:
+        """
+        Starting at the given position in the source buffer, decodes the given number of numbers.
+        Returns a pair comprised of the decoded numbers, and the number of bytes read from the
+        source buffer.
+        """
+        assert source is not None
+        assert start >= 0
+        assert start == 0 or source[start - 1] >= 128
+        assert count >= 0
+        if np is not None and count >= __class__.VECTORIZATION_THRESHOLD:
+            decoded = __class__.__decode_vectorized(source, start, count)
+            if decoded is not None:
+                return decoded
+        numbers = []
+        number = 0
+        where = start
+        remaining = count
+        for byte in memoryview(source)[start:] if remaining > 0 else ():
+            where += 1
+            if byte < 128:
+                number = (number << 7) | byte
+            else:
+                numbers.append((number << 7) | (byte - 128))
+                number = 0
+                remaining -= 1
+                if remaining == 0:
+                    break
+        if remaining > 0:
+            raise IndexError("buffer ends before all numbers have been decoded")
+        return (numbers, where - start)
+
+    @staticmethod
+    def __encode_vectorized(numbers: List[int]) -> Optional[bytes]:
+        # Numbers that don't fit in 63 bits (or negative ones) are left for the pure Python code to deal with.
+        try:
+            values = np.array(numbers, dtype=np.int64)
+        except OverflowError:
+            return None
+        if values.min() < 0:
+            return None
+        values = values.astype(np.uint64)
+        lengths = np.ones(len(values), dtype=np.int64)
+        for k in range(1, 9):
+            lengths += values >= (1 << (7 * k))
+        ends = np.cumsum(lengths) - 1  # The position of the last byte of each number.
+        total = int(ends[-1]) + 1
+        owners = np.repeat(np.arange(len(values)), lengths)  # Which number each byte belongs to.
+        shifts = (7 * (ends[owners] - np.arange(total))).astype(np.uint64)
+        encoded = ((values[owners] >> shifts) & 127).astype(np.uint8)
+        encoded[ends] |= 128
+        return encoded.tobytes()
+
+    @staticmethod
+    def __decode_vectorized(source: bytearray, start: int, count: int) -> Optional[Tuple[List[int], int]]:
+        # Guess how far out we need to look, assuming most numbers are small. Look further if needed.
+        data = np.frombuffer(source, dtype=np.uint8)
+        window = 2 * count
+        while True:
+            end = min(len(data), start + window)
+            terminators = np.flatnonzero(data[start:end] >= 128)
+            if len(terminators) >= count or end == len(data):
+                break
+            window *= 4
+        if len(terminators) < count:
+            raise IndexError("buffer ends before all numbers have been decoded")
+        ends = terminators[:count]
+        lengths = np.diff(ends, prepend=-1)
+        if lengths.max() > 9:
+            return None  # Might not fit in 64 bits.
+        total = int(ends[-1]) + 1
+        shifts = (7 * (np.repeat(ends, lengths) - np.arange(total))).astype(np.uint64)
+        values = (data[start:start + total] & 127).astype(np.uint64) << shifts
+        numbers = np.add.reduceat(values, ends - lengths + 1)
+        return (numbers.tolist(), total)
@@ -37,11 +37,19 @@ def assignment_e_suite() -> unittest.TestSuite:
 def assignment_x_suite() -> unittest.TestSuite:
     return build_test_suite(["TestSimpleNormalizer", "TestSimpleTokenizer", "TestInMemoryDictionary",
                              "TestInMemoryDocument", "TestInMemoryCorpus", "TestSieve", "TestVariableByteCodec",
-                             "TestInMemoryPostingList", "TestCompressedInMemoryPostingList",
+                             "TestInMemoryPostingList", "TestCompressedInMemoryPostingList", "TestArrayPostingList",
                              "TestInMemoryInvertedIndexWithCompression", "TestExpressionComposer",
                              "TestShallowCaseExtractor", "TestDocumentPipeline", "TestSimpleRanker",
                              "TestSoundexNormalizer", "TestPorterNormalizer",
-                             "TestSimilaritySearchEngine"])
+                             "TestSimilaritySearchEngine", "TestFileCorpus",
+                             "TestMemoryMappedCorpus", "TestColumnarCorpus", "TestLruCache",
+                             "TestBlockCompressedCorpus", "TestCachingProcessor",
+                             "TestFrontCodedDictionary", "TestPerfectHashDictionary",
+                             "TestAutomatonDictionary", "TestIntegerCodec", "TestBlockPostingList",
+                             "TestPositionalPostingList", "TestPhraseSearchEngine",
+                             "TestRoaringBitmap", "TestBitmapPostingList",
+                             "TestImpactOrderedInvertedIndex", "TestScoreAtATimeSearchEngine",
+                             "TestDiskInvertedIndex", "TestSpimiIndexBuilder"])
 
 
 def main():
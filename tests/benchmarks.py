@@ -0,0 +1,530 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+import contextlib
+import itertools
+import os
+import sys
+import tempfile
+from timeit import default_timer as timer
+from typing import Any, Callable, Dict, List, Tuple
+from context import in3120
+
+
+def data_path(filename: str):
+    here = os.path.dirname(__file__)
+    data = os.path.join(here, "..", "data")
+    full = os.path.abspath(os.path.join(data, filename))
+    return full
+
+
+def _measure_in_subprocess(target: Callable[..., Any], *args) -> Dict[str, Any]:
+    """
+    Runs the target function in a fresh process, and reports back its result together with the
+    process' peak resident set size (RSS), in megabytes. The RSS baseline after having imported
+    everything is reported as well, so that we can separate the cost of the target from the cost
+    of the Python interpreter and our imports.
+    """
+    import multiprocessing
+    context = multiprocessing.get_context("spawn")
+    with context.Pool(1) as pool:
+        return pool.apply(_measure, (target, *args))
+
+
+def _measure(target: Callable[..., Any], *args) -> Dict[str, Any]:
+    import resource
+    scale = 1024 * 1024 if sys.platform == "darwin" else 1024
+    baseline = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / scale
+    start = timer()
+    result = target(*args)
+    end = timer()
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / scale
+    return {"result": result, "seconds": end - start, "baseline_mb": baseline, "peak_mb": peak}
+
+
+def _load_xml_with_minidom(filename: str) -> int:
+    """
+    The DOM-based XML loading logic that InMemoryCorpus used to have. Kept here for comparison.
+    """
+    from xml.dom.minidom import parse
+
+    def __get_text(nodes):
+        data = []
+        for node in nodes:
+            if node.nodeType == node.TEXT_NODE:
+                data.append(node.data)
+        return " ".join(data)
+
+    dom = parse(filename)
+    return len([__get_text(n.childNodes) for n in dom.getElementsByTagName("doc")])
+
+
+def _load_xml_streaming(filename: str) -> int:
+    return sum(1 for _ in in3120.corpus._parse_xml_file(filename))
+
+
+def _generate_xml(filename: str, size: int) -> None:
+    """
+    Generates a synthetic XML file of roughly the given size in bytes, by repeating the
+    documents in the Cranfield corpus.
+    """
+    documents = [f"<doc>\n{d['body']}\n</doc>\n".encode("utf-8") for d in in3120.InMemoryCorpus(data_path("cran.xml"))]
+    with open(filename, mode="wb") as f:
+        f.write(b"<docs>\n")
+        while f.tell() < size:
+            for document in documents:
+                f.write(document)
+        f.write(b"</docs>\n")
+
+
+def _report(label: str, filename: str, measurement: Dict[str, Any]) -> None:
+    megabytes = os.path.getsize(filename) / (1024 * 1024)
+    print(f"{label:<12} {measurement['result']:>10} docs {measurement['seconds']:>8.2f} s "
+          f"{measurement['result'] / measurement['seconds']:>10.0f} docs/s {megabytes / measurement['seconds']:>8.1f} MB/s "
+          f"peak RSS {measurement['peak_mb']:>8.1f} MB (+{measurement['peak_mb'] - measurement['baseline_mb']:.1f} MB)")
+
+
+def benchmark_xml_loading(synthetic_size: int = 1 << 30):
+    print("Loading Cranfield corpus...")
+    filename = data_path("cran.xml")
+    _report("minidom", filename, _measure_in_subprocess(_load_xml_with_minidom, filename))
+    _report("streaming", filename, _measure_in_subprocess(_load_xml_streaming, filename))
+    with tempfile.TemporaryDirectory() as directory:
+        filename = os.path.join(directory, "synthetic.xml")
+        _generate_xml(filename, synthetic_size)
+        print(f"Loading synthetic corpus of {os.path.getsize(filename) / (1024 * 1024):.0f} MB...")
+        if synthetic_size <= (64 << 20):
+            _report("minidom", filename, _measure_in_subprocess(_load_xml_with_minidom, filename))
+        else:
+            print("Skipping minidom, the DOM would not fit in memory on most machines.")
+        _report("streaming", filename, _measure_in_subprocess(_load_xml_streaming, filename))
+
+
+def _sample_queries(corpus: in3120.Corpus, count: int, seed: int = 42) -> List[str]:
+    """
+    Generates a reproducible set of queries, by sampling a few words from randomly selected documents.
+    """
+    import random
+    generator = random.Random(seed)
+    queries = []
+    for _ in range(count):
+        words = corpus[generator.randrange(corpus.size())]["body"].split()
+        queries.append(" ".join(generator.sample(words, min(3, len(words)))))
+    return queries
+
+
+def _top_k_document_ids(corpus: in3120.Corpus, queries: List[str], hit_count: int = 10) -> List[List[int]]:
+    """
+    Runs the queries through a SimpleSearchEngine and returns the identifiers of the top-ranked documents,
+    i.e., the documents that a search process would fetch to render the results.
+    """
+    normalizer = in3120.SimpleNormalizer()
+    tokenizer = in3120.SimpleTokenizer()
+    index = in3120.InMemoryInvertedIndex(corpus, ["body"], normalizer, tokenizer)
+    engine = in3120.SimpleSearchEngine(corpus, index)
+    ranker = in3120.SimpleRanker()
+    options = {"hit_count": hit_count, "match_threshold": 0.5}
+    return [[r["document"].document_id for r in engine.evaluate(q, options, ranker)] for q in queries]
+
+
+def benchmark_document_fetching():
+    print("Loading English news corpus and running queries...")
+    corpus = in3120.InMemoryCorpus(data_path("en.txt"))
+    results = _top_k_document_ids(corpus, _sample_queries(corpus, 1000))
+    fetches = sum(len(r) for r in results)
+    raw = sum(len(d["body"].encode("utf-8")) for d in corpus) / (1024 * 1024)
+    print(f"{corpus.size()} documents, {raw:.1f} MB of raw text, {fetches} document fetches for {len(results)} queries.")
+
+    def _fetch_all(store: in3120.Corpus) -> float:
+        start = timer()
+        for document_ids in results:
+            for document_id in document_ids:
+                store[document_id]["body"]
+        return (timer() - start) / fetches
+
+    print(f"{'InMemoryCorpus':<30} {_fetch_all(corpus) * 1e6:>8.1f} us/doc")
+    for compression in ("zlib", "lzma"):
+        for block_size in (1, 16, 64, 256):
+            for cache_size in (0, 16, 256):
+                store = in3120.BlockCompressedCorpus(corpus, block_size, cache_size, compression)
+                latency = _fetch_all(store)
+                statistics = store.get_cache_statistics()
+                lookups = max(1, statistics["hits"] + statistics["misses"])
+                print(f"{compression + ' block=' + str(block_size) + ' cache=' + str(cache_size):<30} "
+                      f"{latency * 1e6:>8.1f} us/doc {store.get_compressed_size() / (1024 * 1024):>7.2f} MB "
+                      f"hit rate {statistics['hits'] / lookups:>5.1%}")
+
+
+def _build_vocabulary(filename: str) -> in3120.InMemoryDictionary:
+    normalizer = in3120.SimpleNormalizer()
+    tokenizer = in3120.SimpleTokenizer()
+    dictionary = in3120.InMemoryDictionary()
+    for document in in3120.FileCorpus(filename):
+        for term in tokenizer.strings(normalizer.canonicalize(document["body"])):
+            dictionary.add_if_absent(normalizer.normalize(term))
+    return dictionary
+
+
+def _measure_lookups(dictionary: in3120.Dictionary, terms: List[str]) -> float:
+    start = timer()
+    for term in terms:
+        dictionary.get_term_id(term)
+    return (timer() - start) / len(terms)
+
+
+def _measure_footprint(factory: Callable[[], Any]) -> Tuple[Any, int]:
+    """
+    Creates an object and returns it together with the number of bytes allocated for it that are
+    still in use, as reported by tracemalloc. Only meaningful when tracing is enabled.
+    """
+    import gc
+    import tracemalloc
+    gc.collect()
+    before = tracemalloc.get_traced_memory()[0]
+    created = factory()
+    gc.collect()
+    return (created, tracemalloc.get_traced_memory()[0] - before)
+
+
+def benchmark_dictionaries():
+    import random
+    import tracemalloc
+    generator = random.Random(42)
+    for filename in ("en.txt", "mesh.txt"):
+        print(f"Building vocabulary from {filename}...")
+        tracemalloc.start()
+        (source, memory) = _measure_footprint(lambda: _build_vocabulary(data_path(filename)))
+        candidates = [("InMemoryDictionary", source, memory)]
+        for factory in (in3120.FrontCodedDictionary, in3120.PerfectHashDictionary, in3120.AutomatonDictionary):
+            candidates.append((factory.__name__, *_measure_footprint(lambda: factory(source))))
+        tracemalloc.stop()
+        terms = [term for (term, _) in source]
+        lookups = [generator.choice(terms) for _ in range(100000)]
+        misses = [term + "#" for term in lookups]
+        print(f"{len(terms)} terms, {sum(len(t.encode('utf-8')) for t in terms) / len(terms):.1f} UTF-8 bytes per term on average.")
+        for (label, dictionary, memory) in candidates:
+            print(f"{label:<22} {memory / len(terms):>7.1f} bytes/term "
+                  f"{_measure_lookups(dictionary, lookups) * 1e9:>8.0f} ns/hit {_measure_lookups(dictionary, misses) * 1e9:>8.0f} ns/miss")
+
+
+def benchmark_posting_lists():
+    import tracemalloc
+    print("Loading English news corpus...")
+    corpus = in3120.InMemoryCorpus(data_path("en.txt"))
+    normalizer = in3120.SimpleNormalizer()
+    tokenizer = in3120.SimpleTokenizer()
+    terms = {normalizer.normalize(t) for d in corpus for t in tokenizer.strings(normalizer.canonicalize(d["body"]))}
+    postings = None
+    tracemalloc.start()
+    for factory in (in3120.InMemoryPostingList, in3120.ArrayPostingList, in3120.CompressedInMemoryPostingList):
+        start = timer()
+        (index, memory) = _measure_footprint(lambda: in3120.InMemoryInvertedIndex(corpus, ["body"], normalizer, tokenizer,
+                                                                                 posting_list_factory=factory))
+        seconds = timer() - start
+        if postings is None:
+            postings = sum(index.get_document_frequency(term) for term in terms)
+            print(f"{len(terms)} terms, {postings} postings. Totals include the dictionary and other per-term overhead.")
+        print(f"{factory.__name__:<32} {memory / (1024 * 1024):>7.1f} MB {memory / postings:>7.1f} bytes/posting {seconds:>6.2f} s to build")
+        del index
+    tracemalloc.stop()
+
+
+def benchmark_codecs():
+    configurations = [("VariableByte", in3120.VariableByteIntegerCodec(), in3120.VariableByteIntegerCodec()),
+                      ("PForDelta", in3120.PForDeltaCodec(), in3120.PForDeltaCodec()),
+                      ("Simple8b", in3120.Simple8bCodec(), in3120.Simple8bCodec()),
+                      ("EliasFano+PForDelta", in3120.EliasFanoCodec(), in3120.PForDeltaCodec()),
+                      ("EliasFano+Simple8b", in3120.EliasFanoCodec(), in3120.Simple8bCodec())]
+    normalizer = in3120.SimpleNormalizer()
+    tokenizer = in3120.SimpleTokenizer()
+    for filename in ("en.txt", "mesh.txt"):
+        print(f"Indexing {filename}...")
+        corpus = in3120.InMemoryCorpus(data_path(filename))
+        index = in3120.InMemoryInvertedIndex(corpus, ["body"], normalizer, tokenizer)
+        terms = {normalizer.normalize(t) for d in corpus for t in tokenizer.strings(normalizer.canonicalize(d["body"]))}
+        postings = {term: list(index[term]) for term in terms}
+        count = sum(len(p) for p in postings.values())
+        print(f"{len(terms)} terms, {count} postings.")
+        posting_lists = []
+        for entries in postings.values():
+            posting_list = in3120.CompressedInMemoryPostingList()
+            for posting in entries:
+                posting_list.append_posting(posting)
+            posting_lists.append(posting_list)
+        start = timer()
+        decoded = sum(1 for p in posting_lists for _ in p)
+        print(f"{'CompressedInMemoryPostingList':<32} {'':>19} {decoded / (timer() - start) / 1e6:>6.2f} M postings/s")
+        for (label, document_codec, term_frequency_codec) in configurations:
+            posting_lists = []
+            for entries in postings.values():
+                posting_list = in3120.BlockPostingList(document_codec, term_frequency_codec)
+                for posting in entries:
+                    posting_list.append_posting(posting)
+                posting_list.finalize_postings()
+                posting_lists.append(posting_list)
+            bits = 8 * sum(p.get_buffer_size() for p in posting_lists) / count
+            start = timer()
+            decoded = sum(1 for p in posting_lists for _ in p)
+            print(f"{label:<32} {bits:>6.2f} bits/posting {decoded / (timer() - start) / 1e6:>6.2f} M postings/s")
+
+
+def benchmark_variable_byte_codec(size: int = 1000000):
+    import random
+    generator = random.Random(42)
+    numbers = [generator.choice([1, 1, 2, 3, generator.randrange(128), generator.randrange(100000)]) for _ in range(size)]
+    data = bytearray()
+    start = timer()
+    for number in numbers:
+        in3120.VariableByteCodec.encode(number, data)
+    print(f"{len(numbers)} numbers, {len(data)} bytes.")
+    print(f"{'encode':<32} {(timer() - start) / size * 1e9:>8.1f} ns/number")
+    for (label, vectorized) in (("encode_many", True), ("encode_many without NumPy", False)):
+        with _numpy_disabled(not vectorized):
+            start = timer()
+            in3120.VariableByteCodec.encode_many(numbers, bytearray())
+            print(f"{label:<32} {(timer() - start) / size * 1e9:>8.1f} ns/number")
+    start = timer()
+    where = 0
+    for _ in range(size):
+        where += in3120.VariableByteCodec.decode(data, where)[1]
+    print(f"{'decode':<32} {(timer() - start) / size * 1e9:>8.1f} ns/number")
+    for (label, vectorized) in (("decode_many", True), ("decode_many without NumPy", False)):
+        for chunk in (256, 1024, size):
+            with _numpy_disabled(not vectorized):
+                start = timer()
+                where = 0
+                for i in range(0, size, chunk):
+                    where += in3120.VariableByteCodec.decode_many(data, where, min(chunk, size - i))[1]
+                print(f"{label + ' chunk=' + str(chunk):<32} {(timer() - start) / size * 1e9:>8.1f} ns/number")
+    posting_list = in3120.CompressedInMemoryPostingList()
+    for (document_id, term_frequency) in zip(itertools.accumulate(n + 1 for n in numbers[0::2]), numbers[1::2]):
+        posting_list.append_posting(in3120.Posting(document_id, term_frequency))
+    start = timer()
+    postings = sum(1 for _ in posting_list)
+    print(f"{'CompressedInMemoryPostingList':<32} {(timer() - start) / postings * 1e9:>8.1f} ns/posting")
+
+
+@contextlib.contextmanager
+def _numpy_disabled(disabled: bool):
+    module = sys.modules[in3120.VariableByteCodec.__module__]
+    numpy = module.np
+    if disabled:
+        module.np = None
+    try:
+        yield
+    finally:
+        module.np = numpy
+
+
+def benchmark_phrase_search():
+    import tracemalloc
+    print("Loading English news corpus...")
+    corpus = in3120.InMemoryCorpus(data_path("en.txt"))
+    normalizer = in3120.SimpleNormalizer()
+    tokenizer = in3120.SimpleTokenizer()
+    queries = [" ".join(q.split()[:2]) for q in _sample_queries(corpus, 1000)]
+    tracemalloc.start()
+    (suffix_array, memory1) = _measure_footprint(lambda: in3120.SuffixArray(corpus, ["body"], normalizer, tokenizer))
+    (index, memory2) = _measure_footprint(lambda: in3120.InMemoryInvertedIndex(corpus, ["body"], normalizer, tokenizer, positional=True))
+    tracemalloc.stop()
+    engine = in3120.PhraseSearchEngine(corpus, index)
+    options = {"hit_count": 10}
+    for (label, evaluator, memory) in (("SuffixArray", suffix_array, memory1), ("PhraseSearchEngine", engine, memory2)):
+        start = timer()
+        matches = sum(len(list(evaluator.evaluate(query, options))) for query in queries)
+        latency = (timer() - start) / len(queries)
+        print(f"{label:<20} {memory / (1024 * 1024):>7.1f} MB {latency * 1e6:>8.1f} us/query {matches:>6} matches")
+
+
+def benchmark_bitmaps():
+    import tracemalloc
+    print("Loading English news corpus...")
+    corpus = in3120.InMemoryCorpus(data_path("en.txt"))
+    normalizer = in3120.SimpleNormalizer()
+    for (label, tokenizer) in (("words", in3120.SimpleTokenizer()), ("3-shingles", in3120.ShingleGenerator(3))):
+        terms = {normalizer.normalize(t) for d in corpus for t in tokenizer.strings(normalizer.canonicalize(d["body"]))}
+        for bitmap_threshold in (None, 0.1, 0.05, 0.01):
+            tracemalloc.start()
+            (index, memory) = _measure_footprint(lambda: in3120.InMemoryInvertedIndex(corpus, ["body"], normalizer, tokenizer, True,
+                                                                                     bitmap_threshold=bitmap_threshold))
+            tracemalloc.stop()
+            frequent = sorted(terms, key=index.get_document_frequency, reverse=True)[:20]
+            pairs = [(a, b) for a in frequent for b in frequent if a < b]
+            start = timer()
+            matches = sum(1 for (a, b) in pairs for _ in in3120.PostingsMerger.intersection(index[a], index[b]))
+            latency = (timer() - start) / len(pairs)
+            print(f"{label:<10} bitmap_threshold={str(bitmap_threshold):<5} {memory / (1024 * 1024):>7.1f} MB "
+                  f"{latency * 1e3:>7.2f} ms/AND of frequent terms ({matches} matches)")
+            del index
+
+
+def benchmark_cursors():
+    print("Loading English news corpus...")
+    corpus = in3120.InMemoryCorpus(data_path("en.txt"))
+    normalizer = in3120.SimpleNormalizer()
+    tokenizer = in3120.SimpleTokenizer()
+    queries = _sample_queries(corpus, 1000)
+    options = {"hit_count": 10, "match_threshold": 0.5}
+
+    class IteratingInvertedIndex(in3120.InvertedIndex):
+        """
+        Hides the cursors of the wrapped index, so that we traverse the posting lists using iterators.
+        """
+
+        def __init__(self, wrapped: in3120.InvertedIndex):
+            self.__wrapped = wrapped
+
+        def get_terms(self, buffer: str):
+            return self.__wrapped.get_terms(buffer)
+
+        def get_postings_iterator(self, term: str):
+            return self.__wrapped.get_postings_iterator(term)
+
+        def get_document_frequency(self, term: str) -> int:
+            return self.__wrapped.get_document_frequency(term)
+
+    for factory in (in3120.InMemoryPostingList, in3120.ArrayPostingList, in3120.CompressedInMemoryPostingList):
+        index = in3120.InMemoryInvertedIndex(corpus, ["body"], normalizer, tokenizer, posting_list_factory=factory)
+        for (label, wrapped) in (("iterators", IteratingInvertedIndex(index)), ("cursors", index)):
+            engine = in3120.SimpleSearchEngine(corpus, wrapped)
+            ranker = in3120.BetterRanker(corpus, wrapped)
+            start = timer()
+            for query in queries:
+                for _ in engine.evaluate(query, options, ranker):
+                    pass
+            latency = (timer() - start) / len(queries)
+            print(f"{factory.__name__:<32} {label:<10} {latency * 1e6:>8.1f} us/query")
+
+
+def benchmark_impacts():
+    print("Loading English news corpus...")
+    corpus = in3120.InMemoryCorpus(data_path("en.txt"))
+    normalizer = in3120.SimpleNormalizer()
+    tokenizer = in3120.SimpleTokenizer()
+    queries = _sample_queries(corpus, 1000)
+    index1 = in3120.InMemoryInvertedIndex(corpus, ["body"], normalizer, tokenizer, True)
+    index2 = in3120.ImpactOrderedInvertedIndex(corpus, ["body"], normalizer, tokenizer)
+    daat = in3120.SimpleSearchEngine(corpus, index1)
+    saat = in3120.ScoreAtATimeSearchEngine(corpus, index2)
+    ranker = in3120.BetterRanker(corpus, index1)
+    evaluators = [("DAAT", lambda q, o: daat.evaluate(q, dict(o, match_threshold=0.0), ranker)),
+                  ("SAAT exhaustive", lambda q, o: saat.evaluate(q, dict(o, early_termination=False))),
+                  ("SAAT", lambda q, o: saat.evaluate(q, o))]
+    for hit_count in (10, 100):
+        options = {"hit_count": hit_count}
+        baseline = None
+        for (label, evaluate) in evaluators:
+            start = timer()
+            results = [{m["document"].document_id for m in evaluate(query, options)} for query in queries]
+            latency = (timer() - start) / len(queries)
+            baseline = baseline or results
+            overlap = sum(len(a & b) for (a, b) in zip(baseline, results)) / max(1, sum(len(a) for a in baseline))
+            print(f"{label + ' top-' + str(hit_count):<24} {latency * 1e6:>8.1f} us/query {overlap:>6.1%} overlap with DAAT")
+
+
+def benchmark_postings_cache():
+    print("Loading English news corpus...")
+    corpus = in3120.InMemoryCorpus(data_path("en.txt"))
+    normalizer = in3120.SimpleNormalizer()
+    tokenizer = in3120.SimpleTokenizer()
+    queries = _sample_queries(corpus, 1000)
+    options = {"hit_count": 10, "match_threshold": 0.5}
+    with tempfile.TemporaryDirectory() as directory:
+        log = os.path.join(directory, "queries.txt")
+        with open(log, "w", encoding="utf-8") as f:
+            f.writelines(query + "\n" for query in _sample_queries(corpus, 1000, 17))
+        for (cache_size, warm_up) in ((0, 0), (1 << 16, 0), (1 << 20, 0), (1 << 20, 100), (1 << 24, 0)):
+            index = in3120.InMemoryInvertedIndex(corpus, ["body"], normalizer, tokenizer, True, postings_cache_size=cache_size)
+            index.warm_up_cache(log, warm_up)
+            engine = in3120.SimpleSearchEngine(corpus, index)
+            ranker = in3120.SimpleRanker()
+            start = timer()
+            for query in queries:
+                for _ in engine.evaluate(query, options, ranker):
+                    pass
+            latency = (timer() - start) / len(queries)
+            statistics = index.get_cache_statistics()
+            lookups = max(1, statistics["hits"] + statistics["misses"])
+            print(f"{'cache=' + str(cache_size) + ' warm-up=' + str(warm_up):<28} {latency * 1e6:>8.1f} us/query "
+                  f"hit rate {statistics['hits'] / lookups:>5.1%} {statistics['evictions']:>6} evictions")
+
+
+def _build_in_memory_index(filename: str) -> int:
+    corpus = in3120.FileCorpus(filename)
+    index = in3120.InMemoryInvertedIndex(corpus, ["body"], in3120.SimpleNormalizer(), in3120.SimpleTokenizer(), True)
+    return corpus.size() if index else 0
+
+
+def _build_spimi_index(filename: str, memory_budget: int, output: str) -> int:
+    builder = in3120.SpimiIndexBuilder(["body"], in3120.SimpleNormalizer(), in3120.SimpleTokenizer(), memory_budget)
+    builder.build(in3120.FileCorpus(filename), output)
+    return builder.get_statistics()["documents"]
+
+
+def benchmark_spimi():
+    filename = data_path("en.txt")
+    with tempfile.TemporaryDirectory() as directory:
+        output = os.path.join(directory, "index.bin")
+        _report("in-memory", filename, _measure_in_subprocess(_build_in_memory_index, filename))
+        for memory_budget in (1 << 20, 1 << 23, 1 << 26):
+            _report(f"spimi {memory_budget >> 20}MB", filename, _measure_in_subprocess(_build_spimi_index, filename, memory_budget, output))
+
+
+def benchmark_disk_index():
+    print("Loading English news corpus...")
+    corpus = in3120.InMemoryCorpus(data_path("en.txt"))
+    normalizer = in3120.SimpleNormalizer()
+    tokenizer = in3120.SimpleTokenizer()
+    queries = _sample_queries(corpus, 1000)
+    options = {"hit_count": 10, "match_threshold": 0.5}
+    with tempfile.TemporaryDirectory() as directory:
+        filename = os.path.join(directory, "index.bin")
+        start = timer()
+        index = in3120.InMemoryInvertedIndex(corpus, ["body"], normalizer, tokenizer, True)
+        print(f"{'build in-memory':<20} {(timer() - start) * 1e3:>10.2f} ms")
+        start = timer()
+        in3120.DiskInvertedIndex.write(index, filename)
+        print(f"{'write to disk':<20} {(timer() - start) * 1e3:>10.2f} ms {os.path.getsize(filename) / (1024 * 1024):>8.2f} MB")
+        start = timer()
+        disk_index = in3120.DiskInvertedIndex(filename, normalizer, tokenizer)
+        print(f"{'open from disk':<20} {(timer() - start) * 1e3:>10.2f} ms")
+        for (label, target) in (("query in-memory", index), ("query on disk", disk_index)):
+            engine = in3120.SimpleSearchEngine(corpus, target)
+            ranker = in3120.SimpleRanker()
+            start = timer()
+            for query in queries:
+                for _ in engine.evaluate(query, options, ranker):
+                    pass
+            print(f"{label:<20} {(timer() - start) / len(queries) * 1e6:>10.1f} us/query")
+        disk_index.close()
+
+
+def main():
+    benchmarks = {
+        "xml": benchmark_xml_loading,
+        "fetch": benchmark_document_fetching,
+        "dictionary": benchmark_dictionaries,
+        "postings": benchmark_posting_lists,
+        "codecs": benchmark_codecs,
+        "vbyte": benchmark_variable_byte_codec,
+        "phrases": benchmark_phrase_search,
+        "bitmaps": benchmark_bitmaps,
+        "cursors": benchmark_cursors,
+        "impacts": benchmark_impacts,
+        "cache": benchmark_postings_cache,
+        "spimi": benchmark_spimi,
+        "disk": benchmark_disk_index,
+    }
+    targets = sys.argv[1:]
+    if not targets:
+        print(f"{sys.argv[0]} [{'|'.join(key for key in benchmarks.keys())}]")
+    else:
+        for target in (target.lower() for target in targets):
+            if target in benchmarks:
+                benchmarks[target]()
+            else:
+                print(f"Unknown benchmark '{target}', expected one of [{'|'.join(key for key in benchmarks.keys())}]")
+
+
+if __name__ == "__main__":
+    main()
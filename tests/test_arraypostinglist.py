@@ -0,0 +1,54 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+import unittest
+from test_inmemorypostinglist import TestInMemoryPostingList
+from context import in3120
+
+
+class TestArrayPostingList(unittest.TestCase):
+
+    def setUp(self):
+        self._tester = TestInMemoryPostingList()
+        self._tester.setUp()
+
+    def test_append_and_iterate(self):
+        self._tester._test_append_and_iterate(in3120.ArrayPostingList())
+
+    def test_invalid_append(self):
+        self._tester._test_invalid_append(in3120.ArrayPostingList())
+
+    def test_advance_to(self):
+        self._tester._test_advance_to(in3120.ArrayPostingList())
+
+    def test_cursor(self):
+        self._tester._test_cursor(in3120.ArrayPostingList())
+
+    def test_mesh_corpus(self):
+        normalizer = in3120.SimpleNormalizer()
+        tokenizer = in3120.SimpleTokenizer()
+        corpus = in3120.InMemoryCorpus("../data/mesh.txt")
+        index1 = in3120.InMemoryInvertedIndex(corpus, ["body"], normalizer, tokenizer)
+        index2 = in3120.InMemoryInvertedIndex(corpus, ["body"], normalizer, tokenizer,
+                                              posting_list_factory=in3120.ArrayPostingList)
+        for term in ("hydrogen", "hydrocephalus", "water", "wtf"):
+            self.assertListEqual([(p.document_id, p.term_frequency) for p in index1[term]],
+                                 [(p.document_id, p.term_frequency) for p in index2[term]])
+
+    def test_memory_usage(self):
+        import tracemalloc
+        postings = [in3120.Posting(i, 1 + i % 7) for i in range(0, 30000, 3)]
+        tracemalloc.start()
+        snapshot1 = tracemalloc.take_snapshot()
+        posting_list = in3120.ArrayPostingList()
+        for posting in postings:
+            posting_list.append_posting(posting)
+        posting_list.finalize_postings()
+        snapshot2 = tracemalloc.take_snapshot()
+        tracemalloc.stop()
+        size = sum(s.size_diff for s in snapshot2.compare_to(snapshot1, "filename"))
+        self.assertLess(size / len(postings), 10)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
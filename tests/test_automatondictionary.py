@@ -0,0 +1,86 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+import unittest
+from context import in3120
+
+
+class TestAutomatonDictionary(unittest.TestCase):
+
+    def setUp(self):
+        self.__terms = ["tap", "taps", "top", "tops", "stop", "stops", "", "a", "ab", "abc", "abd", "b",
+                        "blåbær", "blå", "日本", "日本語", "x" * 2000]
+        self.__source = in3120.InMemoryDictionary()
+        for term in self.__terms:
+            self.__source.add_if_absent(term)
+
+    def test_lookups_preserve_term_identifiers(self):
+        dictionary = in3120.AutomatonDictionary(self.__source)
+        self.assertEqual(dictionary.size(), len(self.__terms))
+        self.assertEqual(len(dictionary), len(self.__terms))
+        for term in self.__terms:
+            self.assertEqual(dictionary.get_term_id(term), self.__source.get_term_id(term))
+            self.assertEqual(dictionary[term], self.__source[term])
+        for term in ("t", "ta", "tapss", "abcd", "blåb", "日", "x" * 1999, "zzz"):
+            self.assertIsNone(dictionary.get_term_id(term))
+            self.assertNotIn(term, dictionary)
+
+    def test_iteration(self):
+        dictionary = in3120.AutomatonDictionary(self.__source)
+        self.assertListEqual(list(dictionary), sorted(self.__source))
+
+    def test_shares_prefixes_and_suffixes(self):
+        source = in3120.InMemoryDictionary()
+        for term in ("tap", "taps", "top", "tops"):
+            source.add_if_absent(term)
+        dictionary = in3120.AutomatonDictionary(source)
+        self.assertEqual(dictionary.get_state_count(), 5)
+        self.assertEqual(dictionary.get_transition_count(), 5)
+
+    def test_iter_prefix(self):
+        dictionary = in3120.AutomatonDictionary(self.__source)
+        self.assertListEqual([t for (t, _) in dictionary.iter_prefix("ta")], ["tap", "taps"])
+        self.assertListEqual([t for (t, _) in dictionary.iter_prefix("ab")], ["ab", "abc", "abd"])
+        self.assertListEqual([t for (t, _) in dictionary.iter_prefix("日本")], ["日本", "日本語"])
+        self.assertListEqual(list(dictionary.iter_prefix("wtf")), [])
+        self.assertListEqual(list(dictionary.iter_prefix("")), list(dictionary))
+        for (term, term_id) in dictionary.iter_prefix("s"):
+            self.assertEqual(self.__source[term], term_id)
+
+    def test_iter_range(self):
+        dictionary = in3120.AutomatonDictionary(self.__source)
+        terms = sorted(self.__terms)
+        for lower in ("", "a", "aa", "abc", "abz", "s", "tap", "tb", "~", "日"):
+            for upper in (None, "", "ab", "stops", "top", "x", "~"):
+                expected = [t for t in terms if t >= lower and (upper is None or t < upper)]
+                self.assertListEqual([t for (t, _) in dictionary.iter_range(lower, upper)], expected)
+
+    def test_is_read_only(self):
+        dictionary = in3120.AutomatonDictionary(self.__source)
+        self.assertEqual(dictionary.add_if_absent("tops"), self.__source["tops"])
+        with self.assertRaises(TypeError):
+            dictionary.add_if_absent("wtf")
+
+    def test_empty_dictionary(self):
+        dictionary = in3120.AutomatonDictionary(in3120.InMemoryDictionary())
+        self.assertEqual(dictionary.size(), 0)
+        self.assertIsNone(dictionary.get_term_id("foo"))
+        self.assertIsNone(dictionary.get_term_id(""))
+        self.assertListEqual(list(dictionary), [])
+        self.assertListEqual(list(dictionary.iter_range("")), [])
+
+    def test_as_inverted_index_dictionary(self):
+        normalizer = in3120.SimpleNormalizer()
+        tokenizer = in3120.SimpleTokenizer()
+        corpus = in3120.InMemoryCorpus("../data/mesh.txt")
+        index1 = in3120.InMemoryInvertedIndex(corpus, ["body"], normalizer, tokenizer)
+        index2 = in3120.InMemoryInvertedIndex(corpus, ["body"], normalizer, tokenizer,
+                                              dictionary_factory=in3120.AutomatonDictionary)
+        for term in ("hydrogen", "hydrocephalus", "wtf"):
+            self.assertEqual(index1.get_document_frequency(term), index2.get_document_frequency(term))
+            self.assertListEqual([(p.document_id, p.term_frequency) for p in index1[term]],
+                                 [(p.document_id, p.term_frequency) for p in index2[term]])
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
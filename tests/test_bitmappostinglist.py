@@ -0,0 +1,87 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+import unittest
+from test_inmemorypostinglist import TestInMemoryPostingList
+from context import in3120
+
+
+class TestBitmapPostingList(unittest.TestCase):
+
+    def setUp(self):
+        self._tester = TestInMemoryPostingList()
+        self._tester.setUp()
+
+    def test_append_and_iterate(self):
+        self._tester._test_append_and_iterate(in3120.BitmapPostingList())
+
+    def test_invalid_append(self):
+        self._tester._test_invalid_append(in3120.BitmapPostingList())
+
+    def test_advance_to(self):
+        self._tester._test_advance_to(in3120.BitmapPostingList())
+
+    def test_cursor(self):
+        self._tester._test_cursor(in3120.BitmapPostingList())
+
+    def test_large_document_ids_and_term_frequencies(self):
+        postings = in3120.BitmapPostingList()
+        entries = [(0, 1), (70000, 300), (70001, 2), (1 << 31, 1 << 20)]
+        for (document_id, term_frequency) in entries:
+            postings.append_posting(in3120.Posting(document_id, term_frequency))
+        postings.finalize_postings()
+        self.assertListEqual([(p.document_id, p.term_frequency) for p in postings], entries)
+        iterator = iter(postings)
+        self.assertEqual(iterator.advance_to(1).document_id, 70000)
+        self.assertEqual(iterator.advance_to(1 << 20).term_frequency, 1 << 20)
+        self.assertIsNone(iterator.advance_to(1 << 20))
+
+    def test_memory_usage(self):
+        import tracemalloc
+        postings = [in3120.Posting(i, 1 + i % 3) for i in range(0, 30000, 2)]
+        sizes = []
+        tracemalloc.start()
+        for posting_list in (in3120.CompressedInMemoryPostingList(), in3120.BitmapPostingList()):
+            snapshot1 = tracemalloc.take_snapshot()
+            for posting in postings:
+                posting_list.append_posting(posting)
+            posting_list.finalize_postings()
+            snapshot2 = tracemalloc.take_snapshot()
+            sizes.append(sum(s.size_diff for s in snapshot2.compare_to(snapshot1, "filename")))
+        tracemalloc.stop()
+        self.assertLess(sizes[1], sizes[0] * 0.75)
+
+    def test_index_with_bitmaps(self):
+        normalizer = in3120.SimpleNormalizer()
+        tokenizer = in3120.SimpleTokenizer()
+        corpus = in3120.InMemoryCorpus("../data/cran.xml")
+        index1 = in3120.InMemoryInvertedIndex(corpus, ["body"], normalizer, tokenizer, compressed=True)
+        index2 = in3120.InMemoryInvertedIndex(corpus, ["body"], normalizer, tokenizer, compressed=True, bitmap_threshold=0.1)
+        self.assertIsInstance(index2["the"], in3120.BitmapPostingList.BitmapPostingListIterator)
+        self.assertNotIsInstance(index2["viscous"], in3120.BitmapPostingList.BitmapPostingListIterator)
+        merger = in3120.PostingsMerger()
+        for (term1, term2) in (("the", "of"), ("flow", "the"), ("viscous", "the"), ("the", "wtf")):
+            self.assertEqual(index1.get_document_frequency(term1), index2.get_document_frequency(term1))
+            for merge in (merger.intersection, merger.union):
+                self.assertListEqual([(p.document_id, p.term_frequency) for p in merge(index1[term1], index1[term2])],
+                                     [(p.document_id, p.term_frequency) for p in merge(index2[term1], index2[term2])])
+        with self.assertRaises(AssertionError):
+            in3120.InMemoryInvertedIndex(corpus, ["body"], normalizer, tokenizer, positional=True, bitmap_threshold=0.1)
+
+    def test_merging_partially_consumed_bitmaps(self):
+        p1 = in3120.BitmapPostingList()
+        p2 = in3120.BitmapPostingList()
+        for document_id in range(100):
+            p1.append_posting(in3120.Posting(document_id, 1))
+            if document_id % 3 == 0:
+                p2.append_posting(in3120.Posting(document_id, 2))
+        i1 = iter(p1)
+        self.assertIsNotNone(i1.get_bitmap())
+        next(i1)
+        self.assertIsNone(i1.get_bitmap())
+        result = [p.document_id for p in in3120.PostingsMerger.intersection(i1, iter(p2))]
+        self.assertListEqual(result, list(range(3, 100, 3)))
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
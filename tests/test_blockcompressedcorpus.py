@@ -0,0 +1,61 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+import unittest
+from context import in3120
+
+
+class TestBlockCompressedCorpus(unittest.TestCase):
+
+    def test_access_documents(self):
+        corpus = in3120.BlockCompressedCorpus(block_size=2)
+        for i in range(5):
+            corpus.add_document(in3120.InMemoryDocument(i, {"body": f"document {i}", "number": i}))
+        self.assertEqual(corpus.size(), 5)
+        self.assertListEqual([d.document_id for d in corpus], [0, 1, 2, 3, 4])
+        self.assertListEqual([d["number"] for d in corpus], [0, 1, 2, 3, 4])
+        for i in (4, 0, 3, 1, 2):
+            self.assertEqual(corpus[i].document_id, i)
+            self.assertEqual(corpus[i]["body"], f"document {i}")
+        with self.assertRaises(AssertionError):
+            corpus.get_document(5)
+        with self.assertRaises(AssertionError):
+            corpus.add_document(in3120.InMemoryDocument(7, {}))
+
+    def test_modifications_are_not_persisted(self):
+        corpus = in3120.BlockCompressedCorpus([in3120.InMemoryDocument(0, {"body": "foo"})], block_size=1)
+        corpus[0]["body"] = "bar"
+        self.assertEqual(corpus[0]["body"], "foo")
+
+    def test_unsupported_compression(self):
+        with self.assertRaises(ValueError):
+            in3120.BlockCompressedCorpus(compression="rar")
+
+    def test_same_documents_as_in_memory_corpus(self):
+        corpus1 = in3120.InMemoryCorpus("../data/imdb.csv")
+        for compression in ("zlib", "lzma"):
+            corpus2 = in3120.BlockCompressedCorpus(corpus1, 100, 2, compression)
+            self.assertEqual(corpus1.size(), corpus2.size())
+            for document1, document2 in zip(corpus1, corpus2):
+                self.assertEqual(repr(document1), repr(document2))
+            for document_id in range(corpus1.size()):
+                self.assertEqual(repr(corpus1[document_id]), repr(corpus2[document_id]))
+
+    def test_block_cache(self):
+        corpus = in3120.BlockCompressedCorpus(in3120.FileCorpus("../data/mesh.txt"), 100, 2)
+        for document_id in (0, 1, 99, 100, 0, 250, 100):
+            self.assertEqual(corpus[document_id].document_id, document_id)
+        statistics = corpus.get_cache_statistics()
+        self.assertEqual(statistics["misses"], 4)
+        self.assertEqual(statistics["hits"], 3)
+        self.assertEqual(statistics["evictions"], 2)
+
+    def test_compression_ratio(self):
+        corpus = in3120.InMemoryCorpus("../data/cran.xml")
+        compressed = in3120.BlockCompressedCorpus(corpus, 64)
+        raw = sum(len(d["body"].encode("utf-8")) for d in corpus)
+        self.assertGreater(raw / compressed.get_compressed_size(), 2.5)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,73 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+import unittest
+from test_inmemorypostinglist import TestInMemoryPostingList
+from context import in3120
+
+
+class TestBlockPostingList(unittest.TestCase):
+
+    def setUp(self):
+        self._tester = TestInMemoryPostingList()
+        self._tester.setUp()
+        self._factories = [lambda: in3120.BlockPostingList(),
+                           lambda: in3120.BlockPostingList(in3120.VariableByteIntegerCodec(), in3120.VariableByteIntegerCodec()),
+                           lambda: in3120.BlockPostingList(in3120.Simple8bCodec(), in3120.Simple8bCodec()),
+                           lambda: in3120.BlockPostingList(in3120.EliasFanoCodec(), in3120.PForDeltaCodec(), 16)]
+
+    def test_append_and_iterate(self):
+        for factory in self._factories:
+            self._tester._test_append_and_iterate(factory())
+
+    def test_invalid_append(self):
+        for factory in self._factories:
+            self._tester._test_invalid_append(factory())
+
+    def test_advance_to(self):
+        for factory in self._factories:
+            self._tester._test_advance_to(factory())
+
+    def test_cursor(self):
+        for factory in self._factories:
+            self._tester._test_cursor(factory())
+
+    def test_iterate_before_finalize(self):
+        posting_list = in3120.BlockPostingList(block_size=4)
+        for document_id in range(10):
+            posting_list.append_posting(in3120.Posting(document_id, 1))
+        self.assertListEqual([p.document_id for p in posting_list], list(range(10)))
+        posting_list.finalize_postings()
+        self.assertListEqual([p.document_id for p in posting_list], list(range(10)))
+        with self.assertRaises(AssertionError):
+            posting_list.append_posting(in3120.Posting(10, 1))
+
+    def test_invalid_codecs(self):
+        with self.assertRaises(AssertionError):
+            in3120.BlockPostingList(term_frequency_codec=in3120.EliasFanoCodec())
+        with self.assertRaises(AssertionError):
+            in3120.BlockPostingList(block_size=0)
+
+    def test_mesh_corpus(self):
+        normalizer = in3120.SimpleNormalizer()
+        tokenizer = in3120.SimpleTokenizer()
+        corpus = in3120.InMemoryCorpus("../data/mesh.txt")
+        index1 = in3120.InMemoryInvertedIndex(corpus, ["body"], normalizer, tokenizer)
+        for factory in self._factories:
+            index2 = in3120.InMemoryInvertedIndex(corpus, ["body"], normalizer, tokenizer, posting_list_factory=factory)
+            for term in ("hydrogen", "hydrocephalus", "water", "of", "wtf"):
+                self.assertListEqual([(p.document_id, p.term_frequency) for p in index1[term]],
+                                     [(p.document_id, p.term_frequency) for p in index2[term]])
+
+    def test_compression(self):
+        for factory in self._factories:
+            posting_list = factory()
+            for document_id in range(0, 30000, 3):
+                posting_list.append_posting(in3120.Posting(document_id, 1 + document_id % 2))
+            posting_list.finalize_postings()
+            bits = 8 * posting_list.get_buffer_size() / len(posting_list)
+            self.assertLessEqual(bits, 16)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,96 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+import os
+import tempfile
+import unittest
+from typing import Optional
+from context import in3120
+
+
+class TestCachingProcessor(unittest.TestCase):
+
+    def setUp(self):
+        self.__extractor = in3120.ShallowCaseExtractor()
+        self.__invocations = 0
+        self.__directory = tempfile.TemporaryDirectory()
+        self.__filename = os.path.join(self.__directory.name, "cache")
+
+    def tearDown(self):
+        self.__directory.cleanup()
+
+    def _extract_entities(self, document: in3120.Document) -> Optional[in3120.Document]:
+        self.__invocations += 1
+        if not document["body"]:
+            return None
+        document["entities"] = list(self.__extractor.extract(document["body"]))
+        return document
+
+    def __process(self, bodies, identity=None, batched=False):
+        processor = in3120.CachingProcessor(self._extract_entities, ["body"], ["entities"], self.__filename, identity)
+        pipeline = in3120.DocumentPipeline([processor])
+        documents = [in3120.InMemoryDocument(i, {"body": b}) for (i, b) in enumerate(bodies)]
+        if batched:
+            results = [d for d in pipeline.process_batch(documents) if d is not None]
+        else:
+            results = [d for d in (pipeline.process_document(d) for d in documents) if d is not None]
+        statistics = processor.get_statistics()
+        processor.close()
+        return (results, statistics)
+
+    def test_results_are_reused_across_reloads(self):
+        bodies = ["I went to New York City with Barack Obama.", "", "Oslo is in Norway."]
+        (results1, statistics1) = self.__process(bodies)
+        self.assertEqual(self.__invocations, 3)
+        self.assertDictEqual(statistics1, {"hits": 0, "misses": 3})
+        (results2, statistics2) = self.__process(bodies)
+        self.assertEqual(self.__invocations, 3)
+        self.assertDictEqual(statistics2, {"hits": 3, "misses": 0})
+        self.assertEqual(len(results2), 2)
+        for (document1, document2) in zip(results1, results2):
+            self.assertEqual(repr(document1), repr(document2))
+        self.assertListEqual(results2[0]["entities"], ["New York City", "Barack Obama"])
+
+    def test_changed_inputs_are_reprocessed(self):
+        self.__process(["Oslo is in Norway.", "We visited Bergen in Norway."])
+        self.assertEqual(self.__invocations, 2)
+        (results, _) = self.__process(["Oslo is in Norway.", "We visited Trondheim in Norway."])
+        self.assertEqual(self.__invocations, 3)
+        self.assertListEqual(results[1]["entities"], ["Trondheim", "Norway"])
+
+    def test_changed_identity_is_reprocessed(self):
+        self.__process(["Oslo is in Norway."])
+        self.__process(["Oslo is in Norway."], "extractor-v2")
+        self.assertEqual(self.__invocations, 2)
+        self.__process(["Oslo is in Norway."], "extractor-v2")
+        self.assertEqual(self.__invocations, 2)
+
+    def test_batch_processing(self):
+        bodies = ["Oslo is in Norway.", "", "We visited Bergen in Norway."]
+        (results1, _) = self.__process(bodies[:2], batched=True)
+        (results2, statistics) = self.__process(bodies, batched=True)
+        self.assertEqual(self.__invocations, 3)
+        self.assertDictEqual(statistics, {"hits": 2, "misses": 1})
+        self.assertListEqual([d.document_id for d in results1], [0])
+        self.assertListEqual([d.document_id for d in results2], [0, 2])
+        self.assertListEqual(results2[1]["entities"], ["Bergen", "Norway"])
+
+    def test_batch_processor_returning_new_documents(self):
+        class Copier:
+            def process_batch(self, documents):
+                return [None if not d["body"] else in3120.InMemoryDocument(d.document_id, {"body": d["body"], "length": len(d["body"])})
+                        for d in documents]
+        bodies = ["Oslo is in Norway.", "", "Bergen."]
+        for _ in range(2):
+            processor = in3120.CachingProcessor(Copier(), ["body"], ["length"], self.__filename, "copier")
+            documents = [in3120.InMemoryDocument(i, {"body": b}) for (i, b) in enumerate(bodies)]
+            results = processor.process_batch(documents)
+            self.assertEqual(len(results), 3)
+            self.assertIsNone(results[1])
+            self.assertListEqual([results[0]["length"], results[2]["length"]], [18, 7])
+            self.assertEqual(processor(in3120.InMemoryDocument(0, {"body": "Bergen."}))["length"], 7)
+            processor.close()
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
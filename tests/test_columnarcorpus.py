@@ -0,0 +1,81 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+import unittest
+from context import in3120
+
+
+class TestColumnarCorpus(unittest.TestCase):
+
+    def test_access_documents(self):
+        corpus = in3120.ColumnarCorpus()
+        corpus.add_document(in3120.InMemoryDocument(0, {"body": "this is a Test", "year": 1970, "rating": 2.5}))
+        corpus.add_document(in3120.InMemoryDocument(1, {"title": "prØve", "body": "en to tre", "year": 1971}))
+        corpus.add_document(in3120.InMemoryDocument(2, {"tags": ["a", "b"], "year": "unknown", "rating": 3.5}))
+        self.assertEqual(corpus.size(), 3)
+        self.assertListEqual([d.document_id for d in corpus], [0, 1, 2])
+        self.assertEqual(corpus[0]["body"], "this is a Test")
+        self.assertEqual(corpus[0]["year"], 1970)
+        self.assertEqual(corpus[1]["year"], 1971)
+        self.assertEqual(corpus[2]["year"], "unknown")
+        self.assertEqual(corpus[0]["rating"], 2.5)
+        self.assertIsNone(corpus[1]["rating"])
+        self.assertEqual(corpus[1].get_field("rating", 0.0), 0.0)
+        self.assertIsNone(corpus[0]["title"])
+        self.assertEqual(corpus[1]["title"], "prØve")
+        self.assertListEqual(corpus[2]["tags"], ["a", "b"])
+        self.assertListEqual(list(corpus[1].get_field_names()), ["body", "year", "title"])
+        with self.assertRaises(AssertionError):
+            corpus.add_document(in3120.InMemoryDocument(7, {"body": "out of order"}))
+
+    def test_values_of_different_types_are_kept_apart(self):
+        corpus = in3120.ColumnarCorpus()
+        for (i, value) in enumerate([1, 1.0, True, "1", None, 1]):
+            corpus.add_document(in3120.InMemoryDocument(i, {"value": value}))
+        values = [d["value"] for d in corpus]
+        self.assertListEqual([type(v) for v in values], [int, float, bool, str, type(None), int])
+
+    def test_set_field(self):
+        corpus = in3120.ColumnarCorpus()
+        corpus.add_document(in3120.InMemoryDocument(0, {"body": "foo"}))
+        corpus.add_document(in3120.InMemoryDocument(1, {"body": "bar"}))
+        corpus[1]["body"] = "baz"
+        corpus[0]["extra"] = 42
+        self.assertEqual(corpus[1]["body"], "baz")
+        self.assertEqual(corpus[0]["extra"], 42)
+        self.assertIsNone(corpus[1]["extra"])
+
+    def test_same_documents_as_in_memory_corpus(self):
+        for filename in ("../data/mesh.txt", "../data/docs.json", "../data/imdb.csv"):
+            corpus1 = in3120.InMemoryCorpus(filename)
+            corpus2 = in3120.ColumnarCorpus(in3120.FileCorpus(filename))
+            self.assertEqual(corpus1.size(), corpus2.size())
+            for document1, document2 in zip(corpus1, corpus2):
+                self.assertEqual(repr(document1), repr(document2))
+
+    def test_split(self):
+        corpus1 = in3120.InMemoryCorpus("../data/imdb.csv")
+        corpus2 = in3120.ColumnarCorpus(corpus1)
+        for (field_name, splitter) in (("genre", lambda v: v.split(",")), ("year", None), ("nonexistent", None)):
+            splits1 = corpus1.split(field_name, splitter)
+            splits2 = corpus2.split(field_name, splitter)
+            self.assertSetEqual(set(splits1.keys()), set(splits2.keys()))
+            for key in splits1:
+                self.assertListEqual([d.document_id for d in splits1[key]], [d.document_id for d in splits2[key]])
+
+    def test_memory_usage(self):
+        import tracemalloc
+        tracemalloc.start()
+        corpus1 = in3120.InMemoryCorpus("../data/imdb.csv")
+        size1 = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        tracemalloc.start()
+        corpus2 = in3120.ColumnarCorpus(in3120.FileCorpus("../data/imdb.csv"))
+        size2 = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        self.assertEqual(corpus1.size(), corpus2.size())
+        self.assertGreater(size1 / size2, 1.5)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -21,6 +21,12 @@ class TestCompressedInMemoryPostingList(unittest.TestCase):
     def test_invalid_append(self):
         self._tester1._test_invalid_append(in3120.CompressedInMemoryPostingList())
 
+    def test_advance_to(self):
+        self._tester1._test_advance_to(in3120.CompressedInMemoryPostingList())
+
+    def test_cursor(self):
+        self._tester1._test_cursor(in3120.CompressedInMemoryPostingList())
+
     def test_mesh_corpus(self):
         self._tester2._test_mesh_corpus(True)
 
@@ -0,0 +1,150 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+import os
+import tempfile
+import unittest
+from context import in3120
+
+
+class TestDiskInvertedIndex(unittest.TestCase):
+
+    def setUp(self):
+        self.__normalizer = in3120.SimpleNormalizer()
+        self.__tokenizer = in3120.SimpleTokenizer()
+        self.__directory = tempfile.TemporaryDirectory()
+        self.__filename = os.path.join(self.__directory.name, "index.bin")
+
+    def tearDown(self):
+        self.__directory.cleanup()
+
+    def test_access_postings(self):
+        with in3120.DiskInvertedIndexWriter(self.__filename, 1000) as writer:
+            self.assertEqual(writer.add_term("a", [(0, 1), (3, 2)]), 2)
+            self.assertEqual(writer.add_term("b", []), 0)
+            self.assertEqual(writer.add_term("blåbær", [(7, 3)]), 1)
+            self.assertEqual(writer.add_term("c", [(i, 1 + i % 3) for i in range(0, 1000, 2)]), 500)
+        index = in3120.DiskInvertedIndex(self.__filename, self.__normalizer, self.__tokenizer)
+        self.assertEqual(index.get_document_count(), 1000)
+        self.assertListEqual(list(index.get_terms("A BLÅBÆR")), ["a", "blåbær"])
+        self.assertListEqual([(p.document_id, p.term_frequency) for p in index["a"]], [(0, 1), (3, 2)])
+        self.assertListEqual([(p.document_id, p.term_frequency) for p in index["blåbær"]], [(7, 3)])
+        self.assertListEqual(list(index["b"]), [])
+        self.assertListEqual(list(index["wtf"]), [])
+        self.assertListEqual([(p.document_id, p.term_frequency) for p in index["c"]],
+                             [(i, 1 + i % 3) for i in range(0, 1000, 2)])
+        self.assertEqual(index.get_document_frequency("c"), 500)
+        self.assertEqual(index.get_document_frequency("b"), 0)
+        self.assertDictEqual(index.get_term_statistics("a"), {"document_frequency": 2, "collection_frequency": 3,
+                                                                 "maximum_term_frequency": 2})
+        self.assertIsNone(index.get_term_statistics("wtf"))
+        cursor = index.get_postings_cursor("c")
+        self.assertTrue(cursor.advance_to(301))
+        self.assertEqual(cursor.document_id, 302)
+        self.assertTrue(cursor.advance_to(900))
+        self.assertEqual(cursor.document_id, 900)
+        self.assertFalse(cursor.advance_to(999))
+        self.assertTrue(cursor.exhausted)
+        self.assertListEqual(list(index.get_vocabulary()), ["a", "blåbær", "c"])
+        index.verify()
+        index.close()
+
+    def test_close_with_live_cursors(self):
+        with in3120.DiskInvertedIndexWriter(self.__filename, 1000) as writer:
+            writer.add_term("a", [(i, 1) for i in range(0, 1000, 3)])
+        with in3120.DiskInvertedIndex(self.__filename, self.__normalizer, self.__tokenizer) as index:
+            cursor = index.get_postings_cursor("a")
+            iterator = index.get_postings_iterator("a")
+            self.assertTrue(cursor.next())
+        self.assertTrue(cursor.advance_to(500))
+        self.assertEqual(cursor.document_id, 501)
+        self.assertEqual(len(list(iterator)), 334)
+        index.close()
+        with self.assertRaises(ValueError):
+            index.get_postings_cursor("a")
+        with self.assertRaises(ValueError):
+            list(index.get_vocabulary())
+
+    def test_sorted_terms(self):
+        with in3120.DiskInvertedIndexWriter(self.__filename, 1) as writer:
+            writer.add_term("b", [(0, 1)])
+            with self.assertRaises(AssertionError):
+                writer.add_term("a", [(0, 1)])
+
+    def test_serialize_in_memory_index(self):
+        corpus = in3120.InMemoryCorpus("../data/mesh.txt")
+        for compressed in (False, True):
+            index1 = in3120.InMemoryInvertedIndex(corpus, ["body"], self.__normalizer, self.__tokenizer, compressed)
+            in3120.DiskInvertedIndex.write(index1, self.__filename)
+            index2 = in3120.DiskInvertedIndex(self.__filename, self.__normalizer, self.__tokenizer)
+            index2.verify()
+            self.assertEqual(index2.get_document_count(), corpus.size())
+            vocabulary = sorted(index1.get_vocabulary())
+            self.assertListEqual(list(index2.get_vocabulary()), vocabulary)
+            for term in vocabulary + ["wtf", "", "\uffff"]:
+                self.assertEqual(index1.get_term_statistics(term), index2.get_term_statistics(term))
+                self.assertEqual(index1.get_document_frequency(term), index2.get_document_frequency(term))
+                self.assertListEqual([(p.document_id, p.term_frequency) for p in index1[term]],
+                                     [(p.document_id, p.term_frequency) for p in index2[term]])
+            for term in ("of", "the", "disease"):
+                for target in (0, 1000, 12345, 20000, 27000):
+                    (cursor1, cursor2) = (index1.get_postings_cursor(term), index2.get_postings_cursor(term))
+                    self.assertEqual(cursor1.advance_to(target), cursor2.advance_to(target))
+                    self.assertEqual((cursor1.document_id, cursor1.exhausted), (cursor2.document_id, cursor2.exhausted))
+            index2.close()
+
+    def test_serialize_index_without_terms(self):
+        corpus = in3120.InMemoryCorpus("../data/mesh.txt")
+        index = in3120.InMemoryInvertedIndex(corpus, ["body"], self.__normalizer, self.__tokenizer,
+                                             dictionary_factory=in3120.PerfectHashDictionary)
+        with self.assertRaises(TypeError):
+            in3120.DiskInvertedIndex.write(index, self.__filename)
+        self.assertFalse(os.path.exists(self.__filename))
+
+    def test_failed_write(self):
+        def failing_postings():
+            yield (0, 1)
+            raise RuntimeError("wtf")
+        with self.assertRaises(RuntimeError):
+            with in3120.DiskInvertedIndexWriter(self.__filename, 1000) as writer:
+                writer.add_term("a", [(0, 1), (3, 2)])
+                raise RuntimeError("wtf")
+        self.assertListEqual(os.listdir(self.__directory.name), [])
+        with in3120.DiskInvertedIndexWriter(self.__filename, 1000) as writer:
+            writer.add_term("a", [(0, 1), (3, 2)])
+        with self.assertRaises(RuntimeError):
+            with in3120.DiskInvertedIndexWriter(self.__filename, 1000) as writer:
+                writer.add_term("a", failing_postings())
+        self.assertListEqual(os.listdir(self.__directory.name), ["index.bin"])
+        with in3120.DiskInvertedIndex(self.__filename, self.__normalizer, self.__tokenizer) as index:
+            index.verify()
+            self.assertListEqual([(p.document_id, p.term_frequency) for p in index["a"]], [(0, 1), (3, 2)])
+
+    def test_corruption(self):
+        with in3120.DiskInvertedIndexWriter(self.__filename, 1000) as writer:
+            writer.add_term("a", [(0, 1), (3, 2)])
+            writer.add_term("b", [(i, 1) for i in range(1000)])
+        with open(self.__filename, "r+b") as f:
+            f.seek(in3120.DiskInvertedIndex.HEADER.size + 5)
+            f.write(b"\xff")
+        index = in3120.DiskInvertedIndex(self.__filename, self.__normalizer, self.__tokenizer)
+        self.assertEqual(index.get_document_frequency("b"), 1000)
+        with self.assertRaises(IOError):
+            index.verify()
+        index.close()
+        with open(self.__filename, "r+b") as f:
+            f.seek(16)
+            f.write(b"\xff")
+        with self.assertRaises(IOError):
+            in3120.DiskInvertedIndex(self.__filename, self.__normalizer, self.__tokenizer)
+
+    def test_unsupported_format(self):
+        for size in (100, 10, 0):
+            with open(self.__filename, "wb") as f:
+                f.write(bytes(size))
+            with self.assertRaises(IOError):
+                in3120.DiskInvertedIndex(self.__filename, self.__normalizer, self.__tokenizer)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -51,6 +51,61 @@ class TestDocumentPipeline(unittest.TestCase):
         self.assertIsNone(pipeline.process_document(in3120.InMemoryDocument(10, {"foo": 1000})))
         self.assertIsNotNone(pipeline.process_document(in3120.InMemoryDocument(10, {"foo": 999})))
 
+    def test_batch_processing(self):
+        class Uppercaser:
+            def __init__(self):
+                self.batches = 0
+
+            def __call__(self, document):
+                raise AssertionError("Should have been batched")
+
+            def process_batch(self, documents):
+                self.batches += 1
+                for document in documents:
+                    document["foo"] = document["foo"].upper()
+                return documents
+        uppercaser = Uppercaser()
+        pipeline = in3120.DocumentPipeline([self._drop_if_foo_is_1000, lambda d: d if d["foo"] != "b" else None, uppercaser])
+        documents = [in3120.InMemoryDocument(i, {"foo": v}) for (i, v) in enumerate(["a", 1000, "b", "c"])]
+        documents = pipeline.process_batch(documents)
+        self.assertEqual(len(documents), 4)
+        self.assertIsNone(documents[1])
+        self.assertIsNone(documents[2])
+        self.assertListEqual([documents[0].document_id, documents[3].document_id], [0, 3])
+        self.assertListEqual([documents[0]["foo"], documents[3]["foo"]], ["A", "C"])
+        self.assertEqual(uppercaser.batches, 1)
+        self.assertListEqual(pipeline.process_batch([]), [])
+
+    def test_batch_processors_must_preserve_length(self):
+        pipeline = in3120.DocumentPipeline([lambda d: d, type("Filter", (), {"process_batch": lambda self, ds: ds[:1]})()])
+        with self.assertRaises(ValueError):
+            pipeline.process_batch([in3120.InMemoryDocument(i, {"foo": i}) for i in range(3)])
+
+    def test_nested_batch_processing(self):
+        inner = in3120.DocumentPipeline([self._drop_if_foo_is_1000])
+        outer = in3120.DocumentPipeline([inner])
+        documents = outer.process_batch([in3120.InMemoryDocument(i, {"foo": 999 + i}) for i in range(3)])
+        self.assertListEqual([d["foo"] if d else None for d in documents], [999, None, 1001])
+
+    def test_statistics(self):
+        pipeline = in3120.DocumentPipeline([self._drop_if_foo_is_1000, lambda d: d])
+        for foo in (999, 1000, 1001):
+            pipeline.process_document(in3120.InMemoryDocument(0, {"foo": foo}))
+        pipeline.process_batch([in3120.InMemoryDocument(0, {"foo": 1000})])
+        statistics = pipeline.get_statistics()
+        self.assertEqual(len(statistics), 2)
+        self.assertEqual(statistics[0]["processor"], "_drop_if_foo_is_1000")
+        self.assertEqual(statistics[0]["documents"], 4)
+        self.assertEqual(statistics[0]["dropped"], 2)
+        self.assertEqual(statistics[1]["processor"], "<lambda>")
+        self.assertEqual(statistics[1]["documents"], 2)
+        self.assertEqual(statistics[1]["dropped"], 0)
+        self.assertTrue(all(s["seconds"] >= 0.0 for s in statistics))
+        pipeline.merge_statistics(statistics)
+        self.assertListEqual([(s["documents"], s["dropped"]) for s in pipeline.get_statistics()], [(8, 4), (4, 0)])
+        pipeline.reset_statistics()
+        self.assertTrue(all(s["documents"] == s["dropped"] == 0 and s["seconds"] == 0.0 for s in pipeline.get_statistics()))
+
 
 if __name__ == '__main__':
     unittest.main(verbosity=2)
@@ -0,0 +1,57 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+import unittest
+from typing import Optional
+from context import in3120
+
+
+class TestFileCorpus(unittest.TestCase):
+
+    def test_unsupported_extension(self):
+        with self.assertRaises(IOError):
+            in3120.FileCorpus("../data/cran.xml")
+
+    def test_load_from_file(self):
+        for filename, size in (("../data/mesh.txt", 25588), ("../data/docs.json", 13), ("../data/imdb.csv", 1000)):
+            corpus = in3120.FileCorpus(filename)
+            self.assertEqual(corpus.size(), size)
+            self.assertEqual(len(list(corpus)), size)
+
+    def test_same_documents_as_in_memory_corpus(self):
+        for filename in ("../data/mesh.txt", "../data/docs.json", "../data/imdb.csv"):
+            corpus1 = in3120.InMemoryCorpus(filename)
+            corpus2 = in3120.FileCorpus(filename)
+            for document1, document2 in zip(corpus1, corpus2):
+                self.assertEqual(document1.document_id, document2.document_id)
+                self.assertEqual(repr(document1), repr(document2))
+            for document_id in (corpus1.size() - 1, 0, corpus1.size() // 2):
+                self.assertEqual(repr(corpus1[document_id]), repr(corpus2[document_id]))
+
+    def test_random_access_before_iterating(self):
+        corpus = in3120.FileCorpus("../data/imdb.csv")
+        document = corpus.get_document(999)
+        self.assertEqual(document.document_id, 999)
+        self.assertEqual(document["title"], in3120.InMemoryCorpus("../data/imdb.csv")[999]["title"])
+
+    def _drop_document_if_it_contains_the_in_body(self, document: in3120.Document) -> Optional[in3120.Document]:
+        return None if "the" in document.get_field("body", "") else document
+
+    def test_load_from_file_but_drop_documents_that_contain_the_in_body(self):
+        pipeline = in3120.DocumentPipeline([self._drop_document_if_it_contains_the_in_body])
+        corpus = in3120.FileCorpus("../data/mesh.txt", pipeline)
+        self.assertEqual(corpus.size(), 25017)
+        self.assertListEqual([d.document_id for d in corpus][-3:], [25014, 25015, 25016])
+        self.assertNotIn("the", corpus[25016]["body"])
+        corpus = in3120.FileCorpus("../data/docs.json", pipeline)
+        self.assertEqual(corpus.size(), 0)
+
+    def test_document_modifications_are_not_persisted(self):
+        corpus = in3120.FileCorpus("../data/docs.json")
+        document = corpus[0]
+        document["title"] = "foo"
+        self.assertEqual(corpus[0]["title"], "Google")
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,58 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+import unittest
+from context import in3120
+
+
+class TestFrontCodedDictionary(unittest.TestCase):
+
+    def setUp(self):
+        self.__terms = ["foo", "foobar", "foobaz", "bar", "", "zebra", "blåbær", "blå", "blåbærsyltetøy",
+                        "日本", "日本語", "a", "ab", "abc", "abd", "b", "x" * 300]
+        self.__source = in3120.InMemoryDictionary()
+        for term in self.__terms:
+            self.__source.add_if_absent(term)
+
+    def test_lookups_preserve_term_identifiers(self):
+        for block_size in (1, 2, 3, 16, 100):
+            dictionary = in3120.FrontCodedDictionary(self.__source, block_size)
+            self.assertEqual(dictionary.size(), len(self.__terms))
+            self.assertEqual(len(dictionary), len(self.__terms))
+            for term in self.__terms:
+                self.assertEqual(dictionary.get_term_id(term), self.__source.get_term_id(term))
+                self.assertEqual(dictionary[term], self.__source[term])
+                self.assertIn(term, dictionary)
+            for term in ("0", "aa", "abcd", "blåbæ", "fooba", "日", "zzz", "x" * 299):
+                self.assertIsNone(dictionary.get_term_id(term))
+                self.assertNotIn(term, dictionary)
+
+    def test_iteration(self):
+        dictionary = in3120.FrontCodedDictionary(self.__source, 4)
+        self.assertListEqual(sorted(dictionary), sorted(self.__source))
+        terms = [term for (term, _) in dictionary]
+        self.assertListEqual(terms, sorted(terms, key=lambda t: t.encode("utf-8")))
+
+    def test_is_read_only(self):
+        dictionary = in3120.FrontCodedDictionary(self.__source)
+        self.assertEqual(dictionary.add_if_absent("foobar"), self.__source["foobar"])
+        with self.assertRaises(TypeError):
+            dictionary.add_if_absent("wtf")
+
+    def test_empty_dictionary(self):
+        dictionary = in3120.FrontCodedDictionary(in3120.InMemoryDictionary())
+        self.assertEqual(dictionary.size(), 0)
+        self.assertIsNone(dictionary.get_term_id("foo"))
+        self.assertListEqual(list(dictionary), [])
+
+    def test_compresses_shared_prefixes(self):
+        source = in3120.InMemoryDictionary()
+        for i in range(1000):
+            source.add_if_absent(f"international{i:04}")
+        dictionary = in3120.FrontCodedDictionary(source)
+        self.assertLess(dictionary.get_buffer_size(), 0.4 * sum(len(t) for (t, _) in source))
+        self.assertEqual(dictionary.get_term_id("international0042"), 42)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
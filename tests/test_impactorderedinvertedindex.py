@@ -0,0 +1,46 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+import unittest
+from context import in3120
+
+
+class TestImpactOrderedInvertedIndex(unittest.TestCase):
+
+    def setUp(self):
+        self.__normalizer = in3120.SimpleNormalizer()
+        self.__tokenizer = in3120.SimpleTokenizer()
+
+    def test_segments(self):
+        corpus = in3120.InMemoryCorpus()
+        corpus.add_document(in3120.InMemoryDocument(corpus.size(), {"body": "a b b b"}))
+        corpus.add_document(in3120.InMemoryDocument(corpus.size(), {"body": "b c"}))
+        corpus.add_document(in3120.InMemoryDocument(corpus.size(), {"body": "b b b c"}))
+        corpus.add_document(in3120.InMemoryDocument(corpus.size(), {"body": "c"}))
+        index = in3120.ImpactOrderedInvertedIndex(corpus, ["body"], self.__normalizer, self.__tokenizer, 4)
+        self.assertListEqual([(i, list(d)) for (i, d) in index.get_impact_segments("a")], [(15, [0])])
+        segments = [(i, list(d)) for (i, d) in index.get_impact_segments("c")]
+        self.assertListEqual([d for (_, d) in segments], [[1, 2, 3]])
+        self.assertLess(segments[0][0], 15)
+        self.assertGreater(segments[0][0], 0)
+        segments = [(i, list(d)) for (i, d) in index.get_impact_segments("b")]
+        self.assertListEqual([d for (_, d) in segments], [[0, 2], [1]])
+        self.assertGreater(segments[0][0], segments[1][0])
+        self.assertListEqual(index.get_impact_segments("wtf"), [])
+        self.assertAlmostEqual(index.get_impact_scale() * 15, 0.30103 * 0.60206, 5)
+
+    def test_mesh_corpus(self):
+        corpus = in3120.InMemoryCorpus("../data/mesh.txt")
+        index1 = in3120.InMemoryInvertedIndex(corpus, ["body"], self.__normalizer, self.__tokenizer)
+        index2 = in3120.ImpactOrderedInvertedIndex(corpus, ["body"], self.__normalizer, self.__tokenizer)
+        for term in ("hydrogen", "hydrocephalus", "water", "of", "wtf"):
+            self.assertEqual(index1.get_document_frequency(term), index2.get_document_frequency(term))
+            self.assertListEqual([(p.document_id, p.term_frequency) for p in index1[term]],
+                                 [(p.document_id, p.term_frequency) for p in index2[term]])
+            impacts = [impact for (impact, _) in index2.get_impact_segments(term)]
+            self.assertListEqual(impacts, sorted(set(impacts), reverse=True))
+            self.assertTrue(all(0 <= impact <= 255 for impact in impacts))
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
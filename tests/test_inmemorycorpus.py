@@ -6,6 +6,33 @@ from typing import Optional
 from context import in3120
 
 
+def _drop_document_if_it_contains_the_in_body(document: in3120.Document) -> Optional[in3120.Document]:
+    return None if "the" in document.get_field("body", "") else document
+
+
+class _OpaqueDocument(in3120.Document):
+    """
+    A document that can't enumerate its fields, like document types that predate get_field_names.
+    """
+
+    def __init__(self, document_id, fields):
+        self.__document_id = document_id
+        self.__fields = fields
+
+    def get_document_id(self):
+        return self.__document_id
+
+    def get_field(self, field_name, default):
+        return self.__fields.get(field_name, default)
+
+    def set_field(self, field_name, field_value):
+        self.__fields[field_name] = field_value
+
+
+def _make_document_opaque(document: in3120.Document) -> Optional[in3120.Document]:
+    return _OpaqueDocument(document.document_id, {"body": document["body"], "meta": document["meta"]})
+
+
 class TestInMemoryCorpus(unittest.TestCase):
 
     def test_access_documents(self):
@@ -17,6 +44,23 @@ class TestInMemoryCorpus(unittest.TestCase):
         self.assertListEqual([corpus[i].document_id for i in range(0, corpus.size())], [0, 1])
         self.assertListEqual([corpus.get_document(i).document_id for i in range(0, corpus.size())], [0, 1])
 
+    def test_split(self):
+        corpus = in3120.InMemoryCorpus()
+        corpus.add_document(in3120.InMemoryDocument(0, {"genre": "Comedy,Drama"}))
+        corpus.add_document(in3120.InMemoryDocument(1, {"genre": "Drama"}))
+        corpus.add_document(in3120.InMemoryDocument(2, {}))
+        splits = corpus.split("genre", lambda v: v.split(",") if v else [])
+        self.assertSetEqual(set(splits.keys()), {"Comedy", "Drama"})
+        self.assertIsInstance(splits["Drama"], in3120.CorpusView)
+        self.assertEqual(splits["Drama"].size(), 2)
+        self.assertListEqual([d.document_id for d in splits["Drama"]], [0, 1])
+        self.assertIs(splits["Drama"][1], corpus[1])
+        self.assertListEqual([d.document_id for d in splits["Comedy"]], [0])
+        with self.assertRaises(AssertionError):
+            splits["Comedy"].get_document(1)
+        subsplits = splits["Drama"].split("genre")
+        self.assertListEqual([d.document_id for d in subsplits["Drama"]], [1])
+
     def test_load_from_file(self):
         corpus = in3120.InMemoryCorpus("../data/mesh.txt")
         self.assertEqual(corpus.size(), 25588)
@@ -41,6 +85,86 @@ class TestInMemoryCorpus(unittest.TestCase):
         corpus = in3120.InMemoryCorpus("../data/imdb.csv", pipeline)
         self.assertEqual(corpus.size(), 1000)
 
+    def test_load_from_file_in_parallel(self):
+        pipeline = in3120.DocumentPipeline([_drop_document_if_it_contains_the_in_body])
+        for filename in ("../data/mesh.txt", "../data/docs.json", "../data/en.txt"):
+            for p in (None, pipeline):
+                corpus1 = in3120.InMemoryCorpus(filename, p)
+                corpus2 = in3120.InMemoryCorpus(filename, p, 3)
+                self.assertEqual(corpus1.size(), corpus2.size())
+                self.assertListEqual([d.document_id for d in corpus2], list(range(corpus2.size())))
+                for document1, document2 in zip(corpus1, corpus2):
+                    self.assertEqual(repr(document1), repr(document2))
+
+    def test_pipeline_statistics_are_collected_from_workers(self):
+        for processes in (1, 3):
+            pipeline = in3120.DocumentPipeline([_drop_document_if_it_contains_the_in_body])
+            corpus = in3120.InMemoryCorpus("../data/en.txt", pipeline, processes)
+            statistics = pipeline.get_statistics()
+            self.assertEqual(len(statistics), 1)
+            self.assertEqual(statistics[0]["documents"] - statistics[0]["dropped"], corpus.size())
+            self.assertEqual(statistics[0]["documents"], in3120.InMemoryCorpus("../data/en.txt").size())
+
+    def test_pipeline_gets_batches_when_loading_sequentially(self):
+        class BatchDropper:
+            def __init__(self):
+                self.batch_sizes = []
+            def __call__(self, document):
+                raise AssertionError("Expected batches only")
+            def process_batch(self, documents):
+                self.batch_sizes.append(len(documents))
+                return [_drop_document_if_it_contains_the_in_body(d) for d in documents]
+        dropper = BatchDropper()
+        corpus = in3120.InMemoryCorpus("../data/mesh.txt", in3120.DocumentPipeline([dropper]))
+        self.assertEqual(corpus.size(), 25017)
+        self.assertGreater(max(dropper.batch_sizes), 1)
+        self.assertEqual(sum(dropper.batch_sizes), in3120.InMemoryCorpus("../data/mesh.txt").size())
+        self.assertListEqual([d.document_id for d in corpus], list(range(corpus.size())))
+
+    def test_load_with_projection(self):
+        corpus = in3120.InMemoryCorpus("../data/imdb.csv", fields=["title", "nonexistent"])
+        self.assertEqual(corpus.size(), 1000)
+        self.assertListEqual(list(corpus[0].get_field_names()), ["title"])
+        self.assertEqual(corpus[0]["title"], "Nine Lives")
+        corpus = in3120.InMemoryCorpus("../data/cran.xml", fields=[], source_field="record")
+        self.assertListEqual([d["record"] for d in corpus][:3], [0, 1, 2])
+        self.assertListEqual(list(corpus[0].get_field_names()), ["record"])
+
+    def test_projection_happens_after_pipeline(self):
+        pipeline = in3120.DocumentPipeline([_drop_document_if_it_contains_the_in_body])
+        for processes in (1, 3):
+            corpus = in3120.InMemoryCorpus("../data/mesh.txt", pipeline, processes, ["meta"], "record")
+            self.assertEqual(corpus.size(), 25017)
+            source = in3120.InMemoryCorpus("../data/mesh.txt")
+            for document in corpus:
+                self.assertIsNone(document["body"])
+                self.assertEqual(document["meta"], source[document["record"]]["meta"])
+                self.assertNotIn("the", source[document["record"]]["body"])
+
+    def test_documents_that_cannot_enumerate_their_fields(self):
+        pipeline = in3120.DocumentPipeline([_drop_document_if_it_contains_the_in_body, _make_document_opaque])
+        source = in3120.InMemoryCorpus("../data/mesh.txt")
+        for processes in (1, 3):
+            for (fields, source_field) in ((None, None), (None, "record"), (["meta", "nonexistent"], "record")):
+                corpus = in3120.InMemoryCorpus("../data/mesh.txt", pipeline, processes, fields, source_field)
+                self.assertEqual(corpus.size(), 25017)
+                for (i, document) in enumerate(corpus):
+                    self.assertEqual(document.document_id, i)
+                    self.assertIsNone(document["nonexistent"])
+                    if source_field is not None:
+                        self.assertEqual(document["meta"], source[document["record"]]["meta"])
+                        self.assertEqual(document["body"] is None, fields is not None)
+
+    def test_load_from_xml_with_mixed_content(self):
+        import os
+        import tempfile
+        with tempfile.TemporaryDirectory() as directory:
+            filename = os.path.join(directory, "docs.xml")
+            with open(filename, mode="w", encoding="utf-8") as f:
+                f.write("<docs><doc>foo</doc><group><doc>bar <b>ignored</b> baz</doc></group><doc/></docs>")
+            corpus = in3120.InMemoryCorpus(filename)
+            self.assertListEqual([d["body"] for d in corpus], ["foo", "bar   baz", ""])
+
 
 if __name__ == '__main__':
     unittest.main(verbosity=2)
@@ -34,6 +34,25 @@ class TestInMemoryDocument(unittest.TestCase):
         self.assertEqual(document["baz"], "Another field.")
         self.assertIsNone(document["wtf"])
 
+    def test_get_field_names(self):
+        document = in3120.InMemoryDocument(21, {"foo": "This is some text.", "bar": 1970})
+        self.assertListEqual(sorted(document.get_field_names()), ["bar", "foo"])
+        document["baz"] = "Another field."
+        self.assertListEqual(sorted(document.get_field_names()), ["bar", "baz", "foo"])
+
+    def test_legacy_subclass(self):
+        class LegacyDocument(in3120.Document):
+            def get_document_id(self):
+                return 42
+            def get_field(self, field_name, default):
+                return default
+            def set_field(self, field_name, field_value):
+                pass
+        document = LegacyDocument()
+        self.assertEqual(document.document_id, 42)
+        with self.assertRaises(NotImplementedError):
+            document.get_field_names()
+
 
 if __name__ == '__main__':
     unittest.main(verbosity=2)
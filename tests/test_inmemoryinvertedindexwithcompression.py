@@ -19,9 +19,57 @@ class TestInMemoryInvertedIndexWithCompression(unittest.TestCase):
     def test_mesh_corpus(self):
         self._tester.test_mesh_corpus()
 
+    def test_term_statistics(self):
+        self._tester.test_term_statistics()
+
     def test_multiple_fields(self):
         self._tester.test_multiple_fields()
 
+    def test_postings_cache(self):
+        import os
+        import tempfile
+        corpus = in3120.InMemoryCorpus("../data/mesh.txt")
+        normalizer = self._tester._normalizer
+        tokenizer = self._tester._tokenizer
+        index1 = in3120.InMemoryInvertedIndex(corpus, ["body"], normalizer, tokenizer, True)
+        index2 = in3120.InMemoryInvertedIndex(corpus, ["body"], normalizer, tokenizer, True, postings_cache_size=2048)
+        terms = ["water", "of", "hydrogen", "water", "wtf", "of", "disease", "water"]
+        for term in terms:
+            self.assertListEqual([(p.document_id, p.term_frequency) for p in index1[term]],
+                                 [(p.document_id, p.term_frequency) for p in index2[term]])
+            cursor = index2.get_postings_cursor(term)
+            self.assertEqual(sum(1 for _ in iter(cursor.next, False)), index1.get_document_frequency(term))
+        statistics = index2.get_cache_statistics()
+        self.assertGreater(statistics["hits"], 0)
+        self.assertGreater(statistics["misses"], 0)
+        self.assertGreater(statistics["evictions"], 0)
+        self.assertLessEqual(statistics["weight"], 2048)
+        self.assertEqual(index1.get_cache_statistics()["hits"], 0)
+        with tempfile.TemporaryDirectory() as directory:
+            filename = os.path.join(directory, "queries.txt")
+            with open(filename, "w", encoding="utf-8") as f:
+                f.write("water pollution\nWATER\nhydrogen water\nwtf wtf wtf\n")
+            index3 = in3120.InMemoryInvertedIndex(corpus, ["body"], normalizer, tokenizer, True, postings_cache_size=1 << 20)
+            self.assertEqual(index3.warm_up_cache(filename, 2), 2)
+            list(index3["water"])
+            list(index3["hydrogen"])
+            list(index3["pollution"])
+            statistics = index3.get_cache_statistics()
+            self.assertEqual((statistics["hits"], statistics["misses"]), (2, 1))  # Only "hydrogen" wasn't preloaded.
+            self.assertEqual(index1.warm_up_cache(filename, 2), 0)
+
+    def test_postings_cache_only_holds_lists_that_need_decoding(self):
+        corpus = in3120.InMemoryCorpus("../data/cran.xml")
+        normalizer = self._tester._normalizer
+        tokenizer = self._tester._tokenizer
+        index1 = in3120.InMemoryInvertedIndex(corpus, ["body"], normalizer, tokenizer, True, bitmap_threshold=0.1, postings_cache_size=1 << 20)
+        self.assertIsInstance(index1.get_postings_cursor("the"), in3120.BitmapPostingList.BitmapPostingListCursor)
+        self.assertNotIsInstance(index1.get_postings_cursor("viscous"), in3120.BitmapPostingList.BitmapPostingListCursor)
+        self.assertEqual(index1.get_cache_statistics()["misses"], 1)  # Only "viscous" went through the cache.
+        index2 = in3120.InMemoryInvertedIndex(corpus, ["body"], normalizer, tokenizer, False, postings_cache_size=1 << 20)
+        self.assertGreater(len(list(index2["viscous"])), 0)
+        self.assertEqual(index2.get_cache_statistics()["entries"], 0)
+
     def test_memory_usage(self):
         import tracemalloc
         import inspect
@@ -42,7 +90,7 @@ class TestInMemoryInvertedIndexWithCompression(unittest.TestCase):
             if statistic.traceback[0].filename == inspect.getfile(in3120.InMemoryInvertedIndex):
                 size_compressed = statistic.size_diff
         compression_ratio = size_uncompressed / size_compressed
-        self.assertGreater(compression_ratio, 14)
+        self.assertGreater(compression_ratio, 7)  # Uncompressed postings are slotted objects, i.e., fairly small already.
 
 
 if __name__ == '__main__':
@@ -31,6 +31,17 @@ class TestInMemoryInvertedIndexWithoutCompression(unittest.TestCase):
         self.assertEqual(len(list(index["hydrogen"])), 8)
         self.assertEqual(len(list(index["hydrocephalus"])), 2)
 
+    def test_term_statistics(self):
+        corpus = in3120.InMemoryCorpus("../data/mesh.txt")
+        index = in3120.InMemoryInvertedIndex(corpus, ["body"], self._normalizer, self._tokenizer, self._compressed)
+        self.assertIsNone(index.get_term_statistics("wtf"))
+        statistics = index.get_term_statistics("hydrogen")
+        postings = list(index["hydrogen"])
+        self.assertEqual(statistics["document_frequency"], len(postings))
+        self.assertEqual(statistics["collection_frequency"], sum(p.term_frequency for p in postings))
+        self.assertEqual(statistics["maximum_term_frequency"], max(p.term_frequency for p in postings))
+        self.assertSetEqual(set(statistics.keys()), {"document_frequency", "collection_frequency", "maximum_term_frequency"})
+
     def test_multiple_fields(self):
         document = in3120.InMemoryDocument(0, {
             'felt1': 'Dette er en test. Test, sa jeg. TEST!',
@@ -42,9 +42,89 @@ class TestInMemoryPostingList(unittest.TestCase):
             with self.assertRaises(AssertionError):
                 postings.append_posting(in3120.Posting(21 - i, 2))
 
+    def _test_advance_to(self, postings: in3120.PostingList):
+        import random
+        document_ids = list(range(0, 3000, 3))
+        for document_id in document_ids:
+            postings.append_posting(in3120.Posting(document_id, 1 + document_id % 5))
+        postings.finalize_postings()
+        iterator = iter(postings)
+        self.assertIsInstance(iterator, in3120.PostingListIterator)
+        self.assertEqual(iterator.advance_to(0).document_id, 0)
+        self.assertEqual(iterator.advance_to(0).document_id, 3)  # We never move backwards.
+        self.assertEqual(iterator.advance_to(1000).document_id, 1002)
+        self.assertEqual(iterator.advance_to(1000).term_frequency, 1 + 1005 % 5)
+        self.assertEqual(next(iterator).document_id, 1008)
+        self.assertEqual(iterator.advance_to(2997).document_id, 2997)
+        self.assertIsNone(iterator.advance_to(2998))
+        self.assertIsNone(next(iterator, None))
+        generator = random.Random(42)
+        for _ in range(20):
+            iterator = iter(postings)
+            position = 0
+            for target in sorted(generator.sample(range(3100), 50)):
+                expected = next((i for i in range(position, len(document_ids)) if document_ids[i] >= target), None)
+                posting = iterator.advance_to(target)
+                if expected is None:
+                    self.assertIsNone(posting)
+                    break
+                self.assertEqual(posting.document_id, document_ids[expected])
+                position = expected + 1
+
+    def _test_cursor(self, postings: in3120.PostingList):
+        import random
+        document_ids = list(range(0, 3000, 3))
+        for document_id in document_ids:
+            postings.append_posting(in3120.Posting(document_id, 1 + document_id % 5))
+        postings.finalize_postings()
+        cursor = postings.get_cursor()
+        self.assertIsInstance(cursor, in3120.PostingListCursor)
+        self.assertFalse(cursor.exhausted)
+        traversed = []
+        while cursor.next():
+            traversed.append((cursor.document_id, cursor.term_frequency))
+        self.assertTrue(cursor.exhausted)
+        self.assertFalse(cursor.next())
+        self.assertListEqual(traversed, [(p.document_id, p.term_frequency) for p in postings])
+        cursor = postings.get_cursor()
+        self.assertTrue(cursor.advance_to(0))
+        self.assertEqual(cursor.document_id, 0)
+        self.assertTrue(cursor.advance_to(0))
+        self.assertEqual(cursor.document_id, 3)  # We always move forward.
+        self.assertTrue(cursor.advance_to(1000))
+        self.assertEqual(cursor.document_id, 1002)
+        self.assertEqual(cursor.term_frequency, 1 + 1002 % 5)
+        self.assertTrue(cursor.next())
+        self.assertEqual(cursor.document_id, 1005)
+        self.assertTrue(cursor.advance_to(2997))
+        self.assertEqual(cursor.document_id, 2997)
+        self.assertFalse(cursor.advance_to(2998))
+        self.assertTrue(cursor.exhausted)
+        generator = random.Random(42)
+        for _ in range(20):
+            cursor = postings.get_cursor()
+            position = 0
+            for target in sorted(generator.sample(range(3100), 50)):
+                expected = next((i for i in range(position, len(document_ids)) if document_ids[i] >= target), None)
+                if not cursor.advance_to(target):
+                    self.assertIsNone(expected)
+                    break
+                self.assertEqual(cursor.document_id, document_ids[expected])
+                position = expected + 1
+        empty = postings.__class__()
+        empty.finalize_postings()
+        self.assertFalse(empty.get_cursor().next())
+        self.assertFalse(empty.get_cursor().advance_to(0))
+
     def test_append_and_iterate(self):
         self._test_append_and_iterate(in3120.InMemoryPostingList())
 
+    def test_cursor(self):
+        self._test_cursor(in3120.InMemoryPostingList())
+
+    def test_advance_to(self):
+        self._test_advance_to(in3120.InMemoryPostingList())
+
     def test_invalid_append(self):
         self._test_invalid_append(in3120.InMemoryPostingList())
 
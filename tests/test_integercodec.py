@@ -0,0 +1,74 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+import random
+import unittest
+from context import in3120
+
+
+class TestIntegerCodec(unittest.TestCase):
+
+    def setUp(self):
+        self._codecs = [in3120.VariableByteIntegerCodec(), in3120.PForDeltaCodec(),
+                        in3120.Simple8bCodec(), in3120.EliasFanoCodec()]
+
+    def _round_trip(self, codec: in3120.IntegerCodec, numbers):
+        data = bytearray(b"\x80\xff")  # Garbage in front, to verify that we respect the start position.
+        size = codec.encode(numbers, data)
+        self.assertEqual(len(data), size + 2)
+        data.extend(b"\x00\x00\x00")  # Garbage at the end, to verify that we don't read too far.
+        self.assertEqual(codec.decode(data, 2, len(numbers)), (numbers, size))
+        return size
+
+    def test_empty(self):
+        for codec in self._codecs:
+            self.assertEqual(self._round_trip(codec, []), 0)
+
+    def test_small_examples(self):
+        for codec in self._codecs:
+            self._round_trip(codec, [0])
+            self._round_trip(codec, [7])
+            self._round_trip(codec, [0, 0, 0, 0])
+            self._round_trip(codec, [1, 2, 3, 5, 8, 13, 21, 34])
+            self._round_trip(codec, [1, 1, 1, 200000, 200001])
+
+    def test_random_blocks(self):
+        generator = random.Random(1234)
+        for codec in self._codecs:
+            for _ in range(200):
+                numbers = [generator.choice([0, 0, 1, 2, generator.randrange(128), generator.randrange(1 << 32)])
+                           for _ in range(generator.randrange(1, 300))]
+                self._round_trip(codec, sorted(numbers) if codec.monotone else numbers)
+
+    def test_exceptions_are_patched(self):
+        codec = in3120.PForDeltaCodec()
+        numbers = [3] * 127 + [1 << 40]
+        size = self._round_trip(codec, numbers)
+        self.assertLess(size, 60)  # Roughly 2 bits per number, plus the exception.
+
+    def test_runs_of_zeros(self):
+        codec = in3120.Simple8bCodec()
+        self.assertEqual(self._round_trip(codec, [0] * 480), 16)
+        self.assertEqual(self._round_trip(codec, [0] * 240 + [1] * 60), 16)
+        self.assertEqual(self._round_trip(codec, [(1 << 60) - 1]), 8)
+        with self.assertRaises(AssertionError):
+            codec.encode([1 << 60], bytearray())
+
+    def test_elias_fano_size(self):
+        codec = in3120.EliasFanoCodec()
+        numbers = list(range(0, 128 * 64, 64))
+        size = self._round_trip(codec, numbers)
+        self.assertLessEqual(size * 8 / len(numbers), 2 + 6 + 1)
+        with self.assertRaises(AssertionError):
+            codec.encode([2, 1], bytearray())
+
+    def test_compact_for_small_numbers(self):
+        numbers = [1 + i % 3 for i in range(128)]
+        sizes = {codec.__class__.__name__: self._round_trip(codec, numbers) for codec in self._codecs[:3]}
+        self.assertEqual(sizes["VariableByteIntegerCodec"], 128)
+        self.assertLess(sizes["PForDeltaCodec"], 40)
+        self.assertLessEqual(sizes["Simple8bCodec"], 40)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
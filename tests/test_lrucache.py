@@ -0,0 +1,50 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+import unittest
+from context import in3120
+
+
+class TestLruCache(unittest.TestCase):
+
+    def test_evicts_least_recently_used(self):
+        cache = in3120.LruCache(2)
+        cache.put("a", 1)
+        cache.put("b", 2)
+        self.assertEqual(cache.get("a"), 1)
+        cache.put("c", 3)
+        self.assertIn("a", cache)
+        self.assertNotIn("b", cache)
+        self.assertIn("c", cache)
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual(cache.get("b", 42), 42)
+        self.assertEqual(len(cache), 2)
+        statistics = cache.get_statistics()
+        self.assertEqual(statistics["hits"], 1)
+        self.assertEqual(statistics["misses"], 2)
+        self.assertEqual(statistics["evictions"], 1)
+
+    def test_weighted_capacity(self):
+        cache = in3120.LruCache(10, len)
+        cache.put("a", "12345")
+        cache.put("b", "1234")
+        self.assertEqual(cache.get_statistics()["weight"], 9)
+        cache.put("c", "12")
+        self.assertNotIn("a", cache)
+        self.assertEqual(cache.get_statistics()["weight"], 6)
+        cache.put("d", "12345678901")
+        self.assertNotIn("d", cache)
+        self.assertEqual(len(cache), 2)
+        cache.put("b", "1")
+        self.assertEqual(cache.get_statistics()["weight"], 3)
+
+    def test_zero_capacity(self):
+        cache = in3120.LruCache(0)
+        cache.put("a", 1)
+        self.assertNotIn("a", cache)
+        with self.assertRaises(AssertionError):
+            in3120.LruCache(-1)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
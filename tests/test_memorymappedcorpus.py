@@ -0,0 +1,85 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+import os
+import tempfile
+import unittest
+from context import in3120
+
+
+class TestMemoryMappedCorpus(unittest.TestCase):
+
+    def setUp(self):
+        self.__directory = tempfile.TemporaryDirectory()
+        self.__filename = os.path.join(self.__directory.name, "corpus.bin")
+
+    def tearDown(self):
+        self.__directory.cleanup()
+
+    def test_access_documents(self):
+        corpus = in3120.InMemoryCorpus()
+        corpus.add_document(in3120.InMemoryDocument(0, {"body": "this is a Test", "year": 1970, "rating": 2.5}))
+        corpus.add_document(in3120.InMemoryDocument(1, {"title": "prØve", "body": "en to tre", "tags": ["a", "b"]}))
+        corpus.add_document(in3120.InMemoryDocument(2, {"flag": True, "missing": None}))
+        in3120.MemoryMappedCorpus.write(corpus, self.__filename)
+        store = in3120.MemoryMappedCorpus(self.__filename)
+        self.assertEqual(store.size(), 3)
+        self.assertListEqual([d.document_id for d in store], [0, 1, 2])
+        self.assertEqual(store[0]["body"], "this is a Test")
+        self.assertEqual(store[0]["year"], 1970)
+        self.assertEqual(store[0]["rating"], 2.5)
+        self.assertIsNone(store[0]["title"])
+        self.assertEqual(store[0].get_field("title", "default"), "default")
+        self.assertEqual(store[1]["title"], "prØve")
+        self.assertListEqual(store[1]["tags"], ["a", "b"])
+        self.assertIs(store[2]["flag"], True)
+        self.assertIsNone(store[2].get_field("missing", "default"))
+        self.assertListEqual(list(store[1].get_field_names()), ["title", "body", "tags"])
+        store.close()
+
+    def test_local_modifications(self):
+        corpus = in3120.InMemoryCorpus()
+        corpus.add_document(in3120.InMemoryDocument(0, {"body": "foo"}))
+        in3120.MemoryMappedCorpus.write(corpus, self.__filename)
+        store = in3120.MemoryMappedCorpus(self.__filename)
+        document = store[0]
+        document["body"] = "bar"
+        document["extra"] = 42
+        self.assertEqual(document["body"], "bar")
+        self.assertEqual(document["extra"], 42)
+        self.assertListEqual(list(document.get_field_names()), ["body", "extra"])
+        self.assertEqual(store[0]["body"], "foo")
+        store.close()
+
+    def test_convert_from_file(self):
+        for filename in ("../data/cran.xml", "../data/docs.json", "../data/imdb.csv"):
+            corpus = in3120.InMemoryCorpus(filename)
+            in3120.MemoryMappedCorpus.write(corpus, self.__filename)
+            store = in3120.MemoryMappedCorpus(self.__filename)
+            self.assertEqual(store.size(), corpus.size())
+            for document1, document2 in zip(corpus, store):
+                self.assertEqual(repr(document1), repr(document2))
+            store.close()
+
+    def test_search_over_memory_mapped_corpus(self):
+        normalizer = in3120.SimpleNormalizer()
+        tokenizer = in3120.SimpleTokenizer()
+        in3120.MemoryMappedCorpus.write(in3120.InMemoryCorpus("../data/cran.xml"), self.__filename)
+        store = in3120.MemoryMappedCorpus(self.__filename)
+        index = in3120.InMemoryInvertedIndex(store, ["body"], normalizer, tokenizer)
+        engine = in3120.SimpleSearchEngine(store, index)
+        results = list(engine.evaluate("propeller slipstream", {"hit_count": 3, "match_threshold": 1.0}, in3120.SimpleRanker()))
+        self.assertEqual(len(results), 3)
+        self.assertIn("slipstream", results[0]["document"]["body"])
+        store.close()
+
+    def test_unsupported_format(self):
+        for size in (64, 10, 0):
+            with open(self.__filename, "wb") as f:
+                f.write(bytes(size))
+            with self.assertRaises(IOError):
+                in3120.MemoryMappedCorpus(self.__filename)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,66 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+import unittest
+from context import in3120
+
+
+class TestPerfectHashDictionary(unittest.TestCase):
+
+    def setUp(self):
+        self.__source = in3120.InMemoryDictionary()
+        for term in ["foo", "bar", "", "blåbær", "日本語"] + [f"term{i}" for i in range(1000)]:
+            self.__source.add_if_absent(term)
+
+    def test_lookups_preserve_term_identifiers(self):
+        dictionary = in3120.PerfectHashDictionary(self.__source)
+        self.assertEqual(dictionary.size(), self.__source.size())
+        self.assertEqual(len(dictionary), self.__source.size())
+        for (term, term_id) in self.__source:
+            self.assertEqual(dictionary.get_term_id(term), term_id)
+            self.assertEqual(dictionary[term], term_id)
+            self.assertIn(term, dictionary)
+
+    def test_rejects_out_of_vocabulary_terms(self):
+        dictionary = in3120.PerfectHashDictionary(self.__source)
+        misses = [f"other{i}" for i in range(1000)]
+        false_positives = sum(dictionary.get_term_id(term) is not None for term in misses)
+        self.assertLessEqual(false_positives, 2)  # Expected number is 1000 / 65536.
+        self.assertNotIn("wtf", dictionary)
+
+    def test_is_read_only(self):
+        dictionary = in3120.PerfectHashDictionary(self.__source)
+        self.assertEqual(dictionary.add_if_absent("foo"), self.__source["foo"])
+        with self.assertRaises(TypeError):
+            dictionary.add_if_absent("wtf")
+        with self.assertRaises(TypeError):
+            list(dictionary)
+
+    def test_small_dictionaries(self):
+        for size in range(5):
+            source = in3120.InMemoryDictionary()
+            for i in range(size):
+                source.add_if_absent(str(i))
+            dictionary = in3120.PerfectHashDictionary(source)
+            self.assertEqual(dictionary.size(), size)
+            self.assertListEqual([dictionary.get_term_id(str(i)) for i in range(size)], list(range(size)))
+            self.assertIsNone(dictionary.get_term_id("wtf"))
+
+    def test_as_inverted_index_dictionary(self):
+        normalizer = in3120.SimpleNormalizer()
+        tokenizer = in3120.SimpleTokenizer()
+        corpus = in3120.InMemoryCorpus("../data/mesh.txt")
+        index1 = in3120.InMemoryInvertedIndex(corpus, ["body"], normalizer, tokenizer)
+        index2 = in3120.InMemoryInvertedIndex(corpus, ["body"], normalizer, tokenizer,
+                                              dictionary_factory=in3120.PerfectHashDictionary)
+        for term in ("hydrogen", "hydrocephalus", "wtf"):
+            self.assertEqual(index1.get_document_frequency(term), index2.get_document_frequency(term))
+            self.assertListEqual([(p.document_id, p.term_frequency) for p in index1[term]],
+                                 [(p.document_id, p.term_frequency) for p in index2[term]])
+        self.assertTrue(repr(index2).startswith("{0: "))  # Keyed by term identifier, since the terms aren't stored.
+        with self.assertRaises(TypeError):
+            index2.get_vocabulary()
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,61 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+import unittest
+from context import in3120
+
+
+class TestPhraseSearchEngine(unittest.TestCase):
+
+    def setUp(self):
+        self.__normalizer = in3120.SimpleNormalizer()
+        self.__tokenizer = in3120.SimpleTokenizer()
+
+    def __evaluate(self, engine, query, hit_count=10):
+        return [(m["score"], m["document"].document_id) for m in engine.evaluate(query, {"hit_count": hit_count})]
+
+    def test_small_corpus(self):
+        corpus = in3120.InMemoryCorpus()
+        corpus.add_document(in3120.InMemoryDocument(corpus.size(), {"title": "to be", "body": "or not to be, that is the question"}))
+        corpus.add_document(in3120.InMemoryDocument(corpus.size(), {"title": "question", "body": "to be or not to be, to be or not"}))
+        corpus.add_document(in3120.InMemoryDocument(corpus.size(), {"title": "be to", "body": "not to"}))
+        index = in3120.InMemoryInvertedIndex(corpus, ["title", "body"], self.__normalizer, self.__tokenizer, positional=True)
+        engine = in3120.PhraseSearchEngine(corpus, index)
+        self.assertListEqual(self.__evaluate(engine, "to be or not to be"), [(1, 1)])
+        self.assertListEqual(self.__evaluate(engine, "To be, or NOT"), [(2, 1)])
+        self.assertListEqual(sorted(self.__evaluate(engine, "or not to be")), [(1, 0), (1, 1)])
+        self.assertListEqual(self.__evaluate(engine, "to be"), [(3, 1), (2, 0)])
+        self.assertListEqual(self.__evaluate(engine, "to be", 1), [(3, 1)])
+        self.assertListEqual(sorted(self.__evaluate(engine, "be to")), [(1, 1), (1, 2)])
+        self.assertListEqual(self.__evaluate(engine, "to not"), [])  # Doesn't match across fields.
+        self.assertListEqual(self.__evaluate(engine, "question to"), [])
+        self.assertListEqual(self.__evaluate(engine, "be be"), [])
+        self.assertListEqual(self.__evaluate(engine, "foo"), [])
+        self.assertListEqual(self.__evaluate(engine, ""), [])
+
+    def test_requires_positional_index(self):
+        corpus = in3120.InMemoryCorpus()
+        corpus.add_document(in3120.InMemoryDocument(corpus.size(), {"body": "a b"}))
+        index = in3120.InMemoryInvertedIndex(corpus, ["body"], self.__normalizer, self.__tokenizer)
+        engine = in3120.PhraseSearchEngine(corpus, index)
+        with self.assertRaises(AssertionError):
+            list(engine.evaluate("a b", {}))
+
+    def test_cran_corpus(self):
+        corpus = in3120.InMemoryCorpus("../data/cran.xml")
+        index = in3120.InMemoryInvertedIndex(corpus, ["body"], self.__normalizer, self.__tokenizer, positional=True)
+        engine = in3120.PhraseSearchEngine(corpus, index)
+        documents = [list(index.get_terms(d["body"])) for d in corpus]
+        for query in ("boundary layer", "the boundary layer", "of the", "flow of a viscous", "supersonic flow over"):
+            needle = list(index.get_terms(query))
+            counts = [sum(1 for i in range(len(terms)) if terms[i:i + len(needle)] == needle) for terms in documents]
+            expected = sorted(((c, i) for (i, c) in enumerate(counts) if c > 0), reverse=True)
+            matches = self.__evaluate(engine, query, 100)
+            self.assertEqual(len(matches), min(100, len(expected)))
+            self.assertListEqual([score for (score, _) in matches], [score for (score, _) in expected[:len(matches)]])
+            for (score, document_id) in matches:
+                self.assertEqual(counts[document_id], score)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
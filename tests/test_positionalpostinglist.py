@@ -0,0 +1,59 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+import unittest
+from context import in3120
+
+
+class TestPositionalPostingList(unittest.TestCase):
+
+    def test_append_and_iterate(self):
+        postings = in3120.PositionalPostingList()
+        self.assertEqual(len(postings), 0)
+        postings.append_posting(in3120.PositionalPosting(21, 2, [0, 7]))
+        postings.append_posting(in3120.PositionalPosting(42, 1, [300]))
+        postings.append_posting(in3120.PositionalPosting(70, 3, [5, 128, 100000]))
+        postings.finalize_postings()
+        self.assertEqual(len(postings), 3)
+        entries = list(postings)
+        self.assertListEqual([p.document_id for p in entries], [21, 42, 70])
+        self.assertListEqual([p.term_frequency for p in entries], [2, 1, 3])
+        self.assertListEqual([p.get_positions() for p in entries], [[0, 7], [300], [5, 128, 100000]])
+        self.assertListEqual([p.get_positions() for p in reversed(entries)], [[5, 128, 100000], [300], [0, 7]])
+
+    def test_advance_to(self):
+        postings = in3120.PositionalPostingList()
+        for document_id in range(0, 300, 3):
+            postings.append_posting(in3120.PositionalPosting(document_id, 2, [document_id, document_id + 2]))
+        iterator = iter(postings)
+        posting = iterator.advance_to(100)
+        self.assertEqual(posting.document_id, 102)
+        self.assertListEqual(posting.get_positions(), [102, 104])
+        self.assertIsNone(iterator.advance_to(300))
+
+    def test_invalid_append(self):
+        postings = in3120.PositionalPostingList()
+        postings.append_posting(in3120.PositionalPosting(21, 1, [3]))
+        with self.assertRaises(AssertionError):
+            postings.append_posting(in3120.PositionalPosting(21, 1, [3]))
+        with self.assertRaises(AssertionError):
+            postings.append_posting(in3120.PositionalPosting(22, 2, [3, 3]))
+        with self.assertRaises(AssertionError):
+            postings.append_posting(in3120.Posting(23, 1))
+        with self.assertRaises(AssertionError):
+            in3120.PositionalPosting(24, 2, [1])
+
+    def test_positional_index(self):
+        corpus = in3120.InMemoryCorpus()
+        corpus.add_document(in3120.InMemoryDocument(corpus.size(), {"title": "A b", "body": "b c A"}))
+        corpus.add_document(in3120.InMemoryDocument(corpus.size(), {"body": "c c"}))
+        index = in3120.InMemoryInvertedIndex(corpus, ["title", "body"], in3120.SimpleNormalizer(), in3120.SimpleTokenizer(),
+                                             positional=True)
+        self.assertListEqual([(p.document_id, p.term_frequency, p.get_positions()) for p in index["a"]], [(0, 2, [0, 5])])
+        self.assertListEqual([(p.document_id, p.term_frequency, p.get_positions()) for p in index["b"]], [(0, 2, [1, 3])])
+        self.assertListEqual([(p.document_id, p.term_frequency, p.get_positions()) for p in index["c"]], [(0, 1, [4]), (1, 2, [1, 2])])
+        self.assertEqual(index.get_document_frequency("c"), 2)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
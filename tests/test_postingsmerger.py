@@ -42,6 +42,67 @@ class TestPostingsMerger(unittest.TestCase):
         self.assertIsInstance(result1, types.GeneratorType, "Are you using yield?")
         self.assertIsInstance(result2, types.GeneratorType, "Are you using yield?")
 
+    def test_intersection_skips_ahead(self):
+        short = in3120.InMemoryPostingList()
+        long = in3120.InMemoryPostingList()
+        for document_id in (5000, 99999):
+            short.append_posting(in3120.Posting(document_id, 1))
+        for document_id in range(100000):
+            long.append_posting(in3120.Posting(document_id, 1))
+        consumed = []
+
+        class LoggingIterator(in3120.PostingListIterator):
+            def __init__(self, wrapped):
+                self.__wrapped = wrapped
+
+            def __next__(self):
+                posting = next(self.__wrapped)
+                consumed.append(posting.document_id)
+                return posting
+
+            def advance_to(self, document_id):
+                posting = self.__wrapped.advance_to(document_id)
+                if posting:
+                    consumed.append(posting.document_id)
+                return posting
+
+        for (p1, p2) in ((short, long), (long, short)):
+            consumed.clear()
+            result = self._merger.intersection(LoggingIterator(iter(p1)), LoggingIterator(iter(p2)))
+            self.assertListEqual([p.document_id for p in result], [5000, 99999])
+            self.assertLess(len(consumed), 10)
+            result = self._merger.intersection(iter(list(p1)), LoggingIterator(iter(p2)))
+            self.assertListEqual([p.document_id for p in result], [5000, 99999])
+
+    def test_cursors(self):
+        import random
+        generator = random.Random(42)
+        for _ in range(50):
+            posting_lists = []
+            for _ in range(3):
+                posting_list = in3120.CompressedInMemoryPostingList()
+                for document_id in sorted(generator.sample(range(2000), generator.randrange(0, 400))):
+                    posting_list.append_posting(in3120.Posting(document_id, 1 + document_id % 3))
+                posting_lists.append(posting_list)
+            (p1, p2, p3) = posting_lists
+            for (operator, cursor_class) in ((self._merger.intersection, in3120.PostingsMerger.IntersectionCursor),
+                                             (self._merger.union, in3120.PostingsMerger.UnionCursor)):
+                expected = [(p.document_id, p.term_frequency) for p in operator(iter(p1), iter(p2))]
+                cursor = cursor_class(p1.get_cursor(), p2.get_cursor())
+                actual = []
+                while cursor.next():
+                    actual.append((cursor.document_id, cursor.term_frequency))
+                self.assertTrue(cursor.exhausted)
+                self.assertListEqual(actual, expected)
+                expected = [p.document_id for p in operator(operator(iter(p1), iter(p2)), iter(p3)) if p.document_id >= 1000]
+                cursor = cursor_class(cursor_class(p1.get_cursor(), p2.get_cursor()), p3.get_cursor())
+                actual = []
+                if cursor.advance_to(1000):
+                    actual.append(cursor.document_id)
+                    while cursor.next():
+                        actual.append(cursor.document_id)
+                self.assertListEqual(actual, expected)
+
     def _process_query_with_two_terms(self, corpus, index, query, operator, expected):
         terms = list(index.get_terms(query))
         postings = [index[terms[i]] for i in range(len(terms))]
@@ -0,0 +1,56 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+import random
+import unittest
+from context import in3120
+
+
+class TestRoaringBitmap(unittest.TestCase):
+
+    def test_add_and_iterate(self):
+        bitmap = in3120.RoaringBitmap()
+        self.assertEqual(len(bitmap), 0)
+        self.assertListEqual(list(bitmap), [])
+        for value in (70, 21, 42, 21, 1 << 20, (1 << 32) - 1, 0):
+            bitmap.add(value)
+        self.assertEqual(len(bitmap), 6)
+        self.assertListEqual(list(bitmap), [0, 21, 42, 70, 1 << 20, (1 << 32) - 1])
+        self.assertIn(42, bitmap)
+        self.assertIn((1 << 32) - 1, bitmap)
+        self.assertNotIn(43, bitmap)
+        self.assertNotIn(1 << 21, bitmap)
+        with self.assertRaises(AssertionError):
+            bitmap.add(1 << 32)
+        with self.assertRaises(AssertionError):
+            bitmap.add(-1)
+
+    def test_container_types(self):
+        sparse = in3120.RoaringBitmap(range(0, 60000, 1000))
+        dense = in3120.RoaringBitmap(range(0, 60000, 2))
+        self.assertEqual(sparse.get_size_in_bytes(), 2 * 60)
+        self.assertLess(dense.get_size_in_bytes(), 60000 // 8 + 1)
+        self.assertTrue(all(isinstance(c, int) for (_, _, c) in dense.get_containers()))
+        self.assertFalse(any(isinstance(c, int) for (_, _, c) in sparse.get_containers()))
+        dense.add(1)
+        self.assertIn(1, dense)
+        self.assertEqual(len(dense), 30001)
+
+    def test_and_or(self):
+        generator = random.Random(42)
+        for _ in range(50):
+            sets = []
+            for _ in range(2):
+                size = generator.choice([0, 1, 100, 5000, 20000])
+                universe = generator.choice([1000, 100000, 1 << 32])
+                sets.append({generator.randrange(universe) for _ in range(size)})
+            bitmaps = [in3120.RoaringBitmap(sorted(values)) for values in sets]
+            self.assertListEqual(list(bitmaps[0] & bitmaps[1]), sorted(sets[0] & sets[1]))
+            self.assertListEqual(list(bitmaps[0] | bitmaps[1]), sorted(sets[0] | sets[1]))
+            self.assertEqual(len(bitmaps[0] & bitmaps[1]), len(sets[0] & sets[1]))
+            self.assertEqual(len(bitmaps[0] | bitmaps[1]), len(sets[0] | sets[1]))
+            self.assertEqual(bitmaps[0] | bitmaps[1], bitmaps[1] | bitmaps[0])
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
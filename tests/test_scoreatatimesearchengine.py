@@ -0,0 +1,72 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+import unittest
+from context import in3120
+
+
+class TestScoreAtATimeSearchEngine(unittest.TestCase):
+
+    def setUp(self):
+        self.__normalizer = in3120.SimpleNormalizer()
+        self.__tokenizer = in3120.SimpleTokenizer()
+
+    def __evaluate(self, engine, query, options):
+        return [(m["score"], m["document"].document_id) for m in engine.evaluate(query, options)]
+
+    def test_small_corpus(self):
+        corpus = in3120.InMemoryCorpus()
+        corpus.add_document(in3120.InMemoryDocument(corpus.size(), {"body": "a b b b"}))
+        corpus.add_document(in3120.InMemoryDocument(corpus.size(), {"body": "b c"}))
+        corpus.add_document(in3120.InMemoryDocument(corpus.size(), {"body": "b b b c"}))
+        corpus.add_document(in3120.InMemoryDocument(corpus.size(), {"body": "c"}))
+        index = in3120.ImpactOrderedInvertedIndex(corpus, ["body"], self.__normalizer, self.__tokenizer)
+        engine = in3120.ScoreAtATimeSearchEngine(corpus, index)
+        self.assertListEqual([d for (_, d) in self.__evaluate(engine, "a", {})], [0])
+        matches = [d for (_, d) in self.__evaluate(engine, "b c", {})]
+        self.assertListEqual([matches[0], sorted(matches[1:3]), matches[3]], [2, [0, 1], 3])
+        self.assertListEqual([d for (_, d) in self.__evaluate(engine, "a b c", {"hit_count": 2})], [0, 2])
+        self.assertListEqual(self.__evaluate(engine, "foo", {}), [])
+        self.assertListEqual(self.__evaluate(engine, "", {}), [])
+        (score, _) = self.__evaluate(engine, "a a", {})[0]
+        self.assertAlmostEqual(score, 2 * 0.30103 * 0.60206, 2)
+
+    def test_early_termination_does_not_change_results(self):
+        corpus = in3120.InMemoryCorpus("../data/mesh.txt")
+        index = in3120.ImpactOrderedInvertedIndex(corpus, ["body"], self.__normalizer, self.__tokenizer)
+        engine = in3120.ScoreAtATimeSearchEngine(corpus, index)
+        for query in ("water pollution", "acid protein virus", "cell the of and", "human immunodeficiency virus virus"):
+            for hit_count in (1, 10, 100):
+                matches1 = self.__evaluate(engine, query, {"hit_count": hit_count})
+                matches2 = self.__evaluate(engine, query, {"hit_count": hit_count, "early_termination": False})
+                self.assertEqual(len(matches1), len(matches2))
+                for ((score1, _), (score2, _)) in zip(matches1, matches2):
+                    self.assertAlmostEqual(score1, score2)
+                if hit_count == 1:
+                    self.assertEqual(matches1[0][0], matches2[0][0])
+
+    def test_agrees_with_document_at_a_time(self):
+        corpus = in3120.InMemoryCorpus("../data/mesh.txt")
+        index1 = in3120.InMemoryInvertedIndex(corpus, ["body"], self.__normalizer, self.__tokenizer)
+        index2 = in3120.ImpactOrderedInvertedIndex(corpus, ["body"], self.__normalizer, self.__tokenizer, 16)
+        engine1 = in3120.SimpleSearchEngine(corpus, index1)
+        engine2 = in3120.ScoreAtATimeSearchEngine(corpus, index2)
+        ranker = in3120.BetterRanker(corpus, index1)
+        for query in ("water pollution", "acid protein virus", "human immunodeficiency"):
+            matches1 = [m["score"] for m in engine1.evaluate(query, {"hit_count": 10, "match_threshold": 0.0}, ranker)]
+            matches2 = [score for (score, _) in self.__evaluate(engine2, query, {"hit_count": 10})]
+            self.assertEqual(len(matches1), len(matches2))
+            for (score1, score2) in zip(matches1, matches2):
+                self.assertAlmostEqual(score1, score2, 3)
+
+    def test_uses_yield(self):
+        import types
+        corpus = in3120.InMemoryCorpus()
+        corpus.add_document(in3120.InMemoryDocument(0, {"a": "foo bar"}))
+        index = in3120.ImpactOrderedInvertedIndex(corpus, ["a"], self.__normalizer, self.__tokenizer)
+        engine = in3120.ScoreAtATimeSearchEngine(corpus, index)
+        self.assertIsInstance(engine.evaluate("foo", {}), types.GeneratorType, "Are you using yield?")
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
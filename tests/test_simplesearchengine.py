@@ -192,6 +192,35 @@ class TestSimpleSearchEngine(unittest.TestCase):
         history = index.get_history()
         self.assertTrue(history == ordering1 or history == ordering2)  # Strict.
 
+    def test_skipping_does_not_change_results(self):
+        from typing import Iterator
+
+        class NonSkippingInvertedIndex(in3120.InvertedIndex):
+            def __init__(self, wrapped: in3120.InvertedIndex):
+                self.__wrapped = wrapped
+
+            def get_terms(self, buffer: str) -> Iterator[str]:
+                return self.__wrapped.get_terms(buffer)
+
+            def get_postings_iterator(self, term: str) -> Iterator[in3120.Posting]:
+                return iter(list(self.__wrapped.get_postings_iterator(term)))
+
+            def get_document_frequency(self, term: str) -> int:
+                return self.__wrapped.get_document_frequency(term)
+
+        corpus = in3120.InMemoryCorpus("../data/mesh.txt")
+        for compressed in (False, True):
+            index = in3120.InMemoryInvertedIndex(corpus, ["body"], self.__normalizer, self.__tokenizer, compressed)
+            engine1 = in3120.SimpleSearchEngine(corpus, index)
+            engine2 = in3120.SimpleSearchEngine(corpus, NonSkippingInvertedIndex(index))
+            ranker = in3120.SimpleRanker()
+            for query in ("water pollution", "acid protein virus", "cell the of and", "human immunodeficiency virus"):
+                for match_threshold in (0.5, 0.7, 1.0):
+                    options = {"match_threshold": match_threshold, "hit_count": 100}
+                    matches1 = [(m["score"], m["document"].document_id) for m in engine1.evaluate(query, options, ranker)]
+                    matches2 = [(m["score"], m["document"].document_id) for m in engine2.evaluate(query, options, ranker)]
+                    self.assertListEqual(matches1, matches2)
+
     def test_uses_yield(self):
         import types
         corpus = in3120.InMemoryCorpus()
@@ -0,0 +1,89 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+import os
+import tempfile
+import unittest
+from context import in3120
+
+
+class TestSpimiIndexBuilder(unittest.TestCase):
+
+    def setUp(self):
+        self.__normalizer = in3120.SimpleNormalizer()
+        self.__tokenizer = in3120.SimpleTokenizer()
+        self.__directory = tempfile.TemporaryDirectory()
+        self.__filename = os.path.join(self.__directory.name, "index.bin")
+
+    def tearDown(self):
+        self.__directory.cleanup()
+
+    def __verify(self, corpus, fields, memory_budget):
+        builder = in3120.SpimiIndexBuilder(fields, self.__normalizer, self.__tokenizer, memory_budget, self.__directory.name)
+        builder.build(corpus, self.__filename)
+        self.assertListEqual(os.listdir(self.__directory.name), ["index.bin"])
+        index1 = in3120.InMemoryInvertedIndex(corpus, fields, self.__normalizer, self.__tokenizer)
+        index2 = in3120.DiskInvertedIndex(self.__filename, self.__normalizer, self.__tokenizer)
+        self.assertEqual(index2.get_document_count(), corpus.size())
+        terms = sorted({t for d in corpus for f in fields for t in index1.get_terms(d.get_field(f, ""))})
+        for term in terms + ["wtf"]:
+            self.assertEqual(index1.get_term_statistics(term), index2.get_term_statistics(term))
+            self.assertEqual(index1.get_document_frequency(term), index2.get_document_frequency(term))
+            self.assertListEqual([(p.document_id, p.term_frequency) for p in index1[term]],
+                                 [(p.document_id, p.term_frequency) for p in index2[term]])
+        statistics = builder.get_statistics()
+        self.assertEqual(statistics["documents"], corpus.size())
+        self.assertEqual(statistics["terms"], len(terms))
+        self.assertEqual(statistics["postings"], sum(index1.get_document_frequency(t) for t in terms))
+        index2.close()
+        return statistics
+
+    def test_single_run(self):
+        corpus = in3120.InMemoryCorpus("../data/mesh.txt")
+        statistics = self.__verify(corpus, ["body"], 64 << 20)
+        self.assertEqual(statistics["runs"], 0)
+        self.assertEqual(statistics["spilled_bytes"], 0)
+        self.assertEqual(statistics["merge_passes"], 1)
+
+    def test_multiple_runs(self):
+        corpus = in3120.InMemoryCorpus("../data/mesh.txt")
+        statistics = self.__verify(corpus, ["body"], 100000)
+        self.assertGreater(statistics["runs"], 5)
+        self.assertGreater(statistics["spilled_bytes"], 0)
+        self.assertGreater(statistics["merge_passes"], 1)
+
+    def test_multiple_fields(self):
+        corpus = in3120.InMemoryCorpus("../data/cran.xml")
+        statistics = self.__verify(corpus, ["title", "body"], 200000)
+        self.assertGreater(statistics["runs"], 1)
+
+    def test_memory_budget(self):
+        import tracemalloc
+        corpus = in3120.InMemoryCorpus("../data/cran.xml")
+        peaks = []
+        for memory_budget in (64 << 20, 250000):
+            builder = in3120.SpimiIndexBuilder(["body"], self.__normalizer, self.__tokenizer, memory_budget, self.__directory.name)
+            tracemalloc.start()
+            builder.build(corpus, self.__filename)
+            peaks.append(tracemalloc.get_traced_memory()[1])
+            tracemalloc.stop()
+        self.assertLess(peaks[1], peaks[0] / 2)
+
+    def test_search(self):
+        corpus = in3120.InMemoryCorpus("../data/mesh.txt")
+        builder = in3120.SpimiIndexBuilder(["body"], self.__normalizer, self.__tokenizer, 100000)
+        builder.build(corpus, self.__filename)
+        index1 = in3120.InMemoryInvertedIndex(corpus, ["body"], self.__normalizer, self.__tokenizer)
+        index2 = in3120.DiskInvertedIndex(self.__filename, self.__normalizer, self.__tokenizer)
+        options = {"match_threshold": 0.5, "hit_count": 10}
+        for query in ("water hydrogen", "of the disease", "wtf"):
+            ranker = in3120.BetterRanker(corpus, index1)
+            hits1 = [(h["score"], h["document"].document_id) for h in in3120.SimpleSearchEngine(corpus, index1).evaluate(query, options, ranker)]
+            ranker = in3120.BetterRanker(corpus, index2)
+            hits2 = [(h["score"], h["document"].document_id) for h in in3120.SimpleSearchEngine(corpus, index2).evaluate(query, options, ranker)]
+            self.assertListEqual(hits1, hits2)
+        index2.close()
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
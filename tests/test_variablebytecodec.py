@@ -53,6 +53,43 @@ class TestVariableByteCodec(unittest.TestCase):
         with self.assertRaises(AssertionError):
             in3120.VariableByteCodec.decode(None, 0)
 
+    def _test_encode_and_decode_many(self):
+        import random
+        generator = random.Random(42)
+        for size in (0, 1, 2, 100, 511, 512, 513, 5000):
+            numbers = [generator.choice([0, 1, 127, 128, generator.randrange(100000), generator.randrange(1 << 62),
+                                         generator.randrange(1 << 80)]) for _ in range(size)]
+            expected = bytearray()
+            for number in numbers:
+                in3120.VariableByteCodec.encode(number, expected)
+            data = bytearray(b"\x81")
+            self.assertEqual(in3120.VariableByteCodec.encode_many(numbers, data), len(expected))
+            self.assertEqual(data[1:], expected)
+            data.extend(b"\x05\x06\x87")
+            self.assertEqual(in3120.VariableByteCodec.decode_many(data, 1, len(numbers)), (numbers, len(expected)))
+            self.assertEqual(in3120.VariableByteCodec.decode_many(data, 1 + len(expected), 1), ([5 * 128 * 128 + 6 * 128 + 7], 3))
+            with self.assertRaises(IndexError):
+                in3120.VariableByteCodec.decode_many(data, 1, len(numbers) + 2)
+        with self.assertRaises(AssertionError):
+            in3120.VariableByteCodec.encode_many([1, 2, -3], bytearray())
+        with self.assertRaises(AssertionError):
+            in3120.VariableByteCodec.encode_many([-1] * 1000, bytearray())
+        with self.assertRaises(AssertionError):
+            in3120.VariableByteCodec.decode_many(bytearray(b"\x01\x81"), 1, 1)
+
+    def test_encode_and_decode_many(self):
+        self._test_encode_and_decode_many()
+
+    def test_encode_and_decode_many_without_numpy(self):
+        import sys
+        module = sys.modules[in3120.VariableByteCodec.__module__]
+        numpy = module.np
+        module.np = None
+        try:
+            self._test_encode_and_decode_many()
+        finally:
+            module.np = numpy
+
 
 if __name__ == '__main__':
     unittest.main(verbosity=2)
@@ -27,3 +27,23 @@ from test_variablebytecodec import TestVariableByteCodec
 from test_soundexnormalizer import TestSoundexNormalizer
 from test_porternormalizer import TestPorterNormalizer
 from test_similaritysearchengine import TestSimilaritySearchEngine
+from test_filecorpus import TestFileCorpus
+from test_memorymappedcorpus import TestMemoryMappedCorpus
+from test_columnarcorpus import TestColumnarCorpus
+from test_lrucache import TestLruCache
+from test_blockcompressedcorpus import TestBlockCompressedCorpus
+from test_cachingprocessor import TestCachingProcessor
+from test_frontcodeddictionary import TestFrontCodedDictionary
+from test_perfecthashdictionary import TestPerfectHashDictionary
+from test_automatondictionary import TestAutomatonDictionary
+from test_arraypostinglist import TestArrayPostingList
+from test_integercodec import TestIntegerCodec
+from test_blockpostinglist import TestBlockPostingList
+from test_positionalpostinglist import TestPositionalPostingList
+from test_phrasesearchengine import TestPhraseSearchEngine
+from test_roaringbitmap import TestRoaringBitmap
+from test_bitmappostinglist import TestBitmapPostingList
+from test_impactorderedinvertedindex import TestImpactOrderedInvertedIndex
+from test_scoreatatimesearchengine import TestScoreAtATimeSearchEngine
+from test_diskinvertedindex import TestDiskInvertedIndex
+from test_spimiindexbuilder import TestSpimiIndexBuilder